@@ -70,8 +70,8 @@ class VideoPopup(QWidget):
         self.timer.start(int(1000/target_fps))
 
     @Slot(object)
-    def on_frame(self, frame):
-        self.latest_frame = frame
+    def on_frame(self, packet):
+        self.latest_frame = packet.image
 
     def update_display(self):
         if self.latest_frame is None:
@@ -186,8 +186,8 @@ class VideoWidget(QWidget):
         return box
 
     @Slot(object)
-    def on_frame(self, frame):
-        self.latest_frame = frame
+    def on_frame(self, packet):
+        self.latest_frame = packet.image
 
     def update_display(self):
         if hasattr(self, 'latest_frame'):
@@ -0,0 +1,589 @@
+"""
+Micro-benchmarks for the client hot paths.
+
+    python benchmark.py                 # run everything
+    python benchmark.py serialize link  # run selected benchmarks
+    python benchmark.py backends --model digits.onnx --threads 4
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+from providers.backend import OnnxBackend
+from providers.transport import FPGATransport, ROISerializer, ROI_BYTES, UDPTransport
+
+
+def _report(name: str, n: int, elapsed: float, extra: str = ""):
+    rate = n / elapsed if elapsed > 0 else float('inf')
+    print(f"  {name:<32} {rate:>12,.0f} /s  {1e6 * elapsed / n:>9.2f} µs/op  {extra}")
+
+
+def _transient_bytes(fn, n: int = 200) -> float:
+    """
+    Average bytes allocated while one call runs (tracemalloc peak above
+    the baseline), i.e. the garbage one call leaves for the allocator.
+    """
+    fn()
+    tracemalloc.start()
+    total = 0
+    for _ in range(n):
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        total += peak - base
+    tracemalloc.stop()
+    return total / n
+
+
+def _timeit(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return time.perf_counter() - t0
+
+
+def _sample_rois(n: int = 64, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    gray = rng.integers(0, 256, size=(n, 32, 32), dtype=np.uint8)
+    # ROIFilter output: gray replicated to BGR
+    return [np.repeat(g[..., None], 3, axis=2) for g in gray]
+
+
+def _sample_frame(w: int = 1920, h: int = 1080, digits: int = 4, seed: int = 0,
+                  specks: int = 0) -> np.ndarray:
+    """
+    A light panel with a few dark digits, like the camera sees it;
+    `specks` adds small dark blobs that each become a contour.
+    """
+    import cv2
+    rng = np.random.default_rng(seed)
+    frame = np.full((h, w, 3), 200, dtype=np.uint8)
+    frame += rng.integers(0, 20, size=frame.shape, dtype=np.uint8)
+    for x, y in zip(rng.integers(0, w, specks), rng.integers(0, h, specks)):
+        cv2.circle(frame, (int(x), int(y)), 3, (30, 30, 30), -1)
+    for text, org, scale, thickness in _digit_layout(w, h, digits):
+        cv2.putText(frame, text, org, cv2.FONT_HERSHEY_SIMPLEX, scale, (20, 20, 20), thickness)
+    return frame
+
+
+def _digit_layout(w: int, h: int, digits: int) -> list:
+    """(text, origin, scale, thickness) of each digit _sample_frame draws."""
+    return [(str(i + 1), (int(w * (0.15 + 0.7 * i / max(digits - 1, 1))) - h // 16, h // 2 + h // 16),
+             h / 160, max(h // 60, 2)) for i in range(digits)]
+
+
+def _digit_boxes(w: int, h: int, digits: int) -> np.ndarray:
+    """N×4 (x1, y1, x2, y2) of the ink of the digits _sample_frame draws."""
+    import cv2
+    from core.adaptive import foreground_bbox
+    boxes = []
+    for text, org, scale, thickness in _digit_layout(w, h, digits):
+        canvas = np.zeros((h, w), dtype=np.uint8)
+        cv2.putText(canvas, text, org, cv2.FONT_HERSHEY_SIMPLEX, scale, 255, thickness)
+        boxes.append(foreground_bbox(canvas))
+    return np.array(boxes)
+
+
+# hand-checked digit boxes (x1, y1, x2, y2) of experiment/images
+SAMPLE_DIGITS = {
+    '1.jpeg': ((686, 402, 1085, 1120), (1276, 384, 1798, 1104)),
+    '2.jpeg': ((686, 402, 1085, 1120), (1276, 384, 1798, 1104)),
+    '3.png': ((786, 789, 930, 1045), (997, 785, 1186, 1043)),
+    '4.png': ((390, 354, 462, 482), (495, 352, 590, 482)),
+}
+
+
+def _score_boxes(boxes, digits) -> tuple:
+    """
+    (hits, extras): digits covered by a box (>= 80% of the digit inside a
+    box it fills >= 20% of) and boxes that cover no digit.
+    """
+    boxes, digits = np.asarray(boxes).reshape(-1, 4), np.asarray(digits).reshape(-1, 4)
+    w = np.clip(np.minimum(boxes[:, None, 2], digits[:, 2]) - np.maximum(boxes[:, None, 0], digits[:, 0]), 0, None)
+    h = np.clip(np.minimum(boxes[:, None, 3], digits[:, 3]) - np.maximum(boxes[:, None, 1], digits[:, 1]), 0, None)
+    digit_area = (digits[:, 2] - digits[:, 0]) * (digits[:, 3] - digits[:, 1])
+    box_area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    covers = (w * h >= 0.8 * digit_area) & (digit_area >= 0.2 * box_area[:, None])
+    return int(covers.any(axis=0).sum()), int((~covers.any(axis=1)).sum())
+
+
+def bench_serialize(args):
+    """Per-ROI serialization: legacy copies vs. the preallocated buffer."""
+    rois = _sample_rois()
+    sink = []
+
+    def legacy(roi=rois[0]):
+        raw = (roi / 255.0).astype(np.float32).tobytes()
+        for i in range(4):
+            sink.append(raw[1024 * i:1024 * (i + 1)])
+        sink.clear()
+
+    serializer = ROISerializer()
+
+    def packed(roi=rois[0]):
+        serializer.pack(roi)
+        for packet in serializer.packets:
+            sink.append(packet)
+        sink.clear()
+
+    for name, fn in (("legacy tobytes + slices", legacy), ("ROISerializer.pack", packed)):
+        elapsed = _timeit(fn, args.n)
+        per_op = _transient_bytes(fn)
+        rate = args.n / elapsed
+        _report(name, args.n, elapsed,
+                f"{per_op / 1024:7.1f} KiB/op  {per_op * rate / 2**20:8.1f} MiB/s allocated")
+
+
+def bench_detect(args):
+    """BoundingBox.on_frame on a 1080p frame at several detection scales."""
+    from processors.pre import BoundingBox
+    frame = _sample_frame()
+    n = max(args.n // 50, 20)
+    for scale in (1.0, 0.5, 0.25):
+        proc = BoundingBox(detect_scale=scale)
+        found = []
+        proc.roi_batch.connect(found.append)
+        elapsed = _timeit(lambda: proc.on_frame(frame), n)
+        _report(f"detect_scale={scale}", n, elapsed, f"{len(found[-1]) if found else 0} ROIs")
+
+
+def bench_extract(args):
+    """BoundingBox contour loop vs. connected components on clean/noisy 1080p."""
+    from processors.pre import BoundingBox
+    n = max(args.n // 50, 20)
+    for label, frame in (("clean", _sample_frame()), ("noisy", _sample_frame(specks=800))):
+        for extractor in ("contours", "components"):
+            proc = BoundingBox(extractor=extractor)
+            found = []
+            proc.roi_batch.connect(found.append)
+            elapsed = _timeit(lambda: proc.on_frame(frame), n)
+            _report(f"{extractor} ({label})", n, elapsed,
+                    f"{len(found[-1]) if found else 0} ROIs")
+
+
+def bench_adaptive(args):
+    """BoundingBox (Otsu) vs. AdaptiveThreshold (reference port): time, digits found, extra boxes."""
+    import cv2
+    from processors.pre import AdaptiveThreshold, BoundingBox
+    frame = _sample_frame()
+    h, w = frame.shape[:2]
+    truth = _digit_boxes(w, h, 4)
+    # light falling off to a quarter across the panel
+    shadow = (frame * np.linspace(1.0, 0.25, w)[None, :, None]).astype(np.uint8)
+    cases = [("1080p clean", frame, truth), ("1080p noisy", _sample_frame(specks=800), truth),
+             ("1080p shadow", shadow, truth)]
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name, digits in SAMPLE_DIGITS.items():
+        image = cv2.imread(os.path.join(here, 'experiment', 'images', name))
+        if image is not None:
+            cases.append((name, image, digits))
+    n = max(args.n // 100, 10)
+
+    # the reference's get_roi: a Python loop over every pixel
+    from core.adaptive import adaptive_binary, foreground_bbox
+    binary = adaptive_binary(cv2.cvtColor(cv2.resize(frame, (640, 360)), cv2.COLOR_BGR2GRAY))
+
+    def get_roi():
+        ys, xs = [], []
+        for y in range(binary.shape[0]):
+            for x in range(binary.shape[1]):
+                if binary[y, x] == 255:
+                    ys.append(y)
+                    xs.append(x)
+        return min(xs), min(ys), max(xs) + 1, max(ys) + 1
+
+    _report("get_roi (Python loop, 640×360)", 1, _timeit(get_roi, 1), f"{get_roi()}")
+    _report("foreground_bbox (640×360)", args.n, _timeit(lambda: foreground_bbox(binary), args.n),
+            f"{foreground_bbox(binary)}")
+    for label, image, digits in cases:
+        for name, proc in (("BoundingBox", BoundingBox()),
+                           ("BoundingBox components", BoundingBox(extractor="components")),
+                           ("AdaptiveThreshold", AdaptiveThreshold())):
+            found = []
+            proc.processed_frame.connect(found.append)
+            elapsed = _timeit(lambda: proc.on_frame(image), n)
+            hits, extras = _score_boxes(found[-1].boxes, digits)
+            _report(f"{name} ({label})", n, elapsed,
+                    f"{hits}/{len(digits)} digits, {extras} extra")
+
+
+def _skewed_frame(w: int = 1920, h: int = 1080) -> tuple:
+    """
+    A 720p panel (_sample_frame) seen at an angle in a w×h frame: (frame,
+    panel corners, N×4 boxes around its digits on the frame).
+    """
+    import cv2
+    corners = np.float32([[0.21 * w, 0.19 * h], [0.78 * w, 0.3 * h],
+                          [0.76 * w, 0.83 * h], [0.18 * w, 0.93 * h]])
+    skew = cv2.getPerspectiveTransform(np.float32([[0, 0], [1280, 0], [1280, 720], [0, 720]]), corners)
+    frame = cv2.warpPerspective(_sample_frame(1280, 720), skew, (w, h), borderValue=(90, 90, 90))
+    x1, y1, x2, y2 = _digit_boxes(1280, 720, 4).T.astype(np.float32)
+    pts = np.stack([x1, y1, x2, y1, x2, y2, x1, y2], axis=1).reshape(-1, 1, 2)
+    pts = cv2.perspectiveTransform(pts, skew).reshape(-1, 4, 2)
+    digits = np.concatenate([pts.min(axis=1), pts.max(axis=1)], axis=1).astype(np.int64)
+    return frame, corners, digits
+
+
+def bench_rectify(args):
+    """Skewed 1080p panel: warpPerspective vs. cached remap tables; detection and template matches with and without rectification."""
+    import cv2
+    from core.filter import preprocess_roi
+    from core.rectify import PanelRectifier
+    from mock_server import TemplateClassifier
+    from processors.pre import AdaptiveThreshold, BoundingBox
+    frame, corners, digits = _skewed_frame()
+    n = max(args.n // 50, 20)
+    rectifier = PanelRectifier(corners)
+    inverse = rectifier._table(frame.shape)[0]
+    w, h = rectifier.size
+    xs, ys = np.meshgrid(np.arange(w, dtype=np.float32), np.arange(h, dtype=np.float32))
+    src = np.stack([xs, ys, np.ones_like(xs)], axis=-1) @ inverse.T.astype(np.float32)
+    map_x, map_y = src[..., 0] / src[..., 2], src[..., 1] / src[..., 2]
+    for name, fn in (("warpPerspective", lambda: cv2.warpPerspective(frame, rectifier.homography, (w, h))),
+                     ("remap, float maps", lambda: cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR)),
+                     ("PanelRectifier.warp (fixed-point)", lambda: rectifier.warp(frame))):
+        _report(name, n, _timeit(fn, n), f"{w}×{h} from {frame.shape[1]}×{frame.shape[0]}")
+    _report("remap tables (once per frame size)", 5,
+            _timeit(lambda: PanelRectifier(corners)._table(frame.shape), 5))
+
+    # the panel's digits are drawn in the mock server's template font, so
+    # its TemplateClassifier tells how well each crop still reads
+    classify = TemplateClassifier()
+    # the digits are ~50-90 px wide on the frame, under BoundingBox's default min_area
+    for name, make in (("BoundingBox", lambda: BoundingBox(min_area=1000)),
+                       ("AdaptiveThreshold", AdaptiveThreshold)):
+        for label, rect in (("frame", None), ("rectified", rectifier),
+                            ("rectified, 640 wide", PanelRectifier(corners, max_width=640))):
+            proc = make()
+            proc.set_rectifier(rect)
+            batches = []
+            proc.roi_batch.connect(batches.append)
+            elapsed = _timeit(lambda: proc.on_frame(frame), n)
+            batch = batches[-1]
+            hits, extras = _score_boxes(batch.boxes, digits)
+            labels = [classify(preprocess_roi(batch.rois[i])[..., 0] / 255.0)
+                      for i in np.argsort(batch.boxes[:, 0])]
+            correct = sum(a == b for a, b in zip(labels, range(1, 5)))
+            _report(f"{name} ({label})", n, elapsed,
+                    f"{hits}/{len(digits)} digits, {extras} extra, {correct} read right")
+
+
+def bench_quality(args):
+    """ROI quality gate: preprocessing cost with and without it, and what it drops."""
+    import cv2
+    from core.detect import BoxDetector
+    from core.filter import preprocess_batch
+    from core.quality import QualityGate
+    frame = _sample_frame()
+    kernel = np.zeros((41, 41), np.float32)
+    kernel[20, :] = 1 / 41      # horizontal motion blur
+    blurred = cv2.filter2D(frame, -1, kernel)
+    n = max(args.n // 50, 20)
+    for label, image in (("sharp", frame), ("motion-blurred", blurred)):
+        _, batch = BoxDetector().process(image)
+        rois = batch.rois
+        for name, gate in (("no gate", None), ("QualityGate", QualityGate())):
+            def run():
+                batch.rois = rois
+                preprocess_batch(batch, gate)
+            elapsed = _timeit(run, n)
+            extra = f"{len(rois)} ROIs"
+            if gate is not None:
+                extra += f", sends {batch.accepted.sum()}, rejected {gate.rejected}"
+            _report(f"{name} ({label})", n, elapsed, extra)
+
+
+def bench_budget(args):
+    """BoxDetector on a cluttered 1080p frame (9 digits, max_rois=4): ranking and merging cost."""
+    from core.boxes import merge_rects
+    from core.detect import BoxDetector
+    frame = _sample_frame(digits=9, specks=200)
+    n = max(args.n // 50, 20)
+    for rank in ("area", "center", "sharpness"):
+        for merge in (0.5, None):
+            detector = BoxDetector(extractor="components", rank=rank, merge_overlap=merge)
+            found = []
+            elapsed = _timeit(lambda: found.append(detector.process(frame)[1]), n)
+            _report(f"rank={rank} merge={merge}", n, elapsed,
+                    f"{len(found[-1])} ROIs, {detector.cut // n} cut per frame")
+    rng = np.random.default_rng(0)
+    for count in (10, 100, 1000):
+        xy = rng.integers(0, 1800, size=(count, 2))
+        rects = np.concatenate([xy, rng.integers(10, 120, size=(count, 2))], axis=1)
+        elapsed = _timeit(lambda: merge_rects(rects), n)
+        _report(f"merge_rects ({count} rects)", n, elapsed, f"-> {len(merge_rects(rects))}")
+
+
+def bench_streams(args):
+    """Aggregate frames/s of the shared ProcessingPool: streams × workers, 720p, closed loop."""
+    from core.detect import BoxDetector
+    from core.packet import FramePacket
+    from core.streams import ProcessingPool
+    frames = [_sample_frame(1280, 720, seed=i) for i in range(4)]
+    duration = max(args.n / 10000, 0.5)
+    cores = os.cpu_count() or 1
+    for workers in sorted({1, 2, cores}):
+        for streams in (1, 2, 4):
+            # each result immediately submits the stream's next frame
+            def resubmit(packet, batch):
+                if not stop.is_set():
+                    pool.submit(FramePacket(frames[packet.stream_id], stream_id=packet.stream_id))
+
+            stop = threading.Event()
+            pool = ProcessingPool(lambda _: BoxDetector(), workers, on_result=resubmit)
+            t0 = time.perf_counter()
+            for stream_id in range(streams):
+                pool.submit(FramePacket(frames[stream_id], stream_id=stream_id))
+            time.sleep(duration)
+            stop.set()
+            elapsed = time.perf_counter() - t0
+            pool.close()
+            counts = list(pool.processed.values())
+            _report(f"{workers} workers, {streams} streams", sum(counts), elapsed,
+                    f"per stream {min(counts)}-{max(counts)} frames")
+
+
+def _import_time(code: str, reps: int = 5) -> float:
+    """Best wall time of a fresh interpreter running `code`."""
+    import subprocess
+    import sys
+    best = float('inf')
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True,
+                       cwd=os.path.dirname(os.path.abspath(__file__)))
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_import(args):
+    """Import time above a bare interpreter: the Qt-free core vs. the Qt adapters."""
+    base = _import_time('pass')
+    for code in ("import numpy, cv2",
+                 "from core.filter import preprocess_roi",
+                 "from core.detect import BoxDetector",
+                 "from providers.backend import make_backend",
+                 "from processors.pre import BoundingBox",
+                 "import mainwindow"):
+        print(f"  {code:<44} {1000 * (_import_time(code) - base):8.1f} ms")
+
+
+def bench_dispatch(args):
+    """Per-frame overhead on a tiny frame: BoundingBox signals vs. the core called directly."""
+    from core.detect import BoxDetector
+    from core.pipeline import Pipeline
+    from processors.pre import BoundingBox
+    frame = _sample_frame(64, 48, digits=1)
+    sink = []
+
+    proc = BoundingBox(min_area=50)
+    proc.processed_frame.connect(sink.append)
+    proc.roi_batch.connect(sink.append)
+    detector = BoxDetector(min_area=50)
+    pipeline = Pipeline(BoxDetector(min_area=50), preprocess=None,
+                        on_frame=sink.append, on_batch=sink.append)
+
+    def direct():
+        sink.extend(detector.process(frame))
+
+    for name, fn in (("BoundingBox.on_frame (signals)", lambda: proc.on_frame(frame)),
+                     ("BoxDetector.process", direct),
+                     ("Pipeline.push (callbacks)", lambda: pipeline.push(frame))):
+        elapsed = _timeit(fn, args.n)
+        sink.clear()
+        _report(name, args.n, elapsed)
+
+
+def bench_startup(args):
+    """GUI time to window and to the first frame (main.py --startup-report, images, best of 3)."""
+    import re
+    import subprocess
+    import sys
+    here = os.path.dirname(os.path.abspath(__file__))
+    image = os.path.join(here, 'experiment', 'images', '1.jpeg')
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    best = {}
+    for _ in range(3):
+        out = subprocess.run([sys.executable, 'main.py', '--startup-report', '--images', image, '--start'],
+                             cwd=here, env=env, capture_output=True, text=True, timeout=60).stdout
+        for name, ms in re.findall(r"^  (\S.*?)\s+([\d.]+) ms$", out, re.M):
+            best[name] = min(best.get(name, float('inf')), float(ms))
+    for name, ms in best.items():
+        print(f"  {name:<44} {ms:8.1f} ms")
+
+
+class _BackgroundMock:
+    """Runs mock_server.MockFPGAServer (TCP and UDP) on its own event loop thread."""
+    def __init__(self, **kwargs):
+        from mock_server import MockFPGAServer
+        self.server = MockFPGAServer('127.0.0.1', 0, **kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._srv = self._loop.run_until_complete(self.server.start())
+        self._udp = self._loop.run_until_complete(self.server.start_udp())
+        self.port = self.server.port
+        self._ready.set()
+        self._loop.run_forever()
+        tasks = asyncio.all_tasks(self._loop)
+        for task in tasks:
+            task.cancel()
+        self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+
+    def __enter__(self):
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def __exit__(self, *exc):
+        self._loop.call_soon_threadsafe(self._srv.close)
+        self._loop.call_soon_threadsafe(self._udp.close)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=1.0)
+
+
+def bench_link(args):
+    """Single-ROI round trips over TCP and UDP against a local mock server."""
+    rois = _sample_rois()
+    with _BackgroundMock() as mock:
+        for name, make in (("tcp round trip", FPGATransport), ("udp round trip", UDPTransport)):
+            with make('127.0.0.1', mock.port) as transport:
+                lat = np.empty(args.n)
+                t0 = time.perf_counter()
+                for i in range(args.n):
+                    t = time.perf_counter()
+                    transport.classify(rois[i % len(rois)])
+                    lat[i] = time.perf_counter() - t
+                elapsed = time.perf_counter() - t0
+            p50, p99 = np.percentile(lat, [50, 99]) * 1e6
+            _report(name, args.n, elapsed, f"p50 {p50:7.1f} µs  p99 {p99:7.1f} µs")
+
+
+def _run_batches(backend, rois: list, batch: int, n: int) -> tuple:
+    """Classify `n` batches of `batch` ROIs; (elapsed, per-batch latencies)."""
+    lat = np.empty(n)
+    t0 = time.perf_counter()
+    for i in range(n):
+        start = (i * batch) % len(rois)
+        chunk = rois[start:start + batch]
+        t = time.perf_counter()
+        backend.classify_batch(chunk)
+        lat[i] = time.perf_counter() - t
+    return time.perf_counter() - t0, lat
+
+
+def bench_backends(args):
+    """Same ROI batches through the board protocol (mock) and the CPU model."""
+    rois = _sample_rois()
+    n = max(args.n // 10, 50)
+    backends = []
+    if os.path.exists(args.model):
+        for threads in sorted({1, args.threads}):
+            backends.append((f"cpu onnx ×{threads} threads",
+                             lambda t=threads: OnnxBackend(args.model, intra_op_threads=t)))
+    else:
+        print(f"  (no model at {args.model}; CPU backend skipped)")
+
+    with _BackgroundMock() as mock:
+        backends[:0] = [("fpga tcp (mock)", lambda: FPGATransport('127.0.0.1', mock.port)),
+                        ("fpga udp (mock)", lambda: UDPTransport('127.0.0.1', mock.port))]
+        for batch in (1, 4, 32):
+            for name, make in backends:
+                with make() as backend:
+                    elapsed, lat = _run_batches(backend, rois, batch, n)
+                p50, p99 = np.percentile(lat, [50, 99]) * 1e6
+                _report(f"{name} batch={batch}", n * batch, elapsed,
+                        f"p50 {p50:8.1f} µs  p99 {p99:8.1f} µs per batch")
+
+
+def bench_stream(args):
+    """Feeding the send path: image files vs. packed uint8/float32 memmaps."""
+    import cv2
+    from providers.dataset import DatasetWriter, ROIDataset
+    n_rois = 2000
+    rois = _sample_rois(n_rois)
+    serializer = ROISerializer()
+    sink = bytearray(ROI_BYTES)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = []
+        for i, roi in enumerate(rois):
+            files.append(os.path.join(tmp, f"{i}.png"))
+            cv2.imwrite(files[-1], roi)
+        for dtype in ('uint8', 'float32'):
+            with DatasetWriter(os.path.join(tmp, f"{dtype}.rois"), dtype) as writer:
+                for roi in rois:
+                    writer.append(roi)
+
+        def from_files():
+            for file in files:
+                view = serializer.pack(cv2.imread(file, cv2.IMREAD_COLOR))
+                sink[:] = view
+
+        def from_packed(dtype):
+            ds = ROIDataset(os.path.join(tmp, f"{dtype}.rois"))
+            if dtype == 'float32':
+                # already the board payload: each row goes out as is
+                for row in ds.images:
+                    sink[:] = memoryview(row).cast('B')
+            else:
+                for row in ds.images:
+                    sink[:] = serializer.pack(row)
+
+        for name, fn in (("png files (imread)", from_files),
+                         ("packed uint8 memmap", lambda: from_packed('uint8')),
+                         ("packed float32 memmap", lambda: from_packed('float32'))):
+            reps = 5
+            elapsed = _timeit(fn, reps)
+            _report(name, reps * n_rois, elapsed, "ROIs into the send buffer")
+
+
+BENCHES = {
+    'serialize': bench_serialize,
+    'detect': bench_detect,
+    'extract': bench_extract,
+    'adaptive': bench_adaptive,
+    'rectify': bench_rectify,
+    'budget': bench_budget,
+    'streams': bench_streams,
+    'quality': bench_quality,
+    'import': bench_import,
+    'dispatch': bench_dispatch,
+    'startup': bench_startup,
+    'link': bench_link,
+    'backends': bench_backends,
+    'stream': bench_stream,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('benches', nargs='*', help=f"any of: {', '.join(BENCHES)}")
+    parser.add_argument('-n', type=int, default=5000, help="iterations per benchmark")
+    parser.add_argument('--model', default="digits.onnx", help="ONNX digit model for the CPU backend")
+    parser.add_argument('--threads', type=int, default=4, help="intra-op threads for the CPU backend")
+    args = parser.parse_args()
+
+    unknown = set(args.benches) - set(BENCHES)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    for name in args.benches or BENCHES:
+        print(f"[{name}] {BENCHES[name].__doc__}")
+        BENCHES[name](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+Connection broker: holds the single persistent connection each board
+accepts and lets any number of local clients share the boards.
+
+    python broker.py --board 192.168.1.10:7 --board 192.168.1.11:7 \\
+                     --listen 127.0.0.1:7000 --unix /tmp/fpga-broker.sock
+
+Clients speak the board protocol to the broker (FPGATransport works
+unchanged; a host starting with '/' is a Unix socket path). The broker
+ACKs packets 1–3 itself, queues each complete ROI per client and hands
+them to the boards round-robin across clients, so a batch job with a
+deep backlog cannot starve a live capture station. A ROI whose board
+connection fails is retried on the next free board.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import time
+from collections import deque
+
+from providers.transport import ACK_SIZE, PACKET_SIZE, PACKETS_PER_ROI, RESULT_SIZE, ROI_BYTES
+
+ACK = b'\x01'
+
+
+class Request:
+    __slots__ = ('client', 'payload', 'future', 'attempts', 'queued')
+
+    def __init__(self, client, payload: bytes, future: asyncio.Future):
+        self.client = client
+        self.payload = payload
+        self.future = future
+        self.attempts = 0
+        self.queued = time.monotonic()
+
+
+class FairQueue:
+    """
+    One FIFO per client, served round-robin: get() takes the head of the
+    next client in the ring that has work, so every active client gets
+    an equal share of the boards whatever its queue depth.
+    """
+    def __init__(self):
+        self._queues: dict = {}
+        self._ring: deque = deque()     # clients with pending requests
+        self._waiters: deque = deque()
+
+    def __len__(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def put(self, request: Request, front: bool = False):
+        client = request.client
+        queue = self._queues.get(client)
+        if queue is None:
+            queue = self._queues[client] = deque()
+        if not queue:
+            # a retried request goes out next
+            self._ring.appendleft(client) if front else self._ring.append(client)
+        queue.appendleft(request) if front else queue.append(request)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    async def get(self) -> Request:
+        while not self._ring:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            await waiter
+        client = self._ring.popleft()
+        queue = self._queues[client]
+        request = queue.popleft()
+        if queue:
+            self._ring.append(client)
+        return request
+
+    def drop(self, client) -> list:
+        """Remove a client and return its pending requests."""
+        queue = self._queues.pop(client, None) or deque()
+        try:
+            self._ring.remove(client)
+        except ValueError:
+            pass
+        return list(queue)
+
+
+class BoardLink:
+    """
+    The broker's connection to one board: takes requests from the shared
+    queue one at a time (the protocol is strictly request/response) and
+    reconnects with backoff when the board goes away.
+    """
+    def __init__(self, host: str, port: int, queue: FairQueue, timeout: float = 2.0,
+                 retries: int = 2, verbose: bool = False):
+        self.host = host
+        self.port = port
+        self.queue = queue
+        self.timeout = timeout
+        self.retries = retries
+        self.verbose = verbose
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+
+        # counters
+        self.served = 0
+        self.failures = 0
+        self.busy = 0.0     # seconds spent on requests
+
+    @property
+    def name(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        print(f"[+] Board {self.name} connected")
+
+    def _close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def _classify(self, payload: bytes) -> bytes:
+        reader, writer = self._reader, self._writer
+        for i in range(PACKETS_PER_ROI):
+            writer.write(payload[PACKET_SIZE * i:PACKET_SIZE * (i + 1)])
+            await writer.drain()
+            if i < PACKETS_PER_ROI - 1:
+                await reader.readexactly(ACK_SIZE)
+        return await reader.readexactly(RESULT_SIZE)
+
+    async def run(self):
+        backoff = 0.1
+        while True:
+            if self._writer is None:
+                try:
+                    await self._connect()
+                    backoff = 0.1
+                except (OSError, asyncio.TimeoutError) as e:
+                    if self.verbose:
+                        print(f"[!] Board {self.name}: {e or type(e).__name__}; retry in {backoff:.1f}s")
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 5.0)
+                    continue
+
+            request = await self.queue.get()
+            if request.future.done():   # client gone
+                continue
+            t0 = time.monotonic()
+            try:
+                result = await asyncio.wait_for(self._classify(request.payload), self.timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                # the stream is out of sync: drop the connection, retry elsewhere
+                self._close()
+                self.failures += 1
+                request.attempts += 1
+                print(f"[!] Board {self.name} failed: {e or type(e).__name__}")
+                if request.attempts <= self.retries:
+                    self.queue.put(request, front=True)
+                else:
+                    request.future.set_exception(ConnectionError(f"board {self.name} failed"))
+                continue
+            finally:
+                self.busy += time.monotonic() - t0
+            self.served += 1
+            if not request.future.done():
+                request.future.set_result(result)
+
+
+class Broker:
+    """Accepts clients on TCP and/or a Unix socket and feeds the board links."""
+    def __init__(self, boards: list, timeout: float = 2.0, retries: int = 2,
+                 verbose: bool = False):
+        self.queue = FairQueue()
+        self.links = [BoardLink(host, port, self.queue, timeout, retries, verbose)
+                      for host, port in boards]
+        self.verbose = verbose
+        self.served: dict = {}      # client name → ROIs answered
+        self._ids = itertools.count(1)
+        self._started = time.monotonic()
+
+    async def _handle_client(self, reader: asyncio.StreamReader,
+                             writer: asyncio.StreamWriter):
+        client = next(self._ids)
+        name = f"#{client} {writer.get_extra_info('peername') or 'unix'}"
+        print(f"[+] Client {name} connected")
+        loop = asyncio.get_running_loop()
+        payload = bytearray(ROI_BYTES)
+        try:
+            while True:
+                for i in range(PACKETS_PER_ROI):
+                    payload[PACKET_SIZE * i:PACKET_SIZE * (i + 1)] = \
+                        await reader.readexactly(PACKET_SIZE)
+                    if i < PACKETS_PER_ROI - 1:
+                        writer.write(ACK)
+                request = Request(client, bytes(payload), loop.create_future())
+                self.queue.put(request)
+                writer.write(await request.future)
+                await writer.drain()
+                self.served[name] = self.served.get(name, 0) + 1
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for request in self.queue.drop(client):
+                request.future.cancel()
+            writer.close()
+            print(f"[*] Client {name} disconnected ({self.served.get(name, 0)} ROIs)")
+
+    def stats(self) -> str:
+        elapsed = time.monotonic() - self._started
+        lines = [f"queued {len(self.queue)}"]
+        for link in self.links:
+            lines.append(f"board {link.name}: {link.served} ROIs, {link.failures} failures, "
+                         f"{100 * link.busy / elapsed:.0f}% busy")
+        for name, n in self.served.items():
+            lines.append(f"client {name}: {n} ROIs")
+        return "\n".join(lines)
+
+    async def serve(self, listen: tuple | None = None, unix_path: str | None = None,
+                    report_every: float = 0.0):
+        servers = []
+        if listen is not None:
+            servers.append(await asyncio.start_server(self._handle_client, *listen,
+                                                      reuse_address=True))
+            self.port = servers[-1].sockets[0].getsockname()[1]
+            print(f"[+] Broker listening on {listen[0]}:{self.port}")
+        if unix_path is not None:
+            if os.path.exists(unix_path):
+                os.remove(unix_path)
+            servers.append(await asyncio.start_unix_server(self._handle_client, unix_path))
+            print(f"[+] Broker listening on {unix_path}")
+        tasks = [asyncio.create_task(link.run()) for link in self.links]
+        try:
+            while True:
+                await asyncio.sleep(report_every or 3600)
+                if report_every:
+                    print(self.stats())
+        finally:
+            for task in tasks:
+                task.cancel()
+            for server in servers:
+                server.close()
+            if unix_path is not None and os.path.exists(unix_path):
+                os.remove(unix_path)
+
+
+def _address(text: str, default_port: int) -> tuple:
+    host, _, port = text.rpartition(':')
+    return (host or '127.0.0.1', int(port)) if port.isdigit() else (text, default_port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--board', action='append', required=True,
+                        help="HOST[:PORT] of a board (repeat for several)")
+    parser.add_argument('--listen', default='127.0.0.1:7000', help="TCP HOST:PORT for clients ('' = off)")
+    parser.add_argument('--unix', default=None, help="Unix socket path for clients")
+    parser.add_argument('--timeout', type=float, default=2.0, help="per-ROI board timeout (s)")
+    parser.add_argument('--retries', type=int, default=2, help="board attempts per ROI after the first")
+    parser.add_argument('--report', type=float, default=0.0, help="print stats every N seconds")
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args()
+
+    broker = Broker([_address(b, 7) for b in args.board], args.timeout, args.retries, args.verbose)
+    listen = _address(args.listen, 7000) if args.listen else None
+    try:
+        asyncio.run(broker.serve(listen, args.unix, args.report))
+    except KeyboardInterrupt:
+        print(broker.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+# The client's processing without Qt: frame packets, detection,
+# preprocessing, grouping and inference dispatch. The Qt classes in
+# processors/ and providers/ are thin adapters around these.
+from .packet import *
+from .region import *
+from .rectify import *
+from .motion import *
+from .detect import *
+from .adaptive import *
+from .filter import *
+from .grouping import *
+from .yolo import *
+from .source import *
+from .infer import *
+from .pipeline import *
+from .streams import *
+from .quality import *
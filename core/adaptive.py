@@ -0,0 +1,116 @@
+import cv2
+import numpy as np
+
+from .boxes import merge_rects
+from .detect import BoxDetector, downscale, map_rects, square_boxes
+
+
+def adaptive_binary(gray, block_size: int = 25, c: int = 10, median: int = 5):
+    """
+    The reference client's binarization (Reference/real_time_num.py):
+    Gaussian adaptive threshold over block_size×block_size neighbourhoods
+    minus `c`, then a median blur against speckle. Inverted, so ink is 255.
+    """
+    binary = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                   cv2.THRESH_BINARY_INV, block_size, c)
+    return cv2.medianBlur(binary, median) if median > 1 else binary
+
+
+def foreground_bbox(binary, pad: int = 0) -> tuple | None:
+    """
+    (x1, y1, x2, y2) of the nonzero pixels of a 2-D image, grown by `pad`
+    and clipped to the image; None if there are none. The reference's
+    get_roi visits every pixel in Python; here the row and column
+    projections are reduced at once and argmax finds their first and
+    last nonzero entries.
+    """
+    rows = binary.any(axis=1)
+    if not rows.any():
+        return None
+    cols = binary.any(axis=0)
+    h, w = binary.shape[:2]
+    y1, y2 = int(rows.argmax()), h - int(rows[::-1].argmax())
+    x1, x2 = int(cols.argmax()), w - int(cols[::-1].argmax())
+    return max(x1 - pad, 0), max(y1 - pad, 0), min(x2 + pad, w), min(y2 + pad, h)
+
+
+class AdaptiveDetector(BoxDetector):
+    """
+    The reference client's digit detector as a BoxDetector: same
+    process() interface, search region, motion gate, merging and ROI
+    budget, but a different way to find the candidate rects.
+
+    Frames are shrunk to `work_width` pixels wide (never enlarged), the
+    width of the webcam frames the reference ran on, so its pixel
+    constants keep their meaning at any resolution; the search window is
+    cut out at that scale. It is binarized by adaptive_binary, so uneven
+    lighting and shadows across the panel do not matter the way they do
+    for BoxDetector's global Otsu threshold.
+    Detection is restricted to foreground_bbox of the ink. Ink blobs
+    whose bounding rect is min_size (w, h) to max_size pixels are kept,
+    grown by `pad` on every side as in the reference's small-ROI pass,
+    then merged, made square and filtered as in BoxDetector. All rect
+    filtering runs as NumPy masks over connected-component stats, where
+    the reference looped over Canny contours.
+
+    detect_scale and extractor are not used; min_area only applies at
+    full resolution, after mapping back (0 by default).
+    """
+    def __init__(self, block_size: int = 25, c: int = 10, median: int = 5,
+                 min_size: tuple = (5, 15), max_size: int = 200, pad: int = 10,
+                 work_width: int = 640, **options):
+        options.setdefault('min_area', 0)
+        super().__init__(**options)
+        self.block_size = block_size
+        self.c = c
+        self.median = median
+        self.min_size = min_size
+        self.max_size = max_size
+        self.pad = pad
+        self.work_width = work_width
+
+    def _binarize(self, image, frame_shape):
+        """Gray + adaptive_binary of the window at work_width, masked by the region."""
+        scale = self.work_width / frame_shape[1]
+        small = downscale(image, scale) if scale < 1.0 else image
+        binary = adaptive_binary(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY),
+                                 self.block_size, self.c, self.median)
+        region = self.search_region
+        if region is not None and region.has_mask:
+            mask = region.mask(frame_shape, (binary.shape[1], binary.shape[0]))
+            cv2.bitwise_and(binary, mask, dst=binary)
+        return binary
+
+    def rects(self, binary) -> np.ndarray:
+        """Padded N×4 (x, y, w, h) rects of the ink blobs of a work_width binary image."""
+        bbox = foreground_bbox(binary)
+        if bbox is None:
+            return np.empty((0, 4), dtype=np.int64)
+        bx, by, bx2, by2 = bbox
+        _, _, stats, _ = cv2.connectedComponentsWithStatsWithAlgorithm(
+            binary[by:by2, bx:bx2], 8, cv2.CV_32S, cv2.CCL_GRANA
+        )
+        x, y, w, h = stats[1:, :4].astype(np.int64).T    # label 0 is background
+        min_w, min_h = self.min_size
+        keep = (w >= min_w) & (h >= min_h) & (w <= self.max_size) & (h <= self.max_size)
+        x, y, w, h = x[keep] + bx, y[keep] + by, w[keep], h[keep]
+
+        # pad and clip to the image, as the reference does
+        h_small, w_small = binary.shape
+        x1, y1 = np.maximum(x - self.pad, 0), np.maximum(y - self.pad, 0)
+        x2 = np.minimum(x + w + self.pad, w_small)
+        y2 = np.minimum(y + h + self.pad, h_small)
+        return np.stack([x1, y1, x2 - x1, y2 - y1], axis=1)
+
+    def _boxes(self, window, frame_shape):
+        h_img, w_img = window.shape[:2]
+        binary = self._binarize(window, frame_shape)
+        rects = self.rects(binary)
+        h_small, w_small = binary.shape
+        if (h_small, w_small) != (h_img, w_img):
+            rects = map_rects(rects, w_small / w_img, h_small / h_img,
+                              w_small, h_small, w_img, h_img)
+        rects = rects[rects[:, 2] * rects[:, 3] >= self.detect_min_area]
+        if self.merge_overlap is not None:
+            rects = merge_rects(rects, self.merge_overlap)
+        return square_boxes(rects, w_img, h_img, self.max_frac)
@@ -0,0 +1,81 @@
+import numpy as np
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_thresh: float = 0.45,
+        classes: np.ndarray | None = None, max_det: int = 300) -> np.ndarray:
+    """
+    Greedy non-maximum suppression; each step compares the best remaining
+    box against all others at once. With `classes`, boxes of different
+    classes never suppress each other (they are shifted apart).
+    Returns the kept indices, best score first.
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+    if classes is not None:
+        boxes = boxes + (classes * (boxes.max() + 1))[:, None]
+    x1, y1, x2, y2 = boxes.T
+    areas = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    order = np.argsort(-scores, kind='stable')
+    keep = []
+    while order.size and len(keep) < max_det:
+        i, rest = order[0], order[1:]
+        keep.append(i)
+        w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = w * h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_thresh]
+    return np.array(keep, dtype=np.int64)
+
+
+def merge_rects(rects, min_overlap: float = 0.5) -> np.ndarray:
+    """
+    Merge N×4 (x, y, w, h) rects that are nested or overlap by at least
+    `min_overlap` of the smaller one into their union, transitively (a
+    digit broken into pieces by the threshold becomes one rect again).
+    All pairs are compared at once; groups are found by propagating the
+    lowest index over the overlap graph. Returns the merged rects, in
+    order of each group's first rect.
+    """
+    rects = np.asarray(rects, dtype=np.int64).reshape(-1, 4)
+    n = len(rects)
+    if n < 2:
+        return rects
+    x1, y1 = rects[:, 0], rects[:, 1]
+    x2, y2 = x1 + rects[:, 2], y1 + rects[:, 3]
+    w = np.clip(np.minimum(x2[:, None], x2) - np.maximum(x1[:, None], x1), 0, None)
+    h = np.clip(np.minimum(y2[:, None], y2) - np.maximum(y1[:, None], y1), 0, None)
+    area = rects[:, 2] * rects[:, 3]
+    smaller = np.maximum(np.minimum(area[:, None], area), 1)
+    adjacent = w * h >= min_overlap * smaller
+    if adjacent.sum() == n:     # only the diagonal: nothing to merge
+        return rects
+
+    labels = np.arange(n)
+    while True:
+        merged = np.where(adjacent, labels, n).min(axis=1)
+        merged = merged[merged]     # follow the chain to its root
+        if np.array_equal(merged, labels):
+            break
+        labels = merged
+
+    groups, first = np.unique(labels, return_index=True)
+    index = np.searchsorted(groups, labels)
+    out_x1 = np.full(len(groups), np.iinfo(np.int64).max)
+    out_y1 = out_x1.copy()
+    out_x2 = np.full(len(groups), np.iinfo(np.int64).min)
+    out_y2 = out_x2.copy()
+    np.minimum.at(out_x1, index, x1)
+    np.minimum.at(out_y1, index, y1)
+    np.maximum.at(out_x2, index, x2)
+    np.maximum.at(out_y2, index, y2)
+    order = np.argsort(first, kind='stable')
+    return np.stack([out_x1, out_y1, out_x2 - out_x1, out_y2 - out_y1], axis=1)[order]
+
+
+def top_k(scores, k: int) -> np.ndarray:
+    """Indices of the `k` highest scores (ties: lower index first), in index order."""
+    scores = np.asarray(scores)
+    if len(scores) <= k:
+        return np.arange(len(scores))
+    return np.sort(np.argsort(-scores, kind='stable')[:k])
@@ -0,0 +1,47 @@
+import cv2
+
+
+def preprocess_roi(roi):
+    """
+    The ROIFilter pipeline for one BGR ROI: gray, contrast ×2, binary
+    threshold at 175, 35 px white padding, 32×32 INTER_AREA, back to BGR.
+    A pure function, so offline evaluation runs exactly what the client
+    sends to the board.
+    """
+    # 1) Grayscale
+    gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+
+    # 2) Increase contrast
+    contrast = cv2.convertScaleAbs(gray, alpha=2.0, beta=0)
+
+    # 3) Threshold the contrast image to create a binary image where both
+    #    dark and light regions are separated
+    _, thresholded = cv2.threshold(contrast, 175, 255, cv2.THRESH_BINARY)
+
+    # 4) Pad 35px border (white)
+    padded = cv2.copyMakeBorder(
+        thresholded,
+        top=35, bottom=35,
+        left=35, right=35,
+        borderType=cv2.BORDER_CONSTANT,
+        value=255  # White padding
+    )
+
+    # 5) Resize back to 32×32
+    small = cv2.resize(padded, (32, 32), interpolation=cv2.INTER_AREA)
+
+    # 6) Convert back to BGR for uniform downstream handling
+    return cv2.cvtColor(small, cv2.COLOR_GRAY2BGR)
+
+
+def preprocess_batch(batch, gate=None):
+    """
+    Replace an ROIBatch's crops with their preprocess_roi output, in place.
+    With a QualityGate, batch.accepted is set from the raw crops'
+    sharpness and the preprocessed ROIs' shape.
+    """
+    sharpness = gate.sharpness(batch.rois) if gate is not None else None
+    batch.rois = [preprocess_roi(roi) for roi in batch.rois]
+    if gate is not None:
+        batch.accepted = gate.check(batch.rois, sharpness)
+    return batch
@@ -0,0 +1,92 @@
+import numpy as np
+
+from .packet import ROIBatch
+
+
+def _as_boxes(boxes) -> np.ndarray:
+    return np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+
+
+def line_groups(boxes, gap: float = 0.6, min_overlap: float = 0.5) -> np.ndarray:
+    """
+    Build number boxes from N×4 digit boxes (x1, y1, x2, y2) when no
+    larger ROIs are available: digits join a number when they overlap
+    vertically by `min_overlap` of the smaller height and the horizontal
+    gap is below `gap` × digit height. Sorted sweep over x; only groups
+    still within reach stay active, so the cost is ~O(N log N).
+    Returns M×4 number boxes.
+    """
+    boxes = _as_boxes(boxes)
+    order = np.argsort(boxes[:, 0], kind='stable')
+    groups = []     # [x1, y1, x2, y2]
+    active = []     # indices into groups
+    for i in order:
+        x1, y1, x2, y2 = boxes[i].tolist()
+        h = y2 - y1
+        active = [g for g in active if groups[g][2] + gap * h >= x1]
+        best, best_overlap = None, 0.0
+        for g in active:
+            gx1, gy1, gx2, gy2 = groups[g]
+            overlap = min(y2, gy2) - max(y1, gy1)
+            frac = overlap / max(1, min(h, gy2 - gy1))
+            if frac >= min_overlap and frac > best_overlap:
+                best, best_overlap = g, frac
+        if best is None:
+            groups.append([x1, y1, x2, y2])
+            active.append(len(groups) - 1)
+        else:
+            grp = groups[best]
+            grp[0], grp[1] = min(grp[0], x1), min(grp[1], y1)
+            grp[2], grp[3] = max(grp[2], x2), max(grp[3], y2)
+    return _as_boxes(groups)
+
+
+def group_digits(boxes, labels, number_boxes=None) -> dict:
+    """
+    Group per-digit results into multi-digit numbers read left to right,
+    as Reference/real_time_num.py:get_big_roi does, without its per-ROI
+    re-sort and O(N·M) containment scan: digits are sorted by x once and
+    each number box only tests the slice found by binary search.
+
+    boxes         N×4 digit boxes (x1, y1, x2, y2)
+    labels        N digit results; anything outside 0–9 is ignored
+    number_boxes  M×4 larger ROIs; built with line_groups() if None
+
+    Returns {'numbers': [{'value', 'box', 'digits'}, ...], 'sum'}.
+    """
+    boxes = _as_boxes(boxes)
+    labels = np.asarray([-1 if v is None else v for v in labels], dtype=np.int64)
+    valid = (labels >= 0) & (labels <= 9)
+    boxes, labels, index = boxes[valid], labels[valid], np.flatnonzero(valid)
+    if number_boxes is None:
+        number_boxes = line_groups(boxes)
+    number_boxes = _as_boxes(number_boxes)
+
+    order = np.argsort(boxes[:, 0], kind='stable')
+    boxes, labels, index = boxes[order], labels[order], index[order]
+    xs = boxes[:, 0]
+
+    numbers = []
+    for nx1, ny1, nx2, ny2 in number_boxes.tolist():
+        lo, hi = np.searchsorted(xs, [nx1, nx2], side='left')
+        cand = boxes[lo:hi]
+        inside = (cand[:, 1] >= ny1) & (cand[:, 2] <= nx2) & (cand[:, 3] <= ny2)
+        if not inside.any():
+            continue
+        digits = labels[lo:hi][inside]
+        value = int(''.join(str(d) for d in digits.tolist()))
+        numbers.append({
+            'value': value,
+            'box': (nx1, ny1, nx2, ny2),
+            'digits': index[lo:hi][inside].tolist(),
+        })
+    return {'numbers': numbers, 'sum': sum(n['value'] for n in numbers)}
+
+
+def group_batch(batch: ROIBatch) -> dict:
+    """group_digits() for a finished ROIBatch, tagged with its frame, detection and stream id."""
+    numbers = group_digits(batch.boxes, batch.labels)
+    numbers['frame_id'] = batch.frame_id
+    numbers['det_id'] = batch.det_id
+    numbers['stream_id'] = batch.stream_id
+    return numbers
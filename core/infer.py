@@ -0,0 +1,23 @@
+import time
+
+
+def run_batch(backend, rois: list, deadline: float | None = None,
+              cancelled=None, on_results=None) -> int:
+    """
+    Classify `rois` with `backend` in chunks of backend.batch_size,
+    calling on_results(index of the first ROI, results) after each chunk.
+    Before each chunk it stops if `cancelled()` returns True or the
+    time.monotonic() `deadline` has passed. Backend errors propagate.
+    Returns the number of ROIs classified.
+    """
+    index = 0
+    while index < len(rois):
+        if cancelled is not None and cancelled():
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        results = backend.classify_batch(rois[index:index + backend.batch_size], deadline)
+        if on_results is not None:
+            on_results(index, results)
+        index += len(results)
+    return index
@@ -0,0 +1,81 @@
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Cheap scene-change detector placed in front of detection. Each frame is
+    shrunk to a small gray thumbnail and compared with the thumbnail of the
+    last frame that was actually processed:
+      'diff'  mean absolute difference above `threshold` gray levels
+      'mog2'  foreground fraction of a MOG2 background model above `fg_frac`
+    Comparing against the last processed frame (not the previous one) keeps
+    slow drift from slipping through; `max_skip` forces a refresh anyway.
+    """
+    def __init__(
+        self,
+        method: str = 'diff',
+        threshold: float = 3.0,
+        fg_frac: float = 0.002,
+        width: int = 64,
+        max_skip: int = 60,
+    ):
+        self.method = method
+        self.threshold = threshold
+        self.fg_frac = fg_frac
+        self.width = width
+        self.max_skip = max_skip
+
+        self._reference: np.ndarray | None = None
+        self._mog2 = None
+        self._since_refresh = 0
+
+        # counters
+        self.frames = 0
+        self.skipped = 0
+
+    @property
+    def skip_ratio(self) -> float:
+        return self.skipped / self.frames if self.frames else 0.0
+
+    def reset(self):
+        self._reference = None
+        self._mog2 = None
+        self._since_refresh = 0
+
+    def _thumbnail(self, frame) -> np.ndarray:
+        h, w = frame.shape[:2]
+        size = (self.width, max(1, round(h * self.width / w)))
+        # subsample with a stride first so only a fraction of the frame is
+        # read, then average down to the thumbnail
+        step = max(1, w // (4 * self.width))
+        small = cv2.resize(frame[::step, ::step], size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+
+    def changed(self, frame) -> bool:
+        """True if `frame` must go through detection."""
+        self.frames += 1
+        thumb = self._thumbnail(frame)
+
+        if self.method == 'mog2':
+            if self._mog2 is None:
+                self._mog2 = cv2.createBackgroundSubtractorMOG2(
+                    history=100, varThreshold=25, detectShadows=False
+                )
+            fg = self._mog2.apply(thumb)
+            moved = self._reference is None or np.count_nonzero(fg) > self.fg_frac * fg.size
+        else:
+            moved = (
+                self._reference is None
+                or self._reference.shape != thumb.shape
+                or cv2.norm(thumb, self._reference, cv2.NORM_L1) / thumb.size > self.threshold
+            )
+
+        if moved or self._since_refresh >= self.max_skip:
+            self._reference = thumb
+            self._since_refresh = 0
+            return True
+
+        self._since_refresh += 1
+        self.skipped += 1
+        return False
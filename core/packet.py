@@ -0,0 +1,111 @@
+import itertools
+import time
+
+import numpy as np
+
+
+def as_boxes(boxes) -> np.ndarray:
+    """N×4 int32 (x1, y1, x2, y2), the box layout every stage passes on."""
+    return np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+
+
+NO_BOXES = as_boxes([])
+NO_BOXES.flags.writeable = False
+
+_frame_ids = itertools.count(1)
+
+
+class FramePacket:
+    """
+    One grabbed frame on its way to the display. The grabber stamps
+    `frame_id` (increasing), `t_grab` (time.monotonic()) and `stream_id`
+    (which camera, 0 with a single source); the detector
+    sets `boxes` and `det_id`, the detection those boxes came from (frames
+    skipped by the motion gate keep the previous detection's id and boxes).
+    """
+    __slots__ = ('frame_id', 't_grab', 'stream_id', 'image', 'boxes', 'det_id')
+
+    def __init__(self, image: np.ndarray, frame_id: int | None = None,
+                 t_grab: float | None = None, stream_id: int = 0):
+        self.frame_id = next(_frame_ids) if frame_id is None else frame_id
+        self.t_grab = time.monotonic() if t_grab is None else t_grab
+        self.stream_id = stream_id
+        self.image = image
+        self.boxes = NO_BOXES
+        self.det_id = 0
+
+    @classmethod
+    def of(cls, frame) -> 'FramePacket':
+        """`frame` itself if it is a packet, else a new packet around the array."""
+        return frame if isinstance(frame, cls) else cls(frame)
+
+    def __repr__(self) -> str:
+        return (f"FramePacket(frame_id={self.frame_id}, stream_id={self.stream_id}, "
+                f"det_id={self.det_id}, {len(self.boxes)} boxes)")
+
+
+class ROIBatch:
+    """
+    The ROIs of one detection and everything that happens to them, as one
+    object handed down the pipeline (detector → filter → inference →
+    display/grouping/recording). Each stage fills in its fields and passes
+    the batch on, so results stay attached to their boxes and frame
+    without any stage keeping state about "the current batch".
+
+    stream_id  the camera the frame came from (see FramePacket)
+    boxes      N×4 int32 (x1, y1, x2, y2) in frame coordinates
+    rois       N ROI images: crops from the detector, 32×32 after ROIFilter
+    results    N int64 inference results, -1 = none (not sent, rejected,
+               cancelled, timed out)
+    accepted   N bool, False for ROIs the quality gate rejected; only
+               accepted ROIs are sent
+    batch_id   inference batch id, 0 = not sent
+    superseded a newer batch replaced this one before it was sent
+    t_*        time.monotonic() when the frame was grabbed, the boxes were
+               found, the batch was sent and its last result arrived
+    """
+    __slots__ = ('frame_id', 'det_id', 'stream_id', 'boxes', 'rois', 'results', 'accepted',
+                 'batch_id', 'superseded', 't_grab', 't_detect', 't_sent', 't_done')
+
+    def __init__(self, frame_id: int, det_id: int, boxes, rois: list,
+                 t_grab: float = 0.0, stream_id: int = 0):
+        self.frame_id = frame_id
+        self.det_id = det_id
+        self.stream_id = stream_id
+        self.boxes = as_boxes(boxes)
+        self.rois = rois
+        self.results = np.full(len(rois), -1, dtype=np.int64)
+        self.accepted = np.ones(len(rois), dtype=bool)
+        self.batch_id = 0
+        self.superseded = False
+        self.t_grab = t_grab
+        self.t_detect = time.monotonic()
+        self.t_sent = 0.0
+        self.t_done = 0.0
+
+    @classmethod
+    def from_packet(cls, packet: FramePacket, rois: list) -> 'ROIBatch':
+        return cls(packet.frame_id, packet.det_id, packet.boxes, rois, packet.t_grab,
+                   packet.stream_id)
+
+    def __len__(self) -> int:
+        return len(self.rois)
+
+    @property
+    def send_index(self) -> np.ndarray:
+        """Indexes of the accepted ROIs, in order."""
+        return np.flatnonzero(self.accepted)
+
+    @property
+    def labels(self) -> list:
+        """Results as a list, None where there is none."""
+        return [None if r < 0 else r for r in self.results.tolist()]
+
+    @property
+    def latency(self) -> float:
+        """Grab to last result, in seconds (0 if not finished)."""
+        return self.t_done - self.t_grab if self.t_done else 0.0
+
+    def __repr__(self) -> str:
+        return (f"ROIBatch(frame_id={self.frame_id}, stream_id={self.stream_id}, "
+                f"det_id={self.det_id}, {len(self)} ROIs, batch_id={self.batch_id})")
@@ -0,0 +1,43 @@
+import time
+
+from .filter import preprocess_batch
+from .infer import run_batch
+from .packet import ROIBatch
+
+
+class Pipeline:
+    """
+    The client's frame path without Qt: detect → preprocess → classify,
+    run synchronously in the calling thread. `detector` is anything with
+    process(frame) -> (packet, batch | None) (BoxDetector, YoloModel);
+    without a backend batches come back with results -1. on_frame gets
+    every FramePacket, on_batch every finished ROIBatch.
+    """
+    def __init__(self, detector, backend=None, preprocess=preprocess_batch,
+                 on_frame=None, on_batch=None):
+        self.detector = detector
+        self.backend = backend
+        self.preprocess = preprocess
+        self.on_frame = on_frame
+        self.on_batch = on_batch
+
+    def push(self, frame, deadline: float | None = None) -> ROIBatch | None:
+        """Run one frame through; returns its ROIBatch, if any."""
+        packet, batch = self.detector.process(frame)
+        if self.on_frame is not None:
+            self.on_frame(packet)
+        if batch is None:
+            return None
+        if self.preprocess is not None:
+            self.preprocess(batch)
+        send = batch.send_index
+        if self.backend is not None and len(send):
+            def store(index, results):
+                batch.results[send[index:index + len(results)]] = results
+
+            batch.t_sent = time.monotonic()
+            run_batch(self.backend, [batch.rois[i] for i in send], deadline, on_results=store)
+        batch.t_done = time.monotonic()
+        if self.on_batch is not None:
+            self.on_batch(batch)
+        return batch
@@ -0,0 +1,129 @@
+import threading
+
+import cv2
+import numpy as np
+
+
+def gray_stack(rois: list, size: int) -> np.ndarray:
+    """The crops as one N×size×size float32 gray stack (INTER_AREA)."""
+    out = np.empty((len(rois), size, size), dtype=np.float32)
+    for i, roi in enumerate(rois):
+        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY) if roi.ndim == 3 else roi
+        out[i] = cv2.resize(gray, (size, size), interpolation=cv2.INTER_AREA)
+    return out
+
+
+def laplacian_variance(stack: np.ndarray) -> np.ndarray:
+    """Variance of the 4-neighbour Laplacian of each image of an N×H×W stack."""
+    s = stack
+    lap = (s[:, :-2, 1:-1] + s[:, 2:, 1:-1] + s[:, 1:-1, :-2] + s[:, 1:-1, 2:]
+           - 4 * s[:, 1:-1, 1:-1])
+    return lap.reshape(len(s), -1).var(axis=1)
+
+
+def gradient_energy(stack: np.ndarray) -> np.ndarray:
+    """Mean squared central-difference gradient of each image of an N×H×W stack."""
+    s = stack
+    gx = (s[:, 1:-1, 2:] - s[:, 1:-1, :-2]) / 2
+    gy = (s[:, 2:, 1:-1] - s[:, :-2, 1:-1]) / 2
+    return (gx * gx + gy * gy).reshape(len(s), -1).mean(axis=1)
+
+
+def sharpness(rois: list, size: int = 48) -> np.ndarray:
+    """
+    Laplacian variance over gradient energy of each raw (BGR or gray)
+    crop, resized to size×size. Both grow with the length and contrast
+    of the edges, so the ratio only measures how steep they are (it
+    falls with the square of the edge width): bold or thin strokes,
+    bright or dim, sharp digits score ~2.4-3.5, motion-blurred ones and
+    smooth non-digit blobs below ~2, flat crops 0.
+    """
+    if not rois:
+        return np.zeros(0)
+    stack = gray_stack(rois, size)
+    return laplacian_variance(stack) / np.maximum(gradient_energy(stack), 1.0)
+
+
+def foreground_shape(stack: np.ndarray, threshold: int = 128) -> tuple:
+    """
+    (fill, aspect) of the dark foreground of each image of an N×H×W
+    stack: the share of foreground pixels and the height / width of their
+    bounding box (0 for an empty image).
+    """
+    fg = stack < threshold
+    fill = fg.mean(axis=(1, 2))
+    rows, cols = fg.any(axis=2), fg.any(axis=1)
+    # extent = last - first foreground row (column) + 1, 0 if there is none
+    height = rows.shape[1] - rows[:, ::-1].argmax(axis=1) - rows.argmax(axis=1)
+    width = cols.shape[1] - cols[:, ::-1].argmax(axis=1) - cols.argmax(axis=1)
+    height = np.where(rows.any(axis=1), height, 0)
+    width = np.where(cols.any(axis=1), width, 0)
+    aspect = np.divide(height, width, out=np.zeros(len(stack)), where=width > 0)
+    return fill, aspect
+
+
+class QualityGate:
+    """
+    Drops crops that are unlikely to classify well before they are sent:
+    blurred or featureless ones (sharpness() of the raw crop below
+    min_sharpness), ones that binarize to almost nothing
+    or almost everything (foreground fill of the preprocessed ROI outside
+    [min_fill, max_fill]) and clipped or merged ones (foreground height /
+    width outside [min_aspect, max_aspect]). All scores are computed for
+    the whole batch at once.
+
+    `checked` counts the ROIs seen and `rejected` the ROIs dropped per
+    reason ('blur', 'fill', 'aspect'; a crop counts once, for the first
+    reason that applies). The counters are updated under a lock, so one
+    gate can be shared by several threads.
+    """
+    REASONS = ('blur', 'fill', 'aspect')
+
+    def __init__(self, min_sharpness: float = 2.2, min_fill: float = 0.01,
+                 max_fill: float = 0.4, min_aspect: float = 0.5, max_aspect: float = 5.0,
+                 size: int = 48):
+        self.min_sharpness = min_sharpness
+        self.min_fill = min_fill
+        self.max_fill = max_fill
+        self.min_aspect = min_aspect
+        self.max_aspect = max_aspect
+        self.size = size
+        self.checked = 0
+        self.rejected = dict.fromkeys(self.REASONS, 0)
+        self._lock = threading.Lock()
+
+    @property
+    def reject_ratio(self) -> float:
+        checked, rejected = self.counts()
+        return rejected / checked if checked else 0.0
+
+    def counts(self) -> tuple:
+        """(ROIs checked, ROIs rejected), read together."""
+        with self._lock:
+            return self.checked, sum(self.rejected.values())
+
+    def reset(self):
+        with self._lock:
+            self.checked = 0
+            self.rejected = dict.fromkeys(self.REASONS, 0)
+
+    def sharpness(self, rois: list) -> np.ndarray:
+        """sharpness() of each raw crop at this gate's size."""
+        return sharpness(rois, self.size)
+
+    def check(self, rois: list, sharpness: np.ndarray) -> np.ndarray:
+        """
+        Bool mask of the preprocessed `rois` worth sending, given the
+        sharpness of their raw crops; updates the counters.
+        """
+        if not rois:
+            return np.zeros(0, dtype=bool)
+        fill, aspect = foreground_shape(gray_stack(rois, rois[0].shape[0]))
+        blur = sharpness < self.min_sharpness
+        bad_fill = ~blur & ((fill < self.min_fill) | (fill > self.max_fill))
+        bad_aspect = ~blur & ~bad_fill & ((aspect < self.min_aspect) | (aspect > self.max_aspect))
+        with self._lock:
+            self.checked += len(rois)
+            for reason, mask in zip(self.REASONS, (blur, bad_fill, bad_aspect)):
+                self.rejected[reason] += int(mask.sum())
+        return ~(blur | bad_fill | bad_aspect)
@@ -0,0 +1,137 @@
+import json
+import os
+
+import cv2
+import numpy as np
+
+
+def order_corners(points) -> np.ndarray:
+    """
+    4×2 float32 corners as top-left, top-right, bottom-right, bottom-left,
+    whatever order they were clicked or detected in: sorted by angle
+    around their centroid, starting from the one nearest the origin.
+    """
+    pts = np.asarray(points, dtype=np.float32).reshape(4, 2)
+    centre = pts.mean(axis=0)
+    pts = pts[np.argsort(np.arctan2(pts[:, 1] - centre[1], pts[:, 0] - centre[0]))]
+    return np.roll(pts, -int(pts.sum(axis=1).argmin()), axis=0)
+
+
+class PanelRectifier:
+    """
+    Fronto-parallel view of the digit panel, from its four corners in the
+    pixels of a frame of `frame_size` (w, h; None: whatever frames come).
+    The output is `size` (w, h), by default the panel's mean edge lengths,
+    so detection runs on an image of just the panel at about the camera's
+    resolution. `max_width` shrinks it further, which is faster but
+    aliases thin strokes, as remap samples without averaging.
+
+    The homography and the cv2.remap tables for it (fixed-point, one
+    source position per output pixel) are computed once per frame size
+    and cached, so warp() does no projective maths per frame and only
+    visits the panel's pixels. `area_scale` is the rectified view's area
+    over the panel's area on the frame. Frames of another size than the
+    one the corners were taken on are handled by scaling the corners.
+    Persisted as JSON, like SearchRegion, so a fixed camera is
+    calibrated once.
+    """
+    def __init__(self, corners, size=None, frame_size=None, max_width: int | None = None):
+        self.corners = order_corners(corners)
+        self.frame_size = tuple(int(v) for v in frame_size) if frame_size else None
+        self.max_width = max_width
+        self.size = tuple(int(v) for v in size) if size else self._fit_size()
+        w, h = self.size
+        target = np.float32([[0, 0], [w, 0], [w, h], [0, h]])
+        self.homography = cv2.getPerspectiveTransform(self.corners, target)
+        self.area_scale = w * h / max(cv2.contourArea(self.corners), 1.0)
+        self._tables: dict = {}     # frame (h, w) → (inverse homography, map1, map2)
+
+    def _fit_size(self) -> tuple:
+        tl, tr, br, bl = self.corners
+        w = (np.linalg.norm(tr - tl) + np.linalg.norm(br - bl)) / 2
+        h = (np.linalg.norm(bl - tl) + np.linalg.norm(br - tr)) / 2
+        scale = min(1.0, self.max_width / max(w, 1.0)) if self.max_width else 1.0
+        return max(int(round(w * scale)), 1), max(int(round(h * scale)), 1)
+
+    def _table(self, shape) -> tuple:
+        """Inverse homography and remap tables for frames of `shape`, cached."""
+        key = shape[:2]
+        table = self._tables.get(key)
+        if table is not None:
+            return table
+        inverse = np.linalg.inv(self.homography)
+        if self.frame_size is not None and self.frame_size != (shape[1], shape[0]):
+            # the corners were taken on frames of another size
+            inverse = np.diag([shape[1] / self.frame_size[0], shape[0] / self.frame_size[1], 1.0]) @ inverse
+        w, h = self.size
+        xs, ys = np.meshgrid(np.arange(w, dtype=np.float32), np.arange(h, dtype=np.float32))
+        src = np.stack([xs, ys, np.ones_like(xs)], axis=-1) @ inverse.T.astype(np.float32)
+        map1, map2 = cv2.convertMaps(src[..., 0] / src[..., 2], src[..., 1] / src[..., 2],
+                                     cv2.CV_16SC2)
+        table = self._tables[key] = (inverse, map1, map2)
+        return table
+
+    def warp(self, frame) -> np.ndarray:
+        """The panel of `frame`, rectified to `size`."""
+        _, map1, map2 = self._table(frame.shape)
+        return cv2.remap(frame, map1, map2, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+    def to_frame(self, boxes, shape) -> np.ndarray:
+        """
+        N×4 (x1, y1, x2, y2) boxes on the rectified panel to the boxes
+        around their projection on a frame of `shape`, int32.
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        if len(boxes) == 0:
+            return np.empty((0, 4), dtype=np.int32)
+        inverse = self._table(shape)[0]
+        x1, y1, x2, y2 = boxes.T
+        corners = np.stack([np.stack([x1, y1], 1), np.stack([x2, y1], 1),
+                            np.stack([x2, y2], 1), np.stack([x1, y2], 1)], axis=1)
+        pts = cv2.perspectiveTransform(corners.reshape(-1, 1, 2), inverse).reshape(-1, 4, 2)
+        h, w = shape[:2]
+        out = np.concatenate([np.floor(pts.min(axis=1)), np.ceil(pts.max(axis=1))], axis=1)
+        return np.clip(out, 0, (w, h, w, h)).astype(np.int32)
+
+    @classmethod
+    def from_markers(cls, frame, dictionary: int = cv2.aruco.DICT_4X4_50, ids=None,
+                     **options) -> "PanelRectifier | None":
+        """
+        Calibrate from four ArUco markers placed on the panel's corners
+        (their centres are taken as the corners): those with `ids`, or the
+        only four found. None unless exactly four are found.
+        """
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        detector = cv2.aruco.ArucoDetector(cv2.aruco.getPredefinedDictionary(dictionary),
+                                           cv2.aruco.DetectorParameters())
+        found, found_ids, _ = detector.detectMarkers(gray)
+        if found_ids is None:
+            return None
+        centres = {int(i): c.reshape(4, 2).mean(axis=0) for i, c in zip(found_ids.ravel(), found)}
+        if ids is not None:
+            centres = {i: centres[i] for i in ids if i in centres}
+        if len(centres) != 4:
+            return None
+        return cls(list(centres.values()), frame_size=(frame.shape[1], frame.shape[0]), **options)
+
+    def to_dict(self) -> dict:
+        return {
+            'corners': self.corners.tolist(),
+            'size': list(self.size),
+            'frame_size': list(self.frame_size) if self.frame_size else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PanelRectifier":
+        return cls(data['corners'], data.get('size'), data.get('frame_size'))
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "PanelRectifier | None":
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,87 @@
+import json
+import os
+
+import cv2
+import numpy as np
+
+
+class SearchRegion:
+    """
+    Static search window (x, y, w, h) plus an optional binary mask, given
+    either as a polygon in frame coordinates or as a mask image (non-zero =
+    search). Persisted as JSON so a fixed camera only needs it drawn once.
+    """
+    def __init__(self, rect=None, polygon=None, mask_path: str | None = None):
+        self.rect = tuple(int(v) for v in rect) if rect else None
+        self.polygon = [tuple(int(v) for v in p) for p in polygon] if polygon else []
+        self.mask_path = mask_path
+        self._mask_cache: dict = {}
+
+    @property
+    def has_mask(self) -> bool:
+        return len(self.polygon) >= 3 or bool(self.mask_path)
+
+    def window(self, shape) -> tuple:
+        """(x1, y1, x2, y2) clipped to a frame of `shape`; the whole frame if unset."""
+        h_img, w_img = shape[:2]
+        if not self.rect:
+            return 0, 0, w_img, h_img
+        x, y, w, h = self.rect
+        x1, y1 = min(max(x, 0), w_img), min(max(y, 0), h_img)
+        x2, y2 = min(max(x + w, x1), w_img), min(max(y + h, y1), h_img)
+        if x2 - x1 < 2 or y2 - y1 < 2:
+            return 0, 0, w_img, h_img
+        return x1, y1, x2, y2
+
+    def mask(self, shape, size=None) -> np.ndarray | None:
+        """
+        uint8 mask (255 = search) cropped to the window for a frame of
+        `shape`, optionally resized to `size` (w, h). Cached, since the
+        region and frame size rarely change.
+        """
+        if not self.has_mask:
+            return None
+        key = (shape[:2], size)
+        cached = self._mask_cache.get(key)
+        if cached is not None:
+            return cached
+
+        h_img, w_img = shape[:2]
+        full = np.zeros((h_img, w_img), dtype=np.uint8)
+        if len(self.polygon) >= 3:
+            cv2.fillPoly(full, [np.array(self.polygon, dtype=np.int32)], 255)
+        if self.mask_path:
+            img = cv2.imread(self.mask_path, cv2.IMREAD_GRAYSCALE)
+            if img is not None:
+                img = cv2.resize(img, (w_img, h_img), interpolation=cv2.INTER_NEAREST)
+                full = img if len(self.polygon) < 3 else cv2.bitwise_and(full, img)
+                full = np.where(full > 0, 255, 0).astype(np.uint8)
+
+        x1, y1, x2, y2 = self.window(shape)
+        out = np.ascontiguousarray(full[y1:y2, x1:x2])
+        if size is not None and (out.shape[1], out.shape[0]) != tuple(size):
+            out = cv2.resize(out, tuple(size), interpolation=cv2.INTER_NEAREST)
+        self._mask_cache[key] = out
+        return out
+
+    def to_dict(self) -> dict:
+        return {
+            'rect': list(self.rect) if self.rect else None,
+            'polygon': [list(p) for p in self.polygon],
+            'mask_path': self.mask_path,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SearchRegion":
+        return cls(data.get('rect'), data.get('polygon'), data.get('mask_path'))
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "SearchRegion | None":
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
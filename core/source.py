@@ -0,0 +1,56 @@
+import cv2
+
+from modes import VideoModes
+from .packet import FramePacket
+
+
+class FrameSource:
+    """
+    Reads frames from a camera, a video file (looped) or a list of image
+    files, one FramePacket per read() call. Plain blocking calls, so it
+    works the same in the GUI's grabber thread, a worker process or a
+    benchmark loop. Packets are tagged with `stream_id`.
+    """
+    def __init__(self, source: int = 0, mode: VideoModes = VideoModes.WEBCAM,
+                 image_list=None, stream_id: int = 0):
+        self.source = source
+        self.stream_id = stream_id
+        self.mode = mode
+        self.image_list = image_list or []
+        self.image_index = 0
+        self.cam: cv2.VideoCapture | None = None
+
+    @property
+    def is_capture(self) -> bool:
+        return self.mode in (VideoModes.WEBCAM, VideoModes.VIDEO)
+
+    def open(self):
+        """Open the camera or video file (no-op for images or if open)."""
+        if self.is_capture and self.cam is None:
+            cam = cv2.VideoCapture(self.source)
+            if not cam.isOpened():
+                raise RuntimeError(f"Cannot open {self.mode.name} source {self.source}")
+            self.cam = cam
+
+    def release(self):
+        if self.cam is not None:
+            self.cam.release()
+            self.cam = None
+
+    def read(self) -> FramePacket | None:
+        """The next frame, or None if there is none right now."""
+        if self.is_capture:
+            if self.cam is None:
+                return None
+            ret, frame = self.cam.read()
+            if not ret and self.mode == VideoModes.VIDEO:
+                self.cam.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ret, frame = self.cam.read()
+            return FramePacket(frame, stream_id=self.stream_id) if ret else None
+
+        if not self.image_list:
+            return None
+        path = self.image_list[self.image_index]
+        self.image_index = (self.image_index + 1) % len(self.image_list)
+        frame = cv2.imread(path)
+        return FramePacket(frame, stream_id=self.stream_id) if frame is not None else None
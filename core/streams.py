@@ -0,0 +1,152 @@
+import os
+import threading
+import traceback
+from collections import deque
+
+from .filter import preprocess_batch
+from .packet import FramePacket
+
+
+class FairScheduler:
+    """
+    Latest-item mailboxes for several streams, handed out round-robin.
+    Each stream holds at most one pending item (a newer put() replaces
+    it, counted in `dropped`) and is given to one taker at a time: get()
+    skips a stream until done() is called for its previous item. So a
+    fast camera cannot starve a slow one, and each stream's items are
+    processed in order by whichever worker is free.
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending: dict = {}        # stream id → newest item
+        self._order = deque()           # stream ids, next in turn first
+        self._busy: set = set()
+        self._closed = False
+        self.dropped: dict = {}         # stream id → items replaced unprocessed
+
+    def put(self, stream_id: int, item):
+        with self._cond:
+            if stream_id not in self.dropped:
+                self.dropped[stream_id] = 0
+                self._order.append(stream_id)
+            if stream_id in self._pending:
+                self.dropped[stream_id] += 1
+            self._pending[stream_id] = item
+            self._cond.notify()
+
+    def get(self, timeout: float | None = None) -> tuple | None:
+        """(stream id, item) of the next stream in turn; None once closed or on timeout."""
+        with self._cond:
+            while not self._closed:
+                for _ in range(len(self._order)):
+                    stream_id = self._order[0]
+                    self._order.rotate(-1)
+                    if stream_id in self._pending and stream_id not in self._busy:
+                        self._busy.add(stream_id)
+                        return stream_id, self._pending.pop(stream_id)
+                if not self._cond.wait(timeout):
+                    return None
+            return None
+
+    def done(self, stream_id: int):
+        """The item get() returned for `stream_id` is finished."""
+        with self._cond:
+            self._busy.discard(stream_id)
+            if stream_id in self._pending:
+                self._cond.notify()
+
+    def remove(self, stream_id: int):
+        with self._cond:
+            self._pending.pop(stream_id, None)
+            self.dropped.pop(stream_id, None)
+            if stream_id in self._order:
+                self._order.remove(stream_id)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class ProcessingPool:
+    """
+    Detection and preprocessing for several streams on one pool of
+    worker threads, fed by a FairScheduler. Every stream gets its own
+    detector from make_detector(stream_id), since the motion gate, the
+    last boxes and the detection ids are per camera; the scheduler hands
+    a stream to one worker at a time. OpenCV releases the GIL, so the
+    workers run in parallel up to the number of cores, whatever the
+    number of streams.
+
+    submit() only stores the packet and returns. on_result(packet, batch)
+    is called from the worker threads, with the batch (None when the
+    detector returned none) already preprocessed.
+    """
+    def __init__(self, make_detector, workers: int | None = None,
+                 preprocess=preprocess_batch, on_result=None):
+        self.make_detector = make_detector
+        self.preprocess = preprocess
+        self.on_result = on_result
+        self.scheduler = FairScheduler()
+        self.detectors: dict = {}       # stream id → detector
+        self.processed: dict = {}       # stream id → frames processed
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._run, name=f"pool-{i}", daemon=True)
+                         for i in range(workers or os.cpu_count() or 1)]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def workers(self) -> int:
+        return len(self._threads)
+
+    def detector(self, stream_id: int):
+        """The detector of `stream_id`, created on first use."""
+        with self._lock:
+            detector = self.detectors.get(stream_id)
+            if detector is None:
+                detector = self.detectors[stream_id] = self.make_detector(stream_id)
+                self.processed[stream_id] = 0
+            return detector
+
+    def submit(self, frame):
+        """Queue a FramePacket (or a bare frame, as stream 0) for its stream."""
+        packet = FramePacket.of(frame)
+        self.detector(packet.stream_id)
+        self.scheduler.put(packet.stream_id, packet)
+
+    def remove(self, stream_id: int):
+        self.scheduler.remove(stream_id)
+        with self._lock:
+            self.detectors.pop(stream_id, None)
+            self.processed.pop(stream_id, None)
+
+    def _run(self):
+        while True:
+            job = self.scheduler.get()
+            if job is None:
+                return
+            stream_id, packet = job
+            try:
+                detector = self.detectors.get(stream_id)
+                if detector is None:    # removed meanwhile
+                    continue
+                packet, batch = detector.process(packet)
+                if batch is not None and self.preprocess is not None:
+                    self.preprocess(batch)
+                self.processed[stream_id] = self.processed.get(stream_id, 0) + 1
+                if self.on_result is not None:
+                    self.on_result(packet, batch)
+            except Exception as e:
+                self.errors += 1
+                print(f"[ProcessingPool] stream {stream_id}: {e}")
+                traceback.print_exc()
+            finally:
+                self.scheduler.done(stream_id)
+
+    def close(self):
+        """Stop the workers once their current frame is done."""
+        self.scheduler.close()
+        for thread in self._threads:
+            thread.join()
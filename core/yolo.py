@@ -0,0 +1,134 @@
+import cv2
+import numpy as np
+
+from .boxes import nms
+from .packet import FramePacket, ROIBatch
+
+
+def letterbox(image, out: np.ndarray, fill: float = 114 / 255) -> tuple:
+    """
+    Resize a BGR `image` with its aspect ratio kept into `out`, a
+    preallocated 1×3×S×S float32 RGB tensor in [0, 1], centred and padded
+    with `fill`. Only the pad strips are written besides the image itself.
+    Returns (scale, pad_x, pad_y) to map boxes back.
+    """
+    size = out.shape[-1]
+    h, w = image.shape[:2]
+    scale = min(size / w, size / h)
+    nw, nh = min(round(w * scale), size), min(round(h * scale), size)
+    px, py = (size - nw) // 2, (size - nh) // 2
+
+    resized = cv2.resize(image, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    np.divide(resized[..., ::-1].transpose(2, 0, 1), np.float32(255),
+              out=out[0, :, py:py + nh, px:px + nw], casting='unsafe')
+    out[0, :, :py, :] = fill
+    out[0, :, py + nh:, :] = fill
+    out[0, :, py:py + nh, :px] = fill
+    out[0, :, py:py + nh, px + nw:] = fill
+    return scale, px, py
+
+
+def decode(pred: np.ndarray, output_format: str = 'xyxy', conf_thresh: float = 0.5) -> tuple:
+    """
+    Confidence-filter one image's raw predictions, vectorized.
+      'xyxy'    rows of (x1, y1, x2, y2, conf, cls), as pre_yolo.py assumed
+      'yolov5'  rows of (cx, cy, w, h, objectness, class scores...)
+      'yolov8'  (4 + classes) × N columns of (cx, cy, w, h, class scores...)
+    Returns N×4 float32 (x1, y1, x2, y2) boxes in input-tensor pixels, N
+    scores and N int classes.
+    """
+    pred = np.asarray(pred, dtype=np.float32)
+    if output_format == 'yolov8':
+        pred = pred.T
+    if output_format == 'xyxy':
+        scores = pred[:, 4]
+        keep = scores > conf_thresh
+        pred = pred[keep]
+        return pred[:, :4], pred[:, 4], pred[:, 5].astype(np.int64)
+
+    if output_format == 'yolov5':
+        cls_scores = pred[:, 5:] * pred[:, 4:5]
+    elif output_format == 'yolov8':
+        cls_scores = pred[:, 4:]
+    else:
+        raise ValueError(f"Unknown output format: {output_format!r}")
+    classes = cls_scores.argmax(axis=1)
+    scores = cls_scores[np.arange(len(pred)), classes]
+    keep = scores > conf_thresh
+    cx, cy, w, h = pred[keep, :4].T
+    boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    return boxes, scores[keep], classes[keep]
+
+
+class YoloModel:
+    """
+    ONNX digit detector with the same process() interface as
+    core.detect.BoxDetector, so it can replace it. The session is created
+    once, on first use, and every frame is letterboxed into the same
+    preallocated input tensor. `scores` and `classes` hold those of the
+    last process() call.
+    """
+    def __init__(self, model_path: str, input_size: int = 640, conf_thresh: float = 0.5,
+                 iou_thresh: float = 0.45, output_format: str = 'xyxy',
+                 max_rois: int | None = None, threads: int = 1):
+        self.model_path = model_path
+        self.input_size = input_size
+        self.conf_thresh = conf_thresh
+        self.iou_thresh = iou_thresh
+        self.output_format = output_format
+        self.max_rois = max_rois
+        self.threads = threads
+
+        self._session = None
+        self._input = np.zeros((1, 3, input_size, input_size), dtype=np.float32)
+        self._det_id = 0
+        self.scores = np.empty(0, dtype=np.float32)
+        self.classes = np.empty(0, dtype=np.int64)
+
+    def _ensure_session(self):
+        if self._session is not None:
+            return
+        import onnxruntime
+        opts = onnxruntime.SessionOptions()
+        opts.intra_op_num_threads = self.threads
+        opts.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = onnxruntime.InferenceSession(
+            self.model_path, sess_options=opts, providers=['CPUExecutionProvider']
+        )
+        self._input_name = self._session.get_inputs()[0].name
+
+    def detect(self, frame) -> tuple:
+        """
+        Run the model on one BGR frame. Returns N×4 int32 boxes in frame
+        pixels, N scores and N classes, best score first.
+        """
+        self._ensure_session()
+        scale, px, py = letterbox(frame, self._input)
+        pred = self._session.run(None, {self._input_name: self._input})[0]
+        boxes, scores, classes = decode(pred[0], self.output_format, self.conf_thresh)
+        keep = nms(boxes, scores, self.iou_thresh, classes)
+        if self.max_rois is not None:
+            keep = keep[:self.max_rois]
+        boxes, scores, classes = boxes[keep], scores[keep], classes[keep]
+
+        h, w = frame.shape[:2]
+        boxes = (boxes - (px, py, px, py)) / scale
+        boxes = np.clip(np.rint(boxes), 0, (w, h, w, h)).astype(np.int32)
+        valid = (boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1])
+        return boxes[valid], scores[valid], classes[valid]
+
+    def skip(self, frame) -> FramePacket:
+        """Pass a frame through without detection (no boxes)."""
+        packet = FramePacket.of(frame)
+        packet.det_id = self._det_id
+        return packet
+
+    def process(self, frame) -> tuple:
+        """Detect one frame (FramePacket or array); returns (packet, batch)."""
+        packet = FramePacket.of(frame)
+        frame = packet.image
+        self._det_id += 1
+        boxes, self.scores, self.classes = self.detect(frame)
+        packet.boxes, packet.det_id = boxes, self._det_id
+        rois = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in boxes.tolist()]
+        return packet, ROIBatch.from_packet(packet, rois)
@@ -0,0 +1,218 @@
+"""
+Offline accuracy and throughput evaluation of a labeled digit set.
+
+    python evaluate.py Fnt0_9/ --backend fpga:192.168.3.142:7
+    python evaluate.py digits.npz --backend onnx:digits.onnx --concurrency 4 --batch 32
+
+A dataset is a directory with one sub-directory per class (named by the
+digit, or taken in sorted order), an .npz with 'images' (N×H×W or
+N×H×W×3 uint8) and 'labels', or a packed dataset (providers.dataset).
+Every image goes through the same preprocessing as the live client
+(core.filter.preprocess_roi), unless a packed dataset was stored
+preprocessed already, and then through any inference backend (see
+providers.backend.make_backend).
+"""
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from core.filter import preprocess_roi
+from providers.backend import make_backend
+from providers.dataset import ROIDataset, is_packed, iter_class_directory
+
+
+def load_dataset(path: str) -> tuple:
+    """
+    (images, int64 labels) from a class directory or an .npz as BGR uint8
+    images, or from a packed dataset as its memory-mapped N×32×32 array.
+    """
+    if is_packed(path):
+        ds = ROIDataset(path)
+        return ds.images, np.asarray(ds.labels)
+    if os.path.isdir(path):
+        images, labels = [], []
+        for file, label in iter_class_directory(path):
+            img = cv2.imread(file, cv2.IMREAD_COLOR)
+            if img is not None:
+                images.append(img)
+                labels.append(label)
+        return images, np.array(labels, dtype=np.int64)
+
+    data = np.load(path)
+    images = data['images']
+    if images.ndim == 3:
+        images = [cv2.cvtColor(img, cv2.COLOR_GRAY2BGR) for img in images]
+    else:
+        images = list(images)
+    return images, data['labels'].astype(np.int64)
+
+
+PREPROCESS = {
+    'filter': preprocess_roi,
+    # what the old TensorFlow test script did: plain 32×32 resize
+    'resize': lambda img: cv2.resize(img, (32, 32), interpolation=cv2.INTER_AREA),
+    'none': lambda img: img,
+}
+
+
+def preprocess(images: list, method: str = 'filter') -> tuple:
+    """Preprocess every image; (list of 32×32 ROIs, seconds per image)."""
+    fn = PREPROCESS[method]
+    t0 = time.perf_counter()
+    rois = [fn(img) for img in images]
+    return rois, (time.perf_counter() - t0) / max(len(images), 1)
+
+
+def run(spec: str, rois: list, threads: int = 1, concurrency: int = 1, batch: int = 1) -> tuple:
+    """
+    Classify `rois` with `concurrency` workers, each with its own backend
+    (its own board connection or CPU session), pulling batches of `batch`
+    ROIs from a shared queue. The backends are made here, before any
+    worker starts, so a bad `spec` raises ValueError at once. Connecting
+    is not timed. Returns (predictions, per-batch latencies in seconds,
+    wall time).
+    """
+    backends = [make_backend(spec, threads=threads) for _ in range(concurrency)]
+    predictions = np.full(len(rois), -1, dtype=np.int64)
+    jobs = queue.SimpleQueue()
+    for start in range(0, len(rois), batch):
+        jobs.put(start)
+    latencies, errors = [], []
+    lock = threading.Lock()
+    ready = threading.Barrier(concurrency + 1)
+
+    def worker(backend):
+        lat = []
+        try:
+            try:
+                backend.connect()
+            finally:
+                ready.wait()
+            with backend:
+                while True:
+                    try:
+                        start = jobs.get_nowait()
+                    except queue.Empty:
+                        break
+                    t = time.perf_counter()
+                    predictions[start:start + batch] = backend.classify_batch(rois[start:start + batch])
+                    lat.append(time.perf_counter() - t)
+        except Exception as e:
+            errors.append(e)
+        with lock:
+            latencies.extend(lat)
+
+    workers = [threading.Thread(target=worker, args=(backend,)) for backend in backends]
+    for w in workers:
+        w.start()
+    ready.wait()
+    t0 = time.perf_counter()
+    for w in workers:
+        w.join()
+    wall = time.perf_counter() - t0
+    if errors and not latencies:
+        raise errors[0]
+    for e in errors:
+        print(f"[!] worker failed: {e}")
+    return predictions, np.array(latencies), wall
+
+
+def confusion_matrix(labels: np.ndarray, predictions: np.ndarray, classes: int) -> np.ndarray:
+    """
+    classes × (classes + 1) counts; the last column is 'other' (no or
+    out-of-range result). Unlabeled ROIs (label -1) are not counted.
+    """
+    labeled = labels >= 0
+    labels, predictions = labels[labeled], predictions[labeled]
+    pred = np.where((predictions >= 0) & (predictions < classes), predictions, classes)
+    matrix = np.zeros((classes, classes + 1), dtype=np.int64)
+    np.add.at(matrix, (labels, pred), 1)
+    return matrix
+
+
+def report(labels, predictions, latencies, wall, prep_per_image, batch) -> dict:
+    """
+    Print and return the results. Accuracy and the confusion matrix only
+    cover the labeled ROIs (recorded sessions store -1 for unlabeled
+    ones); ValueError if there are none.
+    """
+    labeled = labels >= 0
+    if not labeled.any():
+        raise ValueError("no labeled ROIs to evaluate")
+    unlabeled = int(len(labels) - labeled.sum())
+    classes = int(labels.max()) + 1
+    matrix = confusion_matrix(labels, predictions, classes)
+    accuracy = float(np.mean(predictions[labeled] == labels[labeled]))
+    p50, p90, p99 = (np.percentile(latencies, [50, 90, 99]) * 1e3).tolist() if len(latencies) else (0, 0, 0)
+
+    print(f"images       {len(labels)}")
+    if unlabeled:
+        print(f"unlabeled    {unlabeled} (not scored)")
+    print(f"accuracy     {accuracy:.4f}")
+    print(f"throughput   {len(labels) / wall:,.0f} img/s")
+    print(f"latency      p50 {p50:.3f} ms  p90 {p90:.3f} ms  p99 {p99:.3f} ms  (per batch of {batch})")
+    print(f"preprocess   {prep_per_image * 1e6:.1f} µs/img")
+    print("confusion (rows = label, cols = result, x = other)")
+    print("      " + "".join(f"{c:>6}" for c in range(classes)) + f"{'x':>6}")
+    for c, row in enumerate(matrix):
+        print(f"{c:>6}" + "".join(f"{v:>6}" for v in row))
+
+    return {
+        'images': int(len(labels)),
+        'unlabeled': unlabeled,
+        'accuracy': accuracy,
+        'images_per_s': len(labels) / wall,
+        'latency_ms': {'p50': p50, 'p90': p90, 'p99': p99},
+        'batch': batch,
+        'preprocess_us': prep_per_image * 1e6,
+        'confusion': matrix.tolist(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('dataset', help="class directory or .npz")
+    parser.add_argument('--backend', default='fpga:127.0.0.1:7',
+                        help="fpga:HOST:PORT or onnx:MODEL.onnx")
+    parser.add_argument('--preprocess', choices=sorted(PREPROCESS),
+                        help="ROI preprocessing (default: filter); packed datasets "
+                             "stored preprocessed are used as stored")
+    parser.add_argument('--concurrency', type=int, default=1, help="parallel backends")
+    parser.add_argument('--batch', type=int, default=1, help="ROIs per classify_batch call")
+    parser.add_argument('--threads', type=int, default=1, help="intra-op threads (CPU backend)")
+    parser.add_argument('--json', help="also write the report to this file")
+    args = parser.parse_args()
+
+    images, labels = load_dataset(args.dataset)
+    if len(images) == 0:
+        parser.error(f"no images found in {args.dataset}")
+    if not (labels >= 0).any():
+        parser.error(f"{args.dataset} has no labeled ROIs (unlabeled ones are stored as -1)")
+    stored = ROIDataset(args.dataset).preprocessed if is_packed(args.dataset) else 'none'
+    if stored != 'none':
+        if args.preprocess not in (None, stored):
+            parser.error(f"{args.dataset} is stored preprocessed with '{stored}', "
+                         f"--preprocess {args.preprocess} cannot be applied")
+        rois, prep = images, 0.0    # stored after preprocessing
+    else:
+        rois, prep = preprocess(images, args.preprocess or 'filter')
+    try:
+        predictions, latencies, wall = run(args.backend, rois, args.threads,
+                                           args.concurrency, args.batch)
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"[!] {args.backend}: {e}\n")
+    result = report(labels, predictions, latencies, wall, prep, args.batch)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,117 @@
+"""
+The client GUI.
+
+    python main.py
+    python main.py --images experiment/images/*.jpeg --start
+    python main.py --startup-report --images experiment/images/1.jpeg --start
+    python main.py --cameras 0 1 line3.mp4 --workers 4
+    python main.py --detector adaptive
+
+--startup-report imports the GUI's dependencies one group at a time and
+prints what each costs, then the time from process start to the window
+being shown and, with --start, to the first processed frame, and exits. --cameras opens the
+multi-camera window: one stream per webcam index or video file, all
+processed by one pool of --workers threads (default: one per core).
+--detector adaptive uses the reference client's adaptive-threshold
+detector instead of the Otsu box detector.
+"""
+import time
+
+T_START = time.perf_counter()
+
+import argparse
+import importlib
 import sys
-from PySide6.QtWidgets import QApplication
 
-from mainwindow import MainWindow
+# in import order: each group is timed on top of the ones before it
+IMPORT_STAGES = (
+    'numpy', 'cv2', 'PySide6.QtWidgets', 'core', 'processors',
+    'providers.source', 'widgets.livesource', 'tcp', 'mainwindow',
+)
 
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    w = MainWindow()
+
+def _report(name: str, seconds: float):
+    print(f"  {name:<28} {1000 * seconds:8.1f} ms")
+
+
+def import_report():
+    print("imports:")
+    for name in IMPORT_STAGES:
+        t0 = time.perf_counter()
+        importlib.import_module(name)
+        _report(name, time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', nargs='+', help="use an image sequence instead of webcam 0")
+    parser.add_argument('--cameras', nargs='+', metavar='SRC',
+                        help="webcam indexes or video files, one stream each")
+    parser.add_argument('--workers', type=int, help="detection threads for --cameras")
+    parser.add_argument('--detector', choices=('boxes', 'adaptive'), default='boxes',
+                        help="digit detector (default: boxes)")
+    parser.add_argument('--start', action='store_true', help="press Start once the window is up")
+    parser.add_argument('--startup-report', action='store_true',
+                        help="print import and startup times, then exit")
+    args, qt_args = parser.parse_known_args()
+    if args.cameras and (args.images or args.startup_report):
+        parser.error("--cameras cannot be combined with --images or --startup-report")
+
+    if args.startup_report:
+        import_report()
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
+    from mainwindow import MainWindow, MultiCameraWindow
+    from modes import VideoModes
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    if args.cameras:
+        sources = [(int(src), VideoModes.WEBCAM, None) if src.isdigit() else (src, VideoModes.VIDEO, None)
+                   for src in args.cameras]
+        w = MultiCameraWindow(sources, workers=args.workers, detector=args.detector)
+    elif args.images:
+        w = MainWindow(mode=VideoModes.IMAGES, image_list=args.images, detector=args.detector)
+    else:
+        w = MainWindow(detector=args.detector)
     w.resize(1400, 800)
     w.show()
-    sys.exit(app.exec())
+
+    if args.startup_report:
+        marks = {}
+
+        def on_window():
+            marks['start'] = time.perf_counter()
+            print("startup:")
+            _report("time to window", marks['start'] - T_START)
+            if not args.start:
+                app.quit()
+
+        def on_frame(_packet):
+            if 'frame' in marks:
+                return
+            marks['frame'] = time.perf_counter()
+            _report("time to first frame", marks['frame'] - T_START)
+            _report("first frame after Start", marks['frame'] - marks['start'])
+            app.quit()
+
+        def on_opened(ok, error):
+            if not ok:
+                print(f"  no first frame: {error}")
+                app.quit()
+
+        # the first timer runs once the event loop has shown the window
+        QTimer.singleShot(0, on_window)
+        w.processor1.processed_frame.connect(on_frame)
+        w.grabber.opened.connect(on_opened)
+        QTimer.singleShot(10000, app.quit)
+    if args.start:
+        QTimer.singleShot(0, w.source_control.sig_start.emit)
+    status = app.exec()
+    if args.startup_report:
+        w.close()
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
+import os
 import sys
+import time
 
-from PySide6.QtCore import QThread, Slot
+from PySide6.QtCore import Qt, QThread, Signal, Slot
 
 from PySide6.QtWidgets import (
     QApplication,
@@ -10,14 +12,36 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
 )
 
+from core.rectify import PanelRectifier
 from modes import VideoModes
 from providers import FrameGrabber
-from processors import PreProcessorBase, BoundingBox, ROIFilter
-from widgets import VideoWidget, SourceControlWidget, ROIViewerWidget
+from providers.ratecontrol import AdaptiveRateController
+from providers.streams import SourceManager
+from processors import (PreProcessorBase, BoundingBox, AdaptiveThreshold, ROIFilter, SearchRegion,
+                        NumberGrouper, PoolProcessor)
+from widgets import VideoWidget, SourceControlWidget, ROIViewerWidget, VideoGrid
 from tcp import TCPWidget
 
+# Detection search window / mask, persisted between runs
+REGION_FILE = "roi_region.json"
+# Panel corners for perspective rectification, persisted between runs
+PANEL_FILE = "panel_corners.json"
+# Recorded ROI sessions (packed datasets, see providers.dataset)
+CAPTURE_DIR = "captures"
+# Selectable digit detectors (main.py --detector)
+DETECTORS = {'boxes': BoundingBox, 'adaptive': AdaptiveThreshold}
+
 class MainWindow(QMainWindow):
-    def __init__(self):
+    """
+    The client window. Nothing is opened while it is built: the grabber's
+    source (webcam 0 unless given) is opened in its thread on the first
+    Start, so the window shows at once even without a camera.
+    `detector` picks the digit detector from DETECTORS.
+    """
+    _sig_close_grabber = Signal()
+
+    def __init__(self, source: int = 0, mode: VideoModes = VideoModes.WEBCAM, image_list=None,
+                 detector: str = "boxes"):
         super().__init__()
         self.setWindowTitle("DNN-Acceleration-on-FPGA-CLIENT")
 
@@ -32,11 +56,7 @@ class MainWindow(QMainWindow):
         self.roi_filter = ROIFilter()
         
         self.tcp_widget = TCPWidget()
-        self.roi_viewer = ROIViewerWidget(
-            parent=self,
-            tcp_client=self.tcp_widget,
-            inference_enabled=True
-        )
+        self.roi_viewer = ROIViewerWidget(parent=self)
         
         self.left_panel.addWidget(self.video_widget, stretch=4)
         self.left_panel.addWidget(self.roi_viewer, stretch=1)
@@ -44,32 +64,72 @@ class MainWindow(QMainWindow):
         main_layout.addLayout(self.left_panel, stretch=3)
 
         # Initialize the FrameGrabber
-        self.processor1 = BoundingBox()
-        # connect the ROI signal
-        # 2) filter emits List[np.ndarray] → viewer.set_rois
-        self.processor1.roi_frames.connect(self.roi_filter.on_rois)
-        self.roi_filter.filtered_rois.connect(self.roi_viewer.set_rois)
-        
-        
-        # self.roi_filter.filtered_rois.connect(self.tcp_widget.send_rois)
-        # self.tcp_widget.inference_complete.connect(self.roi_viewer.clear)
-        # self.tcp_widget.inference_complete.connect(self.grabber.resume)
-        self.tcp_widget.classification_result.connect(self.handle_one_result)
-
-        # if you want to clear for each new frame batch:
-        # self.processor1.processed_frame.connect(self.roi_viewer.clear)
-        self._start_grabber()
-        # Start preprocessor for bounding boxes
-        self.grabber.frame_ready.connect(self.processor1.on_frame)
-        # self.grabber.frame_ready.connect(self.roi_viewer.clear)
-        self.processor1.processed_frame.connect(self.video_widget.on_frame)
+        self.processor1 = DETECTORS[detector]()
+        # one ROIBatch per detection: boxes → filter → inference, and the
+        # finished batch (results attached) to everything that shows it
+        self.processor1.roi_batch.connect(self.roi_filter.on_batch)
+        self.roi_filter.filtered_batch.connect(self.tcp_widget.send_batch)
+        self.tcp_widget.batch_ready.connect(self.roi_viewer.show_batch)
+        # ROI capture: every sent batch with its boxes and results; the
+        # recorder is created on the first recording
+        self.recorder = None
+
+        # group per-digit results into numbers and overlay them
+        self.grouper = NumberGrouper(self)
+        self.tcp_widget.batch_ready.connect(self.grouper.on_batch)
+        self.grouper.numbers_ready.connect(self.video_widget.set_numbers)
+        self.grouper.labels_ready.connect(self.video_widget.set_labels)
+        self.grouper.labels_ready.connect(self.handle_batch)
+
+        self._start_grabber(source, mode, image_list)
+        # one FramePacket per frame, with its boxes, to the display
+        self.video_widget.set_processor(self.processor1)
         
         # Side panel
         self.source_control = SourceControlWidget()
         # self.source_control.sig_source_change.connect(self.grabber.change_source)
         self.source_control.sig_start.connect(self.grabber.run)
         self.source_control.sig_pause.connect(self.grabber.stop)
-        self.source_control.sig_update_fps.connect(self.grabber.set_fps)
+        # FPS: slider → controller (ceiling) → grabber
+        self.rate_controller = AdaptiveRateController(
+            max_fps=self.source_control.fps_slider.value(), parent=self
+        )
+        self.source_control.sig_update_fps.connect(self.rate_controller.set_max_fps)
+        self.source_control.sig_auto_fps.connect(self.rate_controller.set_enabled)
+
+        # Search region: drawn in the video widget, used by the detector
+        region = SearchRegion.load(REGION_FILE)
+        self.processor1.set_region(region)
+        self.video_widget.set_region(region)
+        self.source_control.sig_edit_region.connect(self.video_widget.set_region_editing)
+        self.source_control.sig_clear_region.connect(self.video_widget.clear_region)
+        self.video_widget.region_changed.connect(self.on_region_changed)
+
+        # Panel rectification: corners clicked in the video widget or
+        # found from markers; detection then runs on the rectified panel
+        rectifier = PanelRectifier.load(PANEL_FILE)
+        self.processor1.set_rectifier(rectifier)
+        if rectifier is not None:
+            self.video_widget.set_corners(rectifier.corners.tolist())
+        self.source_control.sig_edit_panel.connect(self.video_widget.set_corner_editing)
+        self.source_control.sig_clear_panel.connect(self.video_widget.clear_corners)
+        self.source_control.sig_find_panel.connect(self.on_find_panel)
+        self.video_widget.corners_changed.connect(self.on_corners_changed)
+
+        # Motion gate: skip detection (and inference) on unchanged frames
+        self.source_control.sig_motion_gate.connect(self.processor1.set_motion_gate_enabled)
+        self.processor1.skip_ratio.connect(self.source_control.set_skip_ratio)
+        self.source_control.motion_gate_box.setChecked(True)
+        # Quality gate: don't send blurred, empty or clipped ROIs
+        self.source_control.sig_quality_gate.connect(self.roi_filter.set_quality_gate_enabled)
+        self.roi_filter.reject_ratio.connect(self.source_control.set_reject_ratio)
+        self.source_control.quality_gate_box.setChecked(True)
+        self.source_control.sig_record.connect(self.on_record)
+        self.tcp_widget.batch_sent.connect(self.rate_controller.on_batch_sent)
+        self.tcp_widget.inference_stats.connect(self.rate_controller.on_inference_stats)
+        self.rate_controller.rate_changed.connect(self.grabber.set_fps)
+        self.rate_controller.status_changed.connect(self.source_control.set_effective_rate)
+        self.rate_controller.set_enabled(False)
         
         def on_tcp_state_changed(connected: bool):
             if connected:
@@ -90,32 +150,170 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(container)
       
     def _start_grabber(self, source: int=0, mode: VideoModes=VideoModes.WEBCAM, image_list=None):
-        if hasattr(self, 'grabber') and self.grabber is not None:
+        if getattr(self, 'grabber', None) is not None:
             self.grabber.frame_ready.disconnect()
-            self.grabber.stop()
-            self.thread.quit()
-            self.thread.wait()
+            self._stop_grabber()
+        # the source is opened by grabber.run (Start), in the grabber's thread
         self.grabber = FrameGrabber(source, mode, image_list=image_list)
         self.thread = QThread(self)
         self.grabber.moveToThread(self.thread)
         self.grabber.frame_ready.connect(self.processor1.on_frame)
-        self.thread.started.connect(self.grabber.run)
+        self.grabber.opened.connect(self.on_source_opened)
+        self._sig_close_grabber.connect(self.grabber.close, Qt.BlockingQueuedConnection)
         self.thread.start()
         self.source_mode = mode
+
+    def _stop_grabber(self):
+        if self.grabber is None:
+            return
+        # the grabber's timer lives in its thread: stop it there, then the thread
+        self._sig_close_grabber.emit()
+        self._sig_close_grabber.disconnect(self.grabber.close)
+        self.thread.quit()
+        self.thread.wait()
+        self.grabber = None
+
+    @Slot(bool, str)
+    def on_source_opened(self, ok: bool, error: str):
+        if ok:
+            self.statusBar().showMessage(f"{self.source_mode.name.capitalize()} opened", 3000)
+        else:
+            self.statusBar().showMessage(error)
     
-    @Slot(int)
-    def handle_one_result(self, result: int):
+    @Slot(object)
+    def on_region_changed(self, region):
+        self.processor1.set_region(region)
+        if region is not None:
+            region.save(REGION_FILE)
+        elif os.path.exists(REGION_FILE):
+            os.remove(REGION_FILE)
+
+    @Slot(object)
+    def on_corners_changed(self, corners):
+        if corners is None:
+            self.processor1.set_rectifier(None)
+            if os.path.exists(PANEL_FILE):
+                os.remove(PANEL_FILE)
+            return
+        frame = self.video_widget.latest_frame
+        frame_size = (frame.shape[1], frame.shape[0]) if frame is not None else None
+        self.set_rectifier(PanelRectifier(corners, frame_size=frame_size))
+
+    @Slot()
+    def on_find_panel(self):
+        frame = self.video_widget.latest_frame
+        rectifier = PanelRectifier.from_markers(frame) if frame is not None else None
+        if rectifier is None:
+            self.statusBar().showMessage("Panel: four markers not found", 5000)
+            return
+        self.video_widget.set_corners(rectifier.corners.tolist())
+        self.set_rectifier(rectifier)
+
+    def set_rectifier(self, rectifier: PanelRectifier):
+        self.processor1.set_rectifier(rectifier)
+        rectifier.save(PANEL_FILE)
+        w, h = rectifier.size
+        self.statusBar().showMessage(f"Panel: detecting on the rectified {w}×{h} view", 5000)
+
+    @Slot(bool)
+    def on_record(self, enabled: bool):
+        if enabled:
+            if self.recorder is None:
+                from providers.recorder import ROIRecorder
+                self.recorder = ROIRecorder(self)
+                self.tcp_widget.batch_ready.connect(self.recorder.on_batch)
+            path = os.path.join(CAPTURE_DIR, time.strftime("%Y%m%d-%H%M%S") + ".rois")
+            self.recorder.start(path)
+            self.source_control.record_label.setText(path)
+        elif self.recorder is not None:
+            self.recorder.stop()
+
+    def closeEvent(self, event):
+        if self.recorder is not None:
+            self.recorder.stop()
+        self._stop_grabber()
+        self.tcp_widget.shutdown()
+        super().closeEvent(event)
+
+    @Slot(object)
+    def handle_batch(self, batch):
         """
-        Slot to handle a single classification result from the FPGA.
-        Prints and logs the value for debugging.
+        Slot for each finished ROIBatch: shows the frame's results and
+        their grab-to-result latency in the status bar.
         """
-        # print to console
-        print(f"[handle_one_result] Classification result received: {result}")
+        if not batch.batch_id:
+            return
+        results = ", ".join("–" if r is None else str(r) for r in batch.labels)
+        self.statusBar().showMessage(
+            f"Frame {batch.frame_id}: {results}  ({1000 * batch.latency:.1f} ms)", 5000
+        )
+
+
+class MultiCameraWindow(QMainWindow):
+    """
+    Several cameras at once. A SourceManager grabs all of them, each on
+    its own thread; one PoolProcessor detects and preprocesses the frames
+    of every camera on a shared pool of worker threads; and the TCPWidget
+    opens one connection per camera and serves the cameras' batches in
+    turn, "latest frame only" per camera. Point it at the broker
+    (broker.py) to spread the connections over several boards.
+    `sources` are (source, mode, image_list) tuples, one per stream.
+    """
+    def __init__(self, sources: list, workers: int | None = None, columns: int = 2,
+                 detector: str = "boxes"):
+        super().__init__()
+        self.setWindowTitle("DNN-Acceleration-on-FPGA-CLIENT")
+
+        self.sources = SourceManager(self)
+        self.processor = PoolProcessor(workers=workers, detector=detector)
+        self.video_grid = VideoGrid(columns=columns)
+        self.tcp_widget = TCPWidget(connections=len(sources))
+        self.grouper = NumberGrouper(self)
+        self.source_control = SourceControlWidget()
+
+        for source, mode, image_list in sources:
+            stream_id = self.sources.add_source(source, mode, image_list,
+                                                fps=self.source_control.fps_slider.value())
+            self.video_grid.add_stream(stream_id, f"{stream_id}: {source if image_list is None else mode.name.lower()}")
+
+        # frames go from the grabbers' threads straight into the pool
+        self.sources.frame_ready.connect(self.processor.on_frame, Qt.DirectConnection)
+        self.processor.processed_frame.connect(self.video_grid.on_frame)
+        self.processor.roi_batch.connect(self.tcp_widget.send_batch)
+        self.tcp_widget.batch_ready.connect(self.grouper.on_batch)
+        self.grouper.labels_ready.connect(self.video_grid.set_labels)
+        self.grouper.numbers_ready.connect(self.video_grid.set_numbers)
+
+        self.source_control.sig_start.connect(self.sources.start)
+        self.source_control.sig_pause.connect(self.sources.stop)
+        self.source_control.sig_update_fps.connect(self.sources.set_fps)
+        self.source_control.sig_motion_gate.connect(self.processor.set_motion_gate_enabled)
+        self.source_control.motion_gate_box.setChecked(True)
+        self.source_control.sig_quality_gate.connect(self.processor.set_quality_gate_enabled)
+        self.source_control.quality_gate_box.setChecked(True)
+        self.processor.skip_ratio.connect(self.source_control.set_skip_ratio)
+        self.processor.reject_ratio.connect(self.source_control.set_reject_ratio)
+        self.sources.opened.connect(self.on_source_opened)
+        # region, panel, recording and Auto FPS are per stream
+        self.source_control.hide_single_source_controls()
+
+        main_layout = QHBoxLayout()
+        main_layout.addWidget(self.video_grid, stretch=3)
+        side_panel = QVBoxLayout()
+        side_panel.addWidget(self.source_control)
+        side_panel.addWidget(self.tcp_widget)
+        main_layout.addLayout(side_panel, stretch=1)
+        container = QWidget()
+        container.setLayout(main_layout)
+        self.setCentralWidget(container)
 
-        # log via Python’s logging module
-        print(f"Classification result: {result}")
+    @Slot(int, bool, str)
+    def on_source_opened(self, stream_id: int, ok: bool, error: str):
+        if not ok:
+            self.statusBar().showMessage(f"Stream {stream_id}: {error}")
 
-        # optionally, show in a status bar or UI element
-        if hasattr(self, 'statusBar'):
-            self.statusBar().showMessage(f"Last result: {result}", 5000)
-    
\ No newline at end of file
+    def closeEvent(self, event):
+        self.sources.close()
+        self.processor.stop()
+        self.tcp_widget.shutdown()
+        super().closeEvent(event)
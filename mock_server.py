@@ -1,53 +1,330 @@
-import socket
+import argparse
+import asyncio
+import random
+import struct
 
-def start_mock_server(host: str, port: int):
+import numpy as np
+
+PACKET_SIZE = 1024                      # bytes per image packet
+PACKETS_PER_IMAGE = 4                   # 32×32 float32 = 4 KB
+IMAGE_SIZE = PACKET_SIZE * PACKETS_PER_IMAGE
+ACK = b'\x01'                           # 1-byte ACK after packets 1–3
+RESULT_SIZE = 4                         # 4-byte LE unsigned result
+UDP_HEADER = struct.Struct('<I')        # UDP mode: sequence number + image
+UDP_REPLY = struct.Struct('<II')        # sequence number + result
+
+
+class DelayModel:
+    """
+    Samples a delay (seconds) from a small family of distributions.
+    Spec strings:
+      '0' / 'none'              no delay
+      'const:D'                 always D
+      'uniform:LO,HI'           uniform in [LO, HI]
+      'normal:MU,SIGMA'         gaussian, clipped at 0
+      'exp:MEAN'                exponential with the given mean
+    """
+    def __init__(self, spec: str = '0', rng: random.Random | None = None):
+        self.spec = spec
+        self._rng = rng or random.Random()
+        kind, _, args = spec.partition(':')
+        params = [float(a) for a in args.split(',')] if args else []
+        if kind in ('', '0', 'none'):
+            self._sample = lambda: 0.0
+        elif kind == 'const':
+            self._sample = lambda: params[0]
+        elif kind == 'uniform':
+            self._sample = lambda: self._rng.uniform(params[0], params[1])
+        elif kind == 'normal':
+            self._sample = lambda: max(0.0, self._rng.gauss(params[0], params[1]))
+        elif kind == 'exp':
+            self._sample = lambda: self._rng.expovariate(1.0 / params[0])
+        else:
+            raise ValueError(f"Unknown delay distribution: {spec!r}")
+
+    def sample(self) -> float:
+        return self._sample()
+
+
+class TemplateClassifier:
+    """
+    Nearest-template digit matcher. Templates are either loaded from an
+    .npz (key 'templates', 10×32×32) or rendered with cv2.putText in the
+    same dark-digit-on-white style that ROIFilter produces.
+    """
+    def __init__(self, path: str | None = None):
+        if path:
+            templates = np.load(path)['templates'].astype(np.float32)
+        else:
+            templates = self._render_templates()
+        flat = templates.reshape(len(templates), -1)
+        flat = flat - flat.mean(axis=1, keepdims=True)
+        flat /= np.linalg.norm(flat, axis=1, keepdims=True) + 1e-6
+        self._templates = flat
+
+    @staticmethod
+    def _render_templates() -> np.ndarray:
+        import cv2  # only needed when rendering built-in templates
+        out = np.empty((10, 32, 32), dtype=np.float32)
+        for digit in range(10):
+            canvas = np.full((32, 32), 255, dtype=np.uint8)
+            cv2.putText(canvas, str(digit), (9, 25),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, 0, 2, cv2.LINE_AA)
+            out[digit] = cv2.GaussianBlur(canvas, (3, 3), 0) / 255.0
+        return out
+
+    def __call__(self, image: np.ndarray) -> int:
+        x = image.reshape(-1) - image.mean()
+        x /= np.linalg.norm(x) + 1e-6
+        return int(np.argmax(self._templates @ x))
+
+
+class MLPClassifier:
+    """
+    Tiny NumPy MLP: loads W0,b0,W1,b1,... from an .npz and applies
+    ReLU between layers; the argmax of the last layer is the digit.
+    """
+    def __init__(self, path: str):
+        data = np.load(path)
+        self._layers = []
+        i = 0
+        while f'W{i}' in data:
+            self._layers.append((data[f'W{i}'].astype(np.float32),
+                                 data[f'b{i}'].astype(np.float32)))
+            i += 1
+        if not self._layers:
+            raise ValueError(f"{path}: expected arrays W0, b0, W1, b1, ...")
+
+    def __call__(self, image: np.ndarray) -> int:
+        x = image.reshape(-1)
+        for j, (w, b) in enumerate(self._layers):
+            x = x @ w + b
+            if j < len(self._layers) - 1:
+                np.maximum(x, 0, out=x)
+        return int(np.argmax(x))
+
+
+def make_classifier(spec: str | None):
+    """'none' → always 0, 'template[:file.npz]', 'mlp:file.npz'."""
+    if not spec or spec == 'none':
+        return None
+    kind, _, path = spec.partition(':')
+    if kind == 'template':
+        return TemplateClassifier(path or None)
+    if kind == 'mlp':
+        return MLPClassifier(path)
+    raise ValueError(f"Unknown classifier: {spec!r}")
+
+
+class FaultInjector:
+    """
+    Per-event fault probabilities:
+      drop_ack     skip an ACK (client must time out)
+      short_reads  split each reply into 1-byte writes
+      disconnect   drop the connection in the middle of an image
+      loss         UDP mode: lose a request or reply datagram
+    """
+    def __init__(self, drop_ack: float = 0.0, short_reads: float = 0.0,
+                 disconnect: float = 0.0, loss: float = 0.0,
+                 rng: random.Random | None = None):
+        self.drop_ack = drop_ack
+        self.short_reads = short_reads
+        self.disconnect = disconnect
+        self.loss = loss
+        self._rng = rng or random.Random()
+
+    def hit(self, p: float) -> bool:
+        return p > 0.0 and self._rng.random() < p
+
+
+class MockFPGAServer:
     """
-    Start a mock TCP server that implements the 4-packet image protocol:
+    asyncio mock of the board firmware implementing the 4-packet protocol:
       - For each image:
-          * Receive 4 × 1024 B packets
+          * Receive 4 × 1024 B packets (float32 32×32, native byte order)
           * After packets 1–3, send a single-byte ACK (0x01)
-          * After packet 4, send a 4-byte LE integer result (0)
-      - When a client disconnects, go back to listening for the next one
-    """
-    # Set up listening socket
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as srv:
-        srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        srv.bind((host, port))
-        srv.listen(1)
-        print(f"[+] Mock server listening on {host}:{port}")
-        
+          * After packet 4, send a 4-byte LE integer result
+    Unlike the board it serves any number of clients concurrently.
+
+    start_udp() adds the datagram protocol on the same port: each request
+    is one datagram (4-byte LE sequence number + image) answered with the
+    sequence number and the result. Datagrams are processed one at a time
+    in arrival order, like the board would.
+    """
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        packet_delay: DelayModel | None = None,
+        result_delay: DelayModel | None = None,
+        classifier=None,
+        faults: FaultInjector | None = None,
+        verbose: bool = False,
+    ):
+        self.host = host
+        self.port = port
+        self.packet_delay = packet_delay or DelayModel()
+        self.result_delay = result_delay or DelayModel()
+        self.classifier = classifier
+        self.faults = faults or FaultInjector()
+        self.verbose = verbose
+
+        self.clients = 0
+        self.images = 0
+
+    async def _reply(self, writer: asyncio.StreamWriter, data: bytes):
+        if self.faults.hit(self.faults.short_reads):
+            for i in range(len(data)):
+                writer.write(data[i:i + 1])
+                await writer.drain()
+                await asyncio.sleep(0)
+        else:
+            writer.write(data)
+            await writer.drain()
+
+    async def _handle_client(self, reader: asyncio.StreamReader,
+                             writer: asyncio.StreamWriter):
+        addr = writer.get_extra_info('peername')
+        self.clients += 1
+        print(f"[+] Connection from {addr} ({self.clients} active)")
+        image = bytearray(IMAGE_SIZE)
+        try:
+            while True:
+                # Receive one “image” = 4 × 1024-byte packets
+                for i in range(PACKETS_PER_IMAGE):
+                    packet = await reader.readexactly(PACKET_SIZE)
+                    image[PACKET_SIZE * i:PACKET_SIZE * (i + 1)] = packet
+                    if self.faults.hit(self.faults.disconnect):
+                        raise ConnectionResetError("injected disconnect")
+
+                    delay = self.packet_delay.sample()
+                    if delay:
+                        await asyncio.sleep(delay)
+
+                    # ACK for packets 1–3
+                    if i < PACKETS_PER_IMAGE - 1 and not self.faults.hit(self.faults.drop_ack):
+                        await self._reply(writer, ACK)
+
+                result = self._classify(image)
+
+                delay = self.result_delay.sample()
+                if delay:
+                    await asyncio.sleep(delay)
+                await self._reply(writer, result.to_bytes(RESULT_SIZE, byteorder='little', signed=False))
+
+                self.images += 1
+                if self.verbose:
+                    print(f"    • {addr}: result = {result}")
+
+        except asyncio.IncompleteReadError:
+            pass
+        except (ConnectionResetError, BrokenPipeError) as e:
+            if self.verbose:
+                print(f"[*] {addr}: {e or 'reset'}")
+        finally:
+            self.clients -= 1
+            writer.close()
+            print(f"[*] Client {addr} disconnected ({self.images} images served)")
+
+    async def start(self) -> asyncio.Server:
+        """
+        Start listening without blocking; port 0 picks a free port,
+        which is written back to self.port.
+        """
+        server = await asyncio.start_server(self._handle_client, self.host, self.port,
+                                            reuse_address=True)
+        self.port = server.sockets[0].getsockname()[1]
+        print(f"[+] Mock server listening on {self.host}:{self.port}")
+        return server
+
+    def _classify(self, image) -> int:
+        if self.classifier is None:
+            return 0
+        pixels = np.frombuffer(image, dtype=np.float32).reshape(32, 32)
+        return self.classifier(pixels)
+
+    async def _serve_datagrams(self, transport: asyncio.DatagramTransport,
+                               queue: asyncio.Queue):
         while True:
-            conn, addr = srv.accept()
-            print(f"[+] Connection from {addr}")
-            with conn:
-                try:
-                    while True:
-                        # Receive one “image” = 4 × 1024-byte packets
-                        for i in range(4):
-                            buf = b''
-                            while len(buf) < 1024:
-                                chunk = conn.recv(1024 - len(buf))
-                                if not chunk:
-                                    # Client closed mid-image
-                                    raise ConnectionResetError()
-                                buf += chunk
-                            print(f"    • Received packet {i+1} ({len(buf)} bytes)")
-                            
-                            # ACK for packets 1–3
-                            if i < 3:
-                                conn.sendall(b'\x01')
-                        
-                        # Send a dummy classification result (always 0)
-                        result = 0
-                        result_bytes = result.to_bytes(4, byteorder='little', signed=False)
-                        conn.sendall(result_bytes)
-                        print("    • Sent classification result =", result)
-                
-                except (ConnectionResetError, BrokenPipeError):
-                    print("[*] Client disconnected, waiting for next connection...\n")
-                except Exception as e:
-                    print("[!] Server error:", e, "\n[*] Waiting for next connection...\n")
+            data, addr = await queue.get()
+            if len(data) != UDP_HEADER.size + IMAGE_SIZE or self.faults.hit(self.faults.loss):
+                continue
+            (seq,) = UDP_HEADER.unpack_from(data)
+            delay = sum(self.packet_delay.sample() for _ in range(PACKETS_PER_IMAGE))
+            delay += self.result_delay.sample()
+            if delay:
+                await asyncio.sleep(delay)
+            result = self._classify(memoryview(data)[UDP_HEADER.size:])
+            self.images += 1
+            if not self.faults.hit(self.faults.loss):
+                transport.sendto(UDP_REPLY.pack(seq, result), addr)
+            if self.verbose:
+                print(f"    • {addr} #{seq}: result = {result}")
+
+    async def start_udp(self) -> asyncio.DatagramTransport:
+        """Serve the datagram protocol on self.port (call after start())."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        class Protocol(asyncio.DatagramProtocol):
+            def datagram_received(self, data, addr):
+                queue.put_nowait((data, addr))
+
+        transport, _ = await loop.create_datagram_endpoint(
+            Protocol, local_addr=(self.host, self.port))
+        self._udp_task = loop.create_task(self._serve_datagrams(transport, queue))
+        print(f"[+] Mock server listening on {self.host}:{self.port}/udp")
+        return transport
+
+    async def serve(self, udp: bool = False):
+        server = await self.start()
+        if udp:
+            await self.start_udp()
+        async with server:
+            await server.serve_forever()
+
+
+def start_mock_server(host: str, port: int, udp: bool = False, **kwargs):
+    """
+    Blocking entry point; kwargs are forwarded to MockFPGAServer.
+    """
+    asyncio.run(MockFPGAServer(host, port, **kwargs).serve(udp))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock FPGA inference server")
+    parser.add_argument('--host', default='0.0.0.0')
+    # port 7 by default to match the board
+    parser.add_argument('--port', type=int, default=7)
+    parser.add_argument('--packet-delay', default='0',
+                        help="delay after each 1 KB packet, e.g. 'uniform:0.0001,0.0005'")
+    parser.add_argument('--result-delay', default='0',
+                        help="delay before each result, e.g. 'exp:0.002'")
+    parser.add_argument('--classifier', default='none',
+                        help="'none', 'template[:templates.npz]' or 'mlp:weights.npz'")
+    parser.add_argument('--drop-ack', type=float, default=0.0)
+    parser.add_argument('--short-reads', type=float, default=0.0)
+    parser.add_argument('--disconnect', type=float, default=0.0)
+    parser.add_argument('--udp', action='store_true', help="also serve the datagram protocol")
+    parser.add_argument('--loss', type=float, default=0.0, help="UDP datagram loss probability")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    try:
+        start_mock_server(
+            args.host, args.port, args.udp,
+            packet_delay=DelayModel(args.packet_delay, rng),
+            result_delay=DelayModel(args.result_delay, rng),
+            classifier=make_classifier(args.classifier),
+            faults=FaultInjector(args.drop_ack, args.short_reads, args.disconnect,
+                                 args.loss, rng),
+            verbose=args.verbose,
+        )
+    except KeyboardInterrupt:
+        pass
+
 
 if __name__ == "__main__":
-    # listen on all interfaces, port 7 by default to match your client
-    start_mock_server("0.0.0.0", 7)
+    main()
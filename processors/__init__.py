@@ -1,2 +1,8 @@
+from core.packet import *
+from core.region import *
+from core.motion import *
 from .pre import *
-from .filter import *
\ No newline at end of file
+from .filter import *
+from .grouping import *
+from .yolo import *
+from .pool import *
@@ -0,0 +1,22 @@
+from PySide6.QtCore import QObject, Signal, Slot
+
+from core.grouping import group_batch
+from core.packet import ROIBatch
+
+
+class NumberGrouper(QObject):
+    """
+    Groups the digit results of a finished ROIBatch into numbers (see
+    core.grouping). The batch carries its own boxes and detection id, so
+    nothing has to be remembered between calls; superseded batches are
+    skipped.
+    """
+    labels_ready = Signal(object)       # the finished ROIBatch
+    numbers_ready = Signal(object)      # dict from group_digits() + 'frame_id', 'det_id', 'stream_id'
+
+    @Slot(object)
+    def on_batch(self, batch: ROIBatch):
+        if batch.superseded:
+            return
+        self.labels_ready.emit(batch)
+        self.numbers_ready.emit(group_batch(batch))
@@ -0,0 +1,102 @@
+import threading
+
+from PySide6.QtCore import Signal, Slot
+
+from core.adaptive import AdaptiveDetector
+from core.detect import BoxDetector
+from core.filter import preprocess_batch
+from core.motion import MotionGate
+from core.packet import FramePacket
+from core.quality import QualityGate
+from core.streams import ProcessingPool
+from .pre import PreProcessorBase
+
+_DETECTORS = {'boxes': BoxDetector, 'adaptive': AdaptiveDetector}
+
+
+class PoolProcessor(PreProcessorBase):
+    """
+    Qt adapter for core.streams.ProcessingPool: BoundingBox for several
+    cameras at once. Each stream gets its own BoxDetector, or with
+    detector='adaptive' AdaptiveDetector (built from `detector_options`,
+    see core.detect and core.adaptive), and all streams share one pool
+    of `workers` threads (default: one per core) under a fair scheduler.
+
+    on_frame only queues the FramePacket for its stream_id, so connect
+    the grabbers with Qt.DirectConnection. processed_frame and roi_batch
+    are emitted from the pool's threads; the batches' ROIs are already
+    preprocessed (and checked by `gate`, if set), no ROIFilter is needed.
+    skip_ratio is the mean of the streams' last reported motion-gate skip
+    ratios, reject_ratio the share of ROIs the gate rejected every
+    `report_every` ROIs, as BoundingBox and ROIFilter report them.
+    """
+    roi_batch = Signal(object)      # ROIBatch with 32×32 ROIs, any stream
+    skip_ratio = Signal(float)      # share of gated frames, all streams
+    reject_ratio = Signal(float)    # share of ROIs the gate rejected, all streams
+
+    def __init__(self, workers: int | None = None, enabled: bool = True,
+                 detector: str = "boxes", report_every: int = 50, **detector_options):
+        super().__init__(enabled)
+        self.detector_class = _DETECTORS[detector]
+        self.detector_options = detector_options
+        self.motion_gate = False
+        self.gate: QualityGate | None = None
+        self.report_every = report_every
+        self._skip: dict[int, float] = {}   # stream id → last skip ratio
+        self._mark = (0, 0)                 # gate (checked, rejected) at the last report
+        self._report_lock = threading.Lock()
+        self.pool = ProcessingPool(self._make_detector, workers, preprocess=self._preprocess,
+                                   on_result=self._on_result)
+
+    def _make_detector(self, stream_id: int) -> BoxDetector:
+        gate = MotionGate() if self.motion_gate else None
+        return self.detector_class(motion_gate=gate,
+                                   on_skip_ratio=lambda ratio: self._on_skip_ratio(stream_id, ratio),
+                                   **self.detector_options)
+
+    def _on_skip_ratio(self, stream_id: int, ratio: float):
+        self._skip[stream_id] = ratio
+        skip = list(self._skip.values())
+        self.skip_ratio.emit(sum(skip) / len(skip))
+
+    @Slot(bool)
+    def set_motion_gate_enabled(self, enabled: bool):
+        # BoxDetector.process reads its gate once, so swapping it while
+        # the pool's threads run is safe
+        self.motion_gate = enabled
+        self._skip.clear()
+        for detector in list(self.pool.detectors.values()):
+            detector.set_motion_gate_enabled(enabled)
+
+    @Slot(bool)
+    def set_quality_gate_enabled(self, enabled: bool):
+        self.gate = QualityGate() if enabled else None
+        self._mark = (0, 0)
+
+    def _preprocess(self, batch):
+        gate = self.gate
+        preprocess_batch(batch, gate)
+        if gate is None:
+            return
+        # the gate is shared by the pool's threads and counts under its lock
+        with self._report_lock:
+            checked, rejected = gate.counts()
+            last_checked, last_rejected = self._mark
+            if checked - last_checked >= self.report_every:
+                self.reject_ratio.emit((rejected - last_rejected) / (checked - last_checked))
+                self._mark = (checked, rejected)
+
+    @Slot(object)
+    def on_frame(self, frame):
+        if not self.enabled:
+            self.processed_frame.emit(FramePacket.of(frame))
+            return
+        self.pool.submit(frame)
+
+    def _on_result(self, packet, batch):
+        self.processed_frame.emit(packet)
+        if batch is not None:
+            self.roi_batch.emit(batch)
+
+    def stop(self):
+        self.pool.close()
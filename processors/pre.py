@@ -1,10 +1,20 @@
-import cv2
 from PySide6.QtCore import QObject, Signal, Slot
 
+from core.adaptive import AdaptiveDetector
+from core.detect import BoxDetector
+from core.motion import MotionGate
+from core.packet import FramePacket
+from core.rectify import PanelRectifier
+from core.region import SearchRegion
+
 
 class PreProcessorBase(QObject):
-    """Abstract base for frame processors."""
-    processed_frame = Signal(object)
+    """
+    Abstract base for frame processors. on_frame takes a FramePacket (or
+    a bare frame, which gets wrapped) and processed_frame passes the
+    packet on, once per frame.
+    """
+    processed_frame = Signal(object)    # FramePacket
 
     def __init__(self, enabled: bool = True):
         super().__init__()
@@ -13,76 +23,76 @@ class PreProcessorBase(QObject):
     @Slot(object)
     def on_frame(self, frame):
         # Default: pass-through
-        self.processed_frame.emit(frame)
+        self.processed_frame.emit(FramePacket.of(frame))
 
 class BoundingBox(PreProcessorBase):
-    """Bounding box processor with max‐ROI, size‐and‐boundary filtering."""
-    
-    roi_frames = Signal(list)
-    
-    def __init__(self, min_area: int = 5000, max_rois: int = 4, max_frac: float = 0.45, enabled: bool = True):
+    """
+    Qt adapter for core.detect.BoxDetector (see there for the detection
+    options): on_frame runs one frame through the detector, emits the
+    FramePacket as processed_frame and its ROIBatch, if any, as roi_batch.
+    The detector itself is `self.detector`.
+    """
+
+    roi_batch = Signal(object)  # ROIBatch: boxes and ROI crops (views into the frame)
+    skip_ratio = Signal(float)  # share of gated frames, every `report_every` frames
+
+    def __init__(self, min_area: int = 5000, max_rois: int = 4, max_frac: float = 0.45,
+                 detect_scale: float = 1.0, region: SearchRegion | None = None,
+                 extractor: str = "contours", motion_gate: MotionGate | None = None,
+                 report_every: int = 30, rank: str = "area",
+                 merge_overlap: float | None = 0.5, enabled: bool = True):
         super().__init__(enabled)
-        self.min_area = min_area
-        self.max_rois = max_rois
-        self.max_frac = max_frac  # maximum allowed fraction of frame area
-    
+        self.detector = BoxDetector(min_area, max_rois, max_frac, detect_scale, region,
+                                    extractor, motion_gate, report_every, rank, merge_overlap,
+                                    on_skip_ratio=self.skip_ratio.emit)
+
+    @Slot(float)
+    def set_detect_scale(self, scale: float):
+        self.detector.set_detect_scale(scale)
+
+    @Slot(object)
+    def set_region(self, region: SearchRegion | None):
+        self.detector.set_region(region)
+
+    @Slot(object)
+    def set_rectifier(self, rectifier: PanelRectifier | None):
+        self.detector.set_rectifier(rectifier)
+
+    @Slot(bool)
+    def set_motion_gate_enabled(self, enabled: bool):
+        self.detector.set_motion_gate_enabled(enabled)
+
+    @Slot(str)
+    def set_rank(self, rank: str):
+        self.detector.rank = rank
+
     @Slot(object)
     def on_frame(self, frame):
         if not self.enabled:
-            self.processed_frame.emit(frame)
+            self.processed_frame.emit(self.detector.skip(frame))
             return
+        packet, batch = self.detector.process(frame)
+        self.processed_frame.emit(packet)
+        if batch is not None:
+            self.roi_batch.emit(batch)
 
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        _, binary = cv2.threshold(
-            gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU
-        )
-        cv2.floodFill(binary, None, (0, 0), 0)
-
-        contours, _ = cv2.findContours(
-            binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
-        )
-
-        h_img, w_img = frame.shape[:2]
-        total_area = w_img * h_img
-
-        # 1) collect candidate boxes
-        boxes = []
-        for c in contours:
-            x, y, w, h = cv2.boundingRect(c)
-            area = w * h
-            if area < self.min_area:
-                continue
-
-            # make it square
-            size = max(w, h)
-            cx, cy = x + w // 2, y + h // 2
-            x1 = max(int(cx - size // 2), 0)
-            y1 = max(int(cy - size // 2), 0)
-            x2 = min(x1 + size, w_img)
-            y2 = min(y1 + size, h_img)
-
-            # 2) skip if covers > max_frac of the frame
-            if (size * size) / float(total_area) > self.max_frac:
-                continue
-
-            # 3) skip if touching any boundary
-            if x1 == 0 or y1 == 0 or x2 == w_img or y2 == h_img:
-                continue
-
-            boxes.append((x1, y1, x2, y2))
-
-        # 4) if too many ROIs, bail out entirely
-        if len(boxes) > self.max_rois:
-            self.processed_frame.emit(frame)
-            return
 
-        # 5) otherwise draw & emit each ROI
-        out = frame.copy()
-        rois = []
-        for x1, y1, x2, y2 in boxes:
-            cv2.rectangle(out, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            roi = frame[y1:y2, x1:x2]
-            rois.append(roi)
-        
-        self.roi_frames.emit(rois)
-        self.processed_frame.emit(out)
\ No newline at end of file
+class AdaptiveThreshold(BoundingBox):
+    """
+    Qt adapter for core.adaptive.AdaptiveDetector, the reference client's
+    adaptive-threshold detector (see there for the options). Same signals
+    and slots as BoundingBox, so it can replace it; set_detect_scale has
+    no effect, the detector always works at `work_width`.
+    """
+
+    def __init__(self, block_size: int = 25, c: int = 10, median: int = 5,
+                 max_rois: int = 4, max_frac: float = 0.45, work_width: int = 640,
+                 region: SearchRegion | None = None, motion_gate: MotionGate | None = None,
+                 report_every: int = 30, rank: str = "area",
+                 merge_overlap: float | None = 0.5, enabled: bool = True):
+        PreProcessorBase.__init__(self, enabled)
+        self.detector = AdaptiveDetector(block_size, c, median, work_width=work_width,
+                                         max_rois=max_rois, max_frac=max_frac, region=region,
+                                         motion_gate=motion_gate, report_every=report_every,
+                                         rank=rank, merge_overlap=merge_overlap,
+                                         on_skip_ratio=self.skip_ratio.emit)
@@ -0,0 +1,84 @@
+import threading
+
+from PySide6.QtCore import QThread, Signal, Slot
+
+from core.yolo import YoloModel
+from .pre import PreProcessorBase
+
+
+class YoloDetector(PreProcessorBase):
+    """
+    Qt adapter for core.yolo.YoloModel, emitting the same signals as
+    BoundingBox, so it can replace it or run next to it. The model's
+    session is created on the first frame, in the thread that processes
+    frames.
+
+    After start() it runs on its own QThread. on_frame only stores the
+    newest frame, so connect it with Qt.DirectConnection: while a frame
+    is being detected newer ones replace the pending one (counted in
+    `dropped`) instead of queueing up. Without start() frames are
+    processed synchronously.
+    """
+    roi_batch = Signal(object)  # ROIBatch, as BoundingBox
+    detections = Signal(int, object, object, object)  # detection id, boxes, scores, classes
+
+    _wake = Signal()
+
+    def __init__(self, model_path: str, input_size: int = 640, conf_thresh: float = 0.5,
+                 iou_thresh: float = 0.45, output_format: str = 'xyxy',
+                 max_rois: int | None = None, threads: int = 1, enabled: bool = True):
+        super().__init__(enabled)
+        self.model = YoloModel(model_path, input_size, conf_thresh, iou_thresh,
+                               output_format, max_rois, threads)
+        self._thread: QThread | None = None
+        self._lock = threading.Lock()
+        self._pending = None
+        self.dropped = 0    # frames replaced before they were processed
+        self._wake.connect(self._process_pending)
+
+    def start(self):
+        """Move the detector to its own thread."""
+        if self._thread is not None:
+            return
+        self._thread = QThread()
+        self.moveToThread(self._thread)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._thread.quit()
+            self._thread.wait()
+            self._thread = None
+
+    @Slot(object)
+    def on_frame(self, frame):
+        if self._thread is None:
+            self._process(frame)
+            return
+        with self._lock:
+            idle = self._pending is None
+            if not idle:
+                self.dropped += 1
+            self._pending = frame
+        if idle:
+            self._wake.emit()
+
+    @Slot()
+    def _process_pending(self):
+        with self._lock:
+            frame, self._pending = self._pending, None
+        if frame is not None:
+            self._process(frame)
+
+    def detect(self, frame) -> tuple:
+        """See YoloModel.detect."""
+        return self.model.detect(frame)
+
+    def _process(self, frame):
+        if not self.enabled:
+            self.processed_frame.emit(self.model.skip(frame))
+            return
+        packet, batch = self.model.process(frame)
+        self.detections.emit(packet.det_id, packet.boxes, self.model.scores, self.model.classes)
+        self.roi_batch.emit(batch)
+        self.processed_frame.emit(packet)
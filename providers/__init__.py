@@ -1 +1,7 @@
-from .source import *
\ No newline at end of file
+# FrameGrabber pulls in PySide6, which the Qt-free modules (backend,
+# transport, dataset) should not pay for, so it is imported on first use.
+def __getattr__(name):
+    if name == 'FrameGrabber':
+        from .source import FrameGrabber
+        return FrameGrabber
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,194 @@
+# backend.py
+import time
+from abc import ABC, abstractmethod
+import numpy as np
+
+_SCALE = np.float32(255.0)
+
+
+def normalize_roi(roi: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """
+    Write the board's payload for `roi` into the float32 array `out` and
+    return it. ROIFilter emits gray replicated to BGR, so only the first
+    channel is used; dividing in float32 gives the same bits as the old
+    (roi / 255.0).astype(float32). A float32 ROI is taken as already
+    normalized (packed datasets). Every backend and the dataset writer
+    go through here, so they all send the same bits.
+    """
+    if roi.ndim == 3:
+        roi = roi[..., 0]
+    if roi.dtype == np.float32:
+        out[...] = roi
+    else:
+        np.divide(roi, _SCALE, out=out, casting='unsafe')
+    return out
+
+
+class InferenceBackend(ABC):
+    """
+    What the client needs from whatever classifies ROIs: open, classify
+    32×32 ROIs into integers, close. FPGATransport (a board over TCP) and
+    OnnxBackend (local CPU) implement it, so the worker, the benchmark and
+    the evaluation tools never care which one is behind.
+
+    `batch_size` is how many ROIs one classify_batch call handles at
+    once; callers check cancellation and deadlines between batches.
+    """
+    name = "backend"
+    batch_size = 1
+
+    @property
+    @abstractmethod
+    def connected(self) -> bool: ...
+
+    @abstractmethod
+    def connect(self): ...
+
+    @abstractmethod
+    def close(self): ...
+
+    @abstractmethod
+    def classify(self, roi: np.ndarray, deadline: float | None = None) -> int: ...
+
+    def classify_batch(self, rois: list, deadline: float | None = None) -> list:
+        return [self.classify(roi, deadline) for roi in rois]
+
+    def __enter__(self):
+        if not self.connected:
+            self.connect()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class OnnxBackend(InferenceBackend):
+    """
+    Runs a small 32×32 digit model with ONNX Runtime on the CPU. ROIs are
+    normalized by normalize_roi, as for the board, into one preallocated
+    batch tensor, and each classify_batch call is a single session.run.
+
+    The input layout is taken from the model: N×1×32×32, N×32×32×1,
+    N×32×32 or N×1024. Logits are reduced with argmax; a model that
+    already outputs one value per ROI is used as is. A fixed batch
+    dimension in the model overrides `batch_size`.
+    """
+    name = "cpu"
+
+    def __init__(
+        self,
+        model_path: str,
+        intra_op_threads: int = 1,
+        inter_op_threads: int = 1,
+        batch_size: int = 32,
+        shape: tuple = (32, 32),
+    ):
+        self.model_path = model_path
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.batch_size = batch_size
+        self.shape = tuple(shape)
+        self._session = None
+        self._batch: np.ndarray | None = None
+
+    @property
+    def connected(self) -> bool:
+        return self._session is not None
+
+    def connect(self):
+        try:
+            import onnxruntime
+        except ImportError as e:
+            raise OSError(f"onnxruntime is not available: {e}") from e
+
+        opts = onnxruntime.SessionOptions()
+        opts.intra_op_num_threads = self.intra_op_threads
+        opts.inter_op_num_threads = self.inter_op_threads
+        opts.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        opts.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        try:
+            session = onnxruntime.InferenceSession(
+                self.model_path, sess_options=opts, providers=['CPUExecutionProvider']
+            )
+        except Exception as e:
+            # onnxruntime raises its own types (NoSuchFile, InvalidProtobuf, ...)
+            raise OSError(f"cannot load {self.model_path}: {e}") from e
+
+        inp = session.get_inputs()[0]
+        dims = list(inp.shape)
+        if isinstance(dims[0], int) and dims[0] > 0:
+            self.batch_size = dims[0]
+        h, w = self.shape
+        if len(dims) == 4 and dims[1] == 1:
+            layout = (1, h, w)
+        elif len(dims) == 4:
+            layout = (h, w, 1)
+        elif len(dims) == 3:
+            layout = (h, w)
+        elif len(dims) == 2:
+            layout = (h * w,)
+        else:
+            raise ValueError(f"{self.model_path}: unsupported input shape {inp.shape}")
+
+        self._batch = np.zeros((self.batch_size, h, w), dtype=np.float32)
+        self._layout = layout
+        self._fixed_batch = isinstance(dims[0], int) and dims[0] > 0
+        self._input = inp.name
+        self._output = session.get_outputs()[0].name
+        self._session = session
+
+    def close(self):
+        self._session = None
+
+    def classify(self, roi: np.ndarray, deadline: float | None = None) -> int:
+        return self.classify_batch([roi], deadline)[0]
+
+    def classify_batch(self, rois: list, deadline: float | None = None) -> list:
+        """
+        Classify up to `batch_size` ROIs per session.run; longer lists are
+        run in consecutive batches. `deadline` is checked before each run.
+        """
+        if self._session is None:
+            raise ConnectionError("not connected")
+        results = []
+        for start in range(0, len(rois), self.batch_size):
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError("request deadline exceeded")
+            chunk = rois[start:start + self.batch_size]
+            n = len(chunk)
+            for i, roi in enumerate(chunk):
+                normalize_roi(roi, self._batch[i])
+            rows = self.batch_size if self._fixed_batch else n
+            feed = self._batch[:rows].reshape((rows,) + self._layout)
+            out = self._session.run([self._output], {self._input: feed})[0][:n]
+            if out.ndim > 1 and out.shape[-1] > 1:
+                out = out.reshape(n, -1).argmax(axis=1)
+            results.extend(int(v) for v in out.reshape(n))
+        return results
+
+
+def make_backend(spec: str, threads: int = 1) -> InferenceBackend:
+    """
+    'fpga:HOST:PORT' (or 'fpga:/unix/socket' for a local broker) →
+    FPGATransport, 'udp:HOST:PORT' → UDPTransport, 'onnx:MODEL.onnx' →
+    OnnxBackend with `threads` intra-op threads.
+    """
+    kind, _, rest = spec.partition(':')
+
+    def address():
+        host, _, port = rest.rpartition(':')
+        if not port.isdigit():
+            raise ValueError(f"Bad port in backend {spec!r}, expected {kind}:HOST:PORT")
+        return host or '127.0.0.1', int(port)
+
+    if kind in ('fpga', 'tcp'):
+        from .transport import FPGATransport
+        if rest.startswith('/'):
+            return FPGATransport(rest, None)
+        return FPGATransport(*address())
+    if kind == 'udp':
+        from .transport import UDPTransport
+        return UDPTransport(*address())
+    if kind == 'onnx':
+        return OnnxBackend(rest, intra_op_threads=threads)
+    raise ValueError(f"Unknown backend: {spec!r}")
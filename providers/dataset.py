@@ -0,0 +1,236 @@
+# dataset.py
+"""
+Packed ROI datasets: one directory holding
+
+    data.bin     N×32×32 contiguous C-order array (uint8 or float32)
+    labels.npy   N int64 labels (-1 = unknown)
+    meta.npy     N records of ROI_META (frame id, time, box, board result)
+    index.json   dtype, shape, count, preprocessing and source notes
+
+data.bin is opened with np.memmap, so reading a dataset costs no decode
+and no copy. uint8 data holds ROIs as ROIFilter emits them (one gray
+channel); float32 data holds the normalized [0, 1] payload the board
+receives, ready to be sent as is.
+
+    python -m providers.dataset pack-dir Fnt0_9/ fnt.rois
+    python -m providers.dataset pack-sessions all.rois captures/*.rois --label-from-results
+    python -m providers.dataset info fnt.rois
+"""
+import argparse
+import json
+import os
+
+import cv2
+import numpy as np
+
+from .backend import normalize_roi
+
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+FORMAT_VERSION = 1
+
+ROI_META = np.dtype([
+    ('frame_id', '<i8'),
+    ('time', '<f8'),
+    ('box', '<i4', (4,)),
+    ('result', '<i8'),
+])
+
+
+def is_packed(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, 'index.json'))
+
+
+def iter_class_directory(path: str):
+    """(file path, label) for a directory with one sub-directory per class,
+    named by the digit or taken in sorted order."""
+    classes = sorted(d for d in os.listdir(path) if os.path.isdir(os.path.join(path, d)))
+    for index, name in enumerate(classes):
+        label = int(name) if name.isdigit() else index
+        class_dir = os.path.join(path, name)
+        for file in sorted(os.listdir(class_dir)):
+            if file.lower().endswith(IMAGE_EXTS):
+                yield os.path.join(class_dir, file), label
+
+
+class DatasetWriter:
+    """
+    Appends ROIs to a packed dataset; data.bin is written as ROIs come in,
+    labels, metadata and the index on close().
+    """
+    def __init__(self, path: str, dtype: str = 'uint8', shape: tuple = (32, 32),
+                 preprocessed: str = 'filter', source: str = ""):
+        if dtype not in ('uint8', 'float32'):
+            raise ValueError(f"dtype must be uint8 or float32, got {dtype!r}")
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.shape = tuple(shape)
+        self.preprocessed = preprocessed
+        self.source = source
+        self._data = open(os.path.join(path, 'data.bin'), 'wb')
+        self._buf = np.empty(self.shape, dtype=self.dtype)
+        self._labels: list[int] = []
+        self._meta: list[tuple] = []
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def append(self, roi: np.ndarray, label: int = -1, frame_id: int = -1,
+               t: float = 0.0, box=(0, 0, 0, 0), result: int = -1):
+        if roi.shape[:2] != self.shape:
+            raise ValueError(f"ROI must be {self.shape}, got {roi.shape[:2]}")
+        if self.dtype == np.float32:
+            # the bits the board receives
+            normalize_roi(roi, self._buf)
+        else:
+            self._buf[...] = roi[..., 0] if roi.ndim == 3 else roi
+        self._data.write(self._buf.data)
+        self._labels.append(int(label))
+        self._meta.append((frame_id, t, tuple(box), result))
+
+    def close(self):
+        if self._data.closed:
+            return
+        self._data.close()
+        np.save(os.path.join(self.path, 'labels.npy'), np.array(self._labels, dtype=np.int64))
+        np.save(os.path.join(self.path, 'meta.npy'), np.array(self._meta, dtype=ROI_META))
+        index = {
+            'version': FORMAT_VERSION,
+            'dtype': self.dtype.name,
+            'shape': list(self.shape),
+            'count': len(self._labels),
+            'preprocessed': self.preprocessed,
+            'source': self.source,
+        }
+        with open(os.path.join(self.path, 'index.json'), 'w') as f:
+            json.dump(index, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ROIDataset:
+    """
+    Read-only view of a packed dataset. `images` is an N×H×W np.memmap;
+    indexing and slicing it returns views into the page cache.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, 'index.json')) as f:
+            self.info = json.load(f)
+        if self.info.get('version', 1) > FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported dataset version {self.info['version']}")
+        self.dtype = np.dtype(self.info['dtype'])
+        self.shape = tuple(self.info['shape'])
+        count = self.info['count']
+        if count:
+            self.images = np.memmap(os.path.join(path, 'data.bin'), dtype=self.dtype,
+                                    mode='r', shape=(count,) + self.shape)
+        else:
+            self.images = np.empty((0,) + self.shape, dtype=self.dtype)
+        self.labels = np.load(os.path.join(path, 'labels.npy'))
+        meta_path = os.path.join(path, 'meta.npy')
+        self.meta = np.load(meta_path) if os.path.exists(meta_path) else None
+
+    def __len__(self) -> int:
+        return len(self.images)
+
+    def __getitem__(self, index):
+        return self.images[index]
+
+    @property
+    def preprocessed(self) -> str:
+        return self.info.get('preprocessed', 'none')
+
+    def batches(self, size: int):
+        """Consecutive views of up to `size` ROIs."""
+        for start in range(0, len(self.images), size):
+            yield self.images[start:start + size]
+
+
+def pack_directory(src: str, dst: str, preprocess: bool = True, dtype: str = 'uint8') -> int:
+    """
+    Decode a class directory once into a packed dataset, optionally through
+    the live ROIFilter preprocessing (else a plain 32×32 resize).
+    Returns the number of ROIs written.
+    """
+    from core.filter import preprocess_roi
+    with DatasetWriter(dst, dtype, preprocessed='filter' if preprocess else 'resize',
+                       source=os.path.abspath(src)) as writer:
+        for file, label in iter_class_directory(src):
+            img = cv2.imread(file, cv2.IMREAD_COLOR)
+            if img is None:
+                continue
+            if preprocess:
+                roi = preprocess_roi(img)
+            else:
+                roi = cv2.resize(img, (32, 32), interpolation=cv2.INTER_AREA)
+            writer.append(roi, label)
+        return len(writer)
+
+
+def pack_sessions(srcs: list, dst: str, label_from_results: bool = False) -> int:
+    """
+    Concatenate captured sessions (see ROIRecorder) into one dataset.
+    With `label_from_results`, unlabeled ROIs take the board's result as
+    their label, e.g. to replay a session against another backend.
+    """
+    sessions = [ROIDataset(src) for src in srcs]
+    if not sessions:
+        raise ValueError("no sessions given")
+    first = sessions[0]
+    for s in sessions[1:]:
+        if (s.dtype, s.shape, s.preprocessed) != (first.dtype, first.shape, first.preprocessed):
+            raise ValueError(f"{s.path}: dtype/shape/preprocessing differ from {first.path}")
+
+    with DatasetWriter(dst, first.dtype.name, first.shape, first.preprocessed,
+                       source=", ".join(os.path.abspath(p) for p in srcs)) as writer:
+        for s in sessions:
+            labels = s.labels
+            meta = s.meta
+            if meta is None:
+                meta = np.zeros(len(s), dtype=ROI_META)
+                meta['frame_id'] = meta['result'] = -1
+            if label_from_results:
+                labels = np.where(labels >= 0, labels, meta['result'])
+            for roi, label, m in zip(s.images, labels.tolist(), meta):
+                writer.append(roi, label, int(m['frame_id']), float(m['time']),
+                              m['box'].tolist(), int(m['result']))
+        return len(writer)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    p = sub.add_parser('pack-dir', help="pack a class directory")
+    p.add_argument('src')
+    p.add_argument('dst')
+    p.add_argument('--raw', action='store_true', help="plain resize instead of ROIFilter preprocessing")
+    p.add_argument('--float32', action='store_true', help="store the normalized board payload")
+    p = sub.add_parser('pack-sessions', help="concatenate captured sessions")
+    p.add_argument('dst')
+    p.add_argument('srcs', nargs='+')
+    p.add_argument('--label-from-results', action='store_true')
+    p = sub.add_parser('info', help="describe a packed dataset")
+    p.add_argument('path')
+    args = parser.parse_args()
+
+    if args.cmd == 'pack-dir':
+        n = pack_directory(args.src, args.dst, not args.raw, 'float32' if args.float32 else 'uint8')
+        print(f"{n} ROIs → {args.dst}")
+    elif args.cmd == 'pack-sessions':
+        n = pack_sessions(args.srcs, args.dst, args.label_from_results)
+        print(f"{n} ROIs → {args.dst}")
+    else:
+        ds = ROIDataset(args.path)
+        print(json.dumps(ds.info, indent=2))
+        labels, counts = np.unique(ds.labels, return_counts=True)
+        print("labels:", dict(zip(labels.tolist(), counts.tolist())))
+
+
+if __name__ == "__main__":
+    main()
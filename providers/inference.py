@@ -1,8 +1,9 @@
 # inference.py
-import socket
-import numpy as np
 from PySide6.QtCore import QObject, QThread, Signal
 
+from core.infer import run_batch
+from .transport import FPGATransport
+
 class InferenceWorker(QThread):
     inference_complete = Signal()
     classification_result = Signal(int)  # emits the integer result per-ROI
@@ -15,40 +16,27 @@ class InferenceWorker(QThread):
 
     def run(self):
         # 1) Open one persistent TCP connection
+        transport = FPGATransport(self.host, self.port)
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.connect((self.host, self.port))
-        except socket.error as e:
+            transport.connect()
+        except OSError as e:
             print(f"[InferenceWorker] Failed to connect: {e}")
             self.inference_complete.emit()
             return
 
-        # 2) Send each ROI as 4×1 KB packets of float32 data
-        for roi in self.rois:
-            # normalize & cast to float32
-            arr = (roi.astype(np.float32) / 255.0).ravel()
-            data = arr.tobytes()  # total length = 32×32×4 = 4096 bytes
-
-            # send in 4 packets of 1024 bytes
-            for i in range(4):
-                start = 1024 * i
-                end   = start + 1024
-                sock.sendall(data[start:end])
-                print(f"[InferenceWorker] Sent packet {i+1}/4")
+        # 2) Send the ROIs as 4×1 KB packets of float32 data, a batch
+        #    at a time, and read their exact-length results
+        def emit_results(index, results):
+            for result in results:
+                self.classification_result.emit(result)
 
-                # for packets 1–3 wait for a 1 KB‐ack before proceeding
-                if i < 3:
-                    ack = sock.recv(1024)
-                    print(f"[InferenceWorker] Received packet-ack: {ack!r}")
-
-            # 3) After the 4th packet, wait for the final result
-            result_bytes = sock.recv(1024)
-            result = int.from_bytes(result_bytes, byteorder='little', signed=False)
-            print(f"[InferenceWorker] Classification result: {result}")
-            self.classification_result.emit(result)
+        try:
+            run_batch(transport, self.rois, on_results=emit_results)
+        except OSError as e:
+            print(f"[InferenceWorker] Transport error: {e}")
 
-        # 4) Clean up
-        sock.close()
+        # 3) Clean up
+        transport.close()
         self.inference_complete.emit()
 
 
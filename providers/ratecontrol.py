@@ -0,0 +1,126 @@
+# ratecontrol.py
+import time
+
+from PySide6.QtCore import QObject, QTimer, Signal, Slot
+
+
+class AdaptiveRateController(QObject):
+    """
+    Drives FrameGrabber.set_fps from inference feedback. Latency is
+    smoothed with an EWMA; when it exceeds the target, batches back up,
+    are superseded before they are sent, or none come back at all, the
+    rate is cut multiplicatively, and when there is headroom (or nothing
+    was sent) it creeps back up towards the user's ceiling (the FPS
+    slider). With auto mode off the slider value is passed straight
+    through.
+    """
+    rate_changed   = Signal(int)        # FPS to apply to the grabber
+    status_changed = Signal(int, str)   # effective FPS, reason
+
+    def __init__(
+        self,
+        max_fps: int = 24,
+        min_fps: int = 1,
+        target_latency: float = 0.1,    # seconds
+        max_backlog: int = 1,           # batches waiting or in flight when one is sent
+        alpha: float = 0.3,             # EWMA weight of the newest sample
+        decrease: float = 0.8,
+        interval_ms: int = 250,         # minimum time between adjustments
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.max_fps = max_fps
+        self.min_fps = min_fps
+        self.target_latency = target_latency
+        self.max_backlog = max_backlog
+        self.alpha = alpha
+        self.decrease = decrease
+        self.enabled = False
+
+        self.fps = float(max_fps)
+        self.latency: float | None = None
+        self._backlog = 0
+        self._superseded = 0
+        self._last_sent = 0.0
+        self._last_sample = 0.0
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._adjust)
+
+    @Slot(bool)
+    def set_enabled(self, enabled: bool):
+        self.enabled = enabled
+        if enabled:
+            self._timer.start()
+        else:
+            self._timer.stop()
+            self._apply(self.max_fps, "manual", force=True)
+
+    @Slot(int)
+    def set_max_fps(self, fps: int):
+        if fps <= 0:
+            return
+        self.max_fps = fps
+        if not self.enabled:
+            self._apply(fps, "manual", force=True)
+        elif self.fps > fps:
+            self._apply(fps, "ceiling")
+
+    @Slot(int)
+    def on_batch_sent(self, backlog: int):
+        """One call per batch sent, with the batches waiting or in flight before it."""
+        self._backlog = max(self._backlog, backlog)
+        self._last_sent = time.monotonic()
+
+    @Slot(float, bool)
+    def on_inference_stats(self, latency: float, superseded: bool):
+        """
+        One sample per batch handed back: its latency (s) if it finished,
+        or whether a newer batch superseded it before it was sent, which
+        counts as backlog.
+        """
+        if superseded:
+            self._superseded += 1
+            return
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.alpha * (latency - self.latency)
+        self._last_sample = time.monotonic()
+
+    def _adjust(self):
+        now = time.monotonic()
+        window = 4 * self._timer.interval() / 1000.0
+        latency_ms = 1000 * (self.latency or 0.0)
+        target_ms = 1000 * self.target_latency
+
+        if now - self._last_sent > window:
+            self.latency = None
+            fps, reason = self.fps + 1, "idle: nothing sent"
+        elif self._superseded:
+            fps, reason = self.fps * self.decrease, f"{self._superseded} batches superseded"
+        elif self._backlog > self.max_backlog:
+            fps, reason = self.fps * self.decrease, f"backlog {self._backlog} batches"
+        elif now - self._last_sample > window:
+            fps, reason = self.fps * self.decrease, f"no results for {1000 * window:.0f} ms"
+        elif latency_ms > target_ms:
+            fps, reason = self.fps * self.decrease, f"latency {latency_ms:.0f} ms > {target_ms:.0f} ms"
+        elif latency_ms < 0.7 * target_ms:
+            fps, reason = self.fps + 1, f"headroom: latency {latency_ms:.0f} ms"
+        else:
+            fps, reason = self.fps, f"holding: latency {latency_ms:.0f} ms"
+
+        self._backlog = 0
+        self._superseded = 0
+        if fps >= self.max_fps:
+            reason = f"at ceiling ({reason})"
+        self._apply(fps, reason)
+
+    def _apply(self, fps: float, reason: str, force: bool = False):
+        fps = min(max(fps, self.min_fps), self.max_fps)
+        changed = int(fps) != int(self.fps)
+        self.fps = fps
+        if changed or force:
+            self.rate_changed.emit(int(fps))
+        self.status_changed.emit(int(fps), reason)
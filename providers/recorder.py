@@ -0,0 +1,39 @@
+# recorder.py
+import time
+
+from PySide6.QtCore import QObject, Slot
+
+from .dataset import DatasetWriter
+
+
+class ROIRecorder(QObject):
+    """
+    Captures the ROIs the client sends, with their boxes and board
+    results, into a packed dataset (a "session"). Wire the finished
+    ROIBatches (TCPWidget.batch_ready) → on_batch; superseded batches
+    and ROIs without a result are recorded too, with result -1.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._writer: DatasetWriter | None = None
+
+    @property
+    def recording(self) -> bool:
+        return self._writer is not None
+
+    def start(self, path: str):
+        self.stop()
+        self._writer = DatasetWriter(path, source="capture")
+
+    def stop(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    @Slot(object)
+    def on_batch(self, batch):
+        if self._writer is None:
+            return
+        t = time.time()
+        for roi, box, result in zip(batch.rois, batch.boxes.tolist(), batch.results.tolist()):
+            self._writer.append(roi, frame_id=batch.frame_id, t=t, box=box, result=result)
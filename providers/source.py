@@ -1,11 +1,20 @@
-import cv2
 from PySide6.QtCore import QObject, Signal, Slot, QTimer, QThread
 
+from core.source import FrameSource
 from modes import VideoModes
 
 
 class FrameGrabber(QObject):
-    frame_ready = Signal(object)
+    """
+    Qt adapter for core.source.FrameSource: reads a frame on a timer and
+    emits each one as a FramePacket (frame id + grab time).
+
+    The source is opened by run(), not by the constructor, so opening a
+    camera (which can take seconds or fail) happens in the grabber's
+    thread on the first Start; the outcome is reported through `opened`.
+    """
+    frame_ready = Signal(object)    # FramePacket
+    opened = Signal(bool, str)      # source opened / failed to open, with the error
 
     def __init__(
         self,
@@ -14,6 +23,7 @@ class FrameGrabber(QObject):
         image_list=None,
         manual: bool = False,
         fps: int = 60,
+        stream_id: int = 0,
     ):
         super().__init__()
         self._timer = QTimer(self)
@@ -24,20 +34,9 @@ class FrameGrabber(QObject):
         self._update_interval()
 
         # set up attrs
-        self.source = source
-        self.mode = mode
         self.manual = manual
-        self.image_list = image_list or []
-        self.image_index = 0
-        self.cam: cv2.VideoCapture | None = None
-
-        if mode in (VideoModes.WEBCAM, VideoModes.VIDEO):
-            self.init_camera(source)
-
-    def init_camera(self, source: int):
-        self.cam = cv2.VideoCapture(source)
-        if not self.cam.isOpened():
-            raise RuntimeError(f"Cannot open {self.mode.name} source {source}")
+        self.stream_id = stream_id
+        self.frames = FrameSource(source, mode, image_list, stream_id)
 
     def _update_interval(self):
         interval_ms = max(1, int(1000 / self._fps))
@@ -45,16 +44,27 @@ class FrameGrabber(QObject):
 
     @Slot()
     def run(self):
+        if self.frames.is_capture and self.frames.cam is None:
+            try:
+                self.frames.open()
+            except RuntimeError as e:
+                self.opened.emit(False, str(e))
+                return
+            self.opened.emit(True, "")
         if not self._timer.isActive():
             self._timer.start()
-        if self.mode in (VideoModes.WEBCAM, VideoModes.VIDEO) and not self.cam:
-            self.init_camera(self.source)
 
     @Slot()
     def stop(self):
         self._timer.stop()
         # note: we keep cam around until change_source to avoid flicker
 
+    @Slot()
+    def close(self):
+        """Stop grabbing and release the source; call it in the grabber's thread."""
+        self._timer.stop()
+        self.frames.release()
+
     @Slot(int)
     def set_fps(self, fps: int):
         if fps <= 0:
@@ -65,22 +75,9 @@ class FrameGrabber(QObject):
             self._timer.start()
 
     def _grab_frame(self):
-        if self.mode in (VideoModes.WEBCAM, VideoModes.VIDEO):
-            ret, frame = self.cam.read()
-            if not ret and self.mode == VideoModes.VIDEO:
-                self.cam.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                ret, frame = self.cam.read()
-            if ret:
-                self.frame_ready.emit(frame)
-
-        elif self.mode == VideoModes.IMAGES:
-            if not self.image_list:
-                return
-            path = self.image_list[self.image_index]
-            frame = cv2.imread(path)
-            if frame is not None:
-                self.frame_ready.emit(frame)
-            self.image_index = (self.image_index + 1) % len(self.image_list)
+        packet = self.frames.read()
+        if packet is not None:
+            self.frame_ready.emit(packet)
 
     @Slot(int, object, list)
     def change_source(self, source, mode, image_list=None):
@@ -91,20 +88,9 @@ class FrameGrabber(QObject):
         was_running = self._timer.isActive()
         self.stop()
 
-        # release old camera if any
-        if self.cam:
-            self.cam.release()
-            self.cam = None
-
-        # update attrs
-        self.source = source
-        self.mode = mode
-        self.image_list = image_list or []
-        self.image_index = 0
-
-        # init new source if needed
-        if mode in (VideoModes.WEBCAM, VideoModes.VIDEO):
-            self.init_camera(source)
+        # release old camera if any, open the new source
+        self.frames.release()
+        self.frames = FrameSource(source, mode, image_list, self.stream_id)
 
         # restart if we were running
         if was_running:
@@ -0,0 +1,75 @@
+from PySide6.QtCore import QMetaObject, QObject, QThread, Qt, Signal, Slot
+
+from modes import VideoModes
+from .source import FrameGrabber
+
+
+class SourceManager(QObject):
+    """
+    Runs several sources at once, each a FrameGrabber on its own thread,
+    tagged with a stream id (0, 1, ... in the order they were added).
+    All their FramePackets come out of frame_ready, emitted in the
+    grabbers' threads: connect a consumer that only queues the frame
+    (PoolProcessor) with Qt.DirectConnection, so frames never pass
+    through the UI thread.
+    """
+    frame_ready = Signal(object)        # FramePacket, any stream
+    opened = Signal(int, bool, str)     # stream id, opened / failed, error
+
+    # internal: queued calls into the grabbers' threads
+    _sig_start = Signal()
+    _sig_stop = Signal()
+    _sig_fps = Signal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._streams: dict[int, tuple] = {}    # stream id → (grabber, thread)
+        self._next_id = 0
+
+    @property
+    def stream_ids(self) -> list:
+        return list(self._streams)
+
+    def add_source(self, source=0, mode: VideoModes = VideoModes.WEBCAM,
+                   image_list=None, fps: int = 30) -> int:
+        """Add a source (opened on the next start()); returns its stream id."""
+        stream_id = self._next_id
+        self._next_id += 1
+        grabber = FrameGrabber(source, mode, image_list=image_list, fps=fps, stream_id=stream_id)
+        thread = QThread(self)
+        grabber.moveToThread(thread)
+        grabber.frame_ready.connect(self.frame_ready, Qt.DirectConnection)
+        grabber.opened.connect(lambda ok, error: self.opened.emit(stream_id, ok, error))
+        self._sig_start.connect(grabber.run)
+        self._sig_stop.connect(grabber.stop)
+        self._sig_fps.connect(grabber.set_fps)
+        thread.start()
+        self._streams[stream_id] = (grabber, thread)
+        return stream_id
+
+    def remove_source(self, stream_id: int):
+        grabber, thread = self._streams.pop(stream_id)
+        for signal, slot in ((self._sig_start, grabber.run), (self._sig_stop, grabber.stop),
+                             (self._sig_fps, grabber.set_fps)):
+            signal.disconnect(slot)
+        grabber.frame_ready.disconnect()
+        # the grabber's timer lives in its thread: stop it there, then the thread
+        QMetaObject.invokeMethod(grabber, "close", Qt.BlockingQueuedConnection)
+        thread.quit()
+        thread.wait()
+
+    @Slot()
+    def start(self):
+        self._sig_start.emit()
+
+    @Slot()
+    def stop(self):
+        self._sig_stop.emit()
+
+    @Slot(int)
+    def set_fps(self, fps: int):
+        self._sig_fps.emit(fps)
+
+    def close(self):
+        for stream_id in self.stream_ids:
+            self.remove_source(stream_id)
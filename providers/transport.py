@@ -0,0 +1,308 @@
+# transport.py
+import mmap
+import socket
+import struct
+import time
+import numpy as np
+
+from .backend import InferenceBackend, normalize_roi
+
+# --- Board protocol ---
+# Each ROI is 32×32 float32 (4 KB) sent as 4 × 1 KB packets. The board
+# answers packets 1–3 with a 1-byte ACK and packet 4 with the result.
+PACKET_SIZE     = 1024
+PACKETS_PER_ROI = 4
+ROI_BYTES       = PACKET_SIZE * PACKETS_PER_ROI
+ACK_SIZE        = 1
+RESULT_SIZE     = 4
+
+# --- Datagram protocol (UDP) ---
+# One datagram per ROI: a 4-byte LE sequence number followed by the 4 KB
+# payload. The reply echoes the sequence number with the 4-byte result.
+# Lost or late datagrams are handled by the client (timeout, retransmit),
+# and replies are matched by sequence number, so there is no ACK and no
+# head-of-line blocking.
+UDP_HEADER = struct.Struct('<I')
+UDP_REPLY  = struct.Struct('<II')   # sequence number, result
+
+
+def recv_exact(sock: socket.socket, view: memoryview):
+    """
+    Fill `view` completely from `sock`. TCP is a byte stream, so a single
+    recv() may return part of a reply or several replies at once; looping
+    on recv_into keeps the stream in sync.
+    """
+    got = 0
+    size = len(view)
+    while got < size:
+        n = sock.recv_into(view[got:], size - got)
+        if n == 0:
+            raise ConnectionError("connection closed by peer")
+        got += n
+
+
+class ROISerializer:
+    """
+    Writes a normalized float32 ROI straight into one reusable, page-aligned
+    buffer (an anonymous mmap) and exposes 1 KB memoryview packets over it,
+    so sending a ROI allocates nothing and copies the pixels exactly once.
+    """
+    def __init__(self, shape: tuple = (32, 32)):
+        self._buf = mmap.mmap(-1, ROI_BYTES)
+        self.array = np.frombuffer(self._buf, dtype=np.float32).reshape(shape)
+        self.view = memoryview(self._buf)
+        self.packets = [
+            self.view[PACKET_SIZE * i:PACKET_SIZE * (i + 1)]
+            for i in range(PACKETS_PER_ROI)
+        ]
+
+    def pack(self, roi: np.ndarray) -> memoryview:
+        """Normalize `roi` to [0, 1] into the buffer (see normalize_roi)."""
+        normalize_roi(roi, self.array)
+        return self.view
+
+
+class FPGATransport(InferenceBackend):
+    """
+    One persistent TCP connection to a board speaking the 4-packet
+    protocol. ACK and result replies are read with exact lengths into
+    preallocated buffers, and each operation has its own timeout.
+
+    Any error mid-ROI leaves the stream in an unknown position, so the
+    socket is closed and the caller has to reconnect.
+
+    With `port=None`, `host` is the path of a Unix socket (a local
+    broker, see broker.py).
+    """
+    name = "fpga"
+
+    def __init__(
+        self,
+        host: str,
+        port: int | None,
+        connect_timeout: float = 5.0,
+        send_timeout: float = 1.0,
+        ack_timeout: float = 1.0,
+        result_timeout: float = 2.0,
+        ack_size: int = ACK_SIZE,
+        result_size: int = RESULT_SIZE,
+    ):
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self.send_timeout = send_timeout
+        self.ack_timeout = ack_timeout
+        self.result_timeout = result_timeout
+        self._sock: socket.socket | None = None
+
+        self._ack_buf = bytearray(ack_size)
+        self._ack_view = memoryview(self._ack_buf)
+        self._result_buf = bytearray(result_size)
+        self._result_view = memoryview(self._result_buf)
+        self._serializer = ROISerializer()
+
+    @property
+    def sock(self) -> socket.socket | None:
+        return self._sock
+
+    @property
+    def connected(self) -> bool:
+        return self._sock is not None
+
+    def connect(self):
+        if self.port is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.settimeout(self.connect_timeout)
+                sock.connect(self.host)
+            except OSError:
+                sock.close()
+                raise
+        else:
+            sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock = sock
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+
+    def send_roi(self, data, deadline: float | None = None) -> int:
+        """
+        Send one 4 KB ROI payload and return the board's result.
+        `deadline` is an optional time.monotonic() bound on the request,
+        checked only before the ROI is started: a ROI whose deadline has
+        passed is not sent, while one already in flight runs under the
+        per-operation timeouts, so the deadline never leaves the stream
+        half-way through a ROI.
+        """
+        if self._sock is None:
+            raise ConnectionError("not connected")
+        if deadline is not None and time.monotonic() >= deadline:
+            raise TimeoutError("request deadline exceeded")
+        if data is self._serializer.view:
+            packets = self._serializer.packets
+        else:
+            view = memoryview(data).cast('B')
+            if len(view) != ROI_BYTES:
+                raise ValueError(f"ROI payload must be {ROI_BYTES} bytes, got {len(view)}")
+            packets = [view[PACKET_SIZE * i:PACKET_SIZE * (i + 1)] for i in range(PACKETS_PER_ROI)]
+
+        sock = self._sock
+        try:
+            for i, packet in enumerate(packets):
+                sock.settimeout(self.send_timeout)
+                sock.sendall(packet)
+                # the last packet is answered by the result, not an ACK
+                if i < PACKETS_PER_ROI - 1:
+                    sock.settimeout(self.ack_timeout)
+                    recv_exact(sock, self._ack_view)
+
+            sock.settimeout(self.result_timeout)
+            recv_exact(sock, self._result_view)
+        except Exception:
+            self.close()
+            raise
+        return int.from_bytes(self._result_buf, byteorder='little', signed=False)
+
+    def classify(self, roi: np.ndarray, deadline: float | None = None) -> int:
+        """
+        Normalize a 32×32 ROI to float32 [0, 1] and send it.
+        """
+        return self.send_roi(self._serializer.pack(roi), deadline)
+
+
+class UDPTransport(InferenceBackend):
+    """
+    The board over UDP: up to `batch_size` ROIs are serialized into
+    preallocated datagram slots and sent back to back, then replies are
+    collected by sequence number. ROIs still unanswered after
+    `retransmit_timeout` are sent again, up to `retries` times; stale or
+    duplicate replies are ignored.
+
+    There is no stream to fall out of sync, so a timeout leaves the socket
+    open; only a socket error (e.g. ICMP port unreachable) closes it.
+    """
+    name = "udp"
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        retransmit_timeout: float = 0.05,
+        retries: int = 3,
+        batch_size: int = 16,
+    ):
+        self.host = host
+        self.port = port
+        self.retransmit_timeout = retransmit_timeout
+        self.retries = retries
+        self.batch_size = batch_size
+        self._sock: socket.socket | None = None
+        self._seq = 0
+
+        slot = UDP_HEADER.size + ROI_BYTES
+        self._buf = bytearray(slot * batch_size)
+        view = memoryview(self._buf)
+        self._slots = [view[slot * i:slot * (i + 1)] for i in range(batch_size)]
+        self._arrays = [
+            np.frombuffer(self._buf, dtype=np.float32, count=ROI_BYTES // 4,
+                          offset=slot * i + UDP_HEADER.size).reshape(32, 32)
+            for i in range(batch_size)
+        ]
+        self._reply_buf = bytearray(64)
+
+        # counters
+        self.sent = 0
+        self.retransmitted = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._sock is not None
+
+    def connect(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            # a connected UDP socket only receives from the board
+            sock.connect((self.host, self.port))
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+
+    def _pack(self, slot: int, seq: int, roi: np.ndarray):
+        """Sequence number and normalize_roi payload into datagram slot `slot`."""
+        UDP_HEADER.pack_into(self._buf, len(self._slots[0]) * slot, seq)
+        normalize_roi(roi, self._arrays[slot])
+
+    def classify(self, roi: np.ndarray, deadline: float | None = None) -> int:
+        return self.classify_batch([roi], deadline)[0]
+
+    def classify_batch(self, rois: list, deadline: float | None = None) -> list:
+        if self._sock is None:
+            raise ConnectionError("not connected")
+        results = []
+        for start in range(0, len(rois), self.batch_size):
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError("request deadline exceeded")
+            try:
+                results.extend(self._send_window(rois[start:start + self.batch_size], deadline))
+            except TimeoutError:
+                raise
+            except OSError:
+                self.close()
+                raise
+        return results
+
+    def _send_window(self, rois: list, deadline: float | None) -> list:
+        sock = self._sock
+        pending = {}        # sequence number → index in `rois`
+        for i, roi in enumerate(rois):
+            seq = self._seq
+            self._seq = (seq + 1) & 0xFFFFFFFF
+            self._pack(i, seq, roi)
+            pending[seq] = i
+
+        results = [0] * len(rois)
+        reply = memoryview(self._reply_buf)
+        for attempt in range(self.retries + 1):
+            for i in pending.values():
+                sock.send(self._slots[i])
+            self.sent += len(pending)
+            if attempt:
+                self.retransmitted += len(pending)
+
+            resend_at = time.monotonic() + self.retransmit_timeout
+            while pending:
+                remaining = resend_at - time.monotonic()
+                if deadline is not None:
+                    remaining = min(remaining, deadline - time.monotonic())
+                if remaining <= 0:
+                    break
+                sock.settimeout(remaining)
+                try:
+                    n = sock.recv_into(reply)
+                except socket.timeout:
+                    break
+                if n != UDP_REPLY.size:
+                    continue
+                seq, result = UDP_REPLY.unpack_from(reply)
+                i = pending.pop(seq, None)
+                if i is not None:
+                    results[i] = result
+            if not pending:
+                return results
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError("request deadline exceeded")
+        raise TimeoutError(f"{len(pending)} of {len(rois)} ROIs unanswered "
+                           f"after {self.retries} retransmits")
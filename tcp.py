@@ -1,38 +1,211 @@
-import socket
-import numpy as np
-from PySide6.QtCore import Signal, Slot
+import os
+import time
+from collections import deque
+from functools import partial
+
+from PySide6.QtCore import QObject, QThread, Signal, Slot
 from PySide6.QtWidgets import (
-    QWidget, QLineEdit, QPushButton,
+    QWidget, QLineEdit, QPushButton, QCheckBox, QSpinBox, QComboBox, QLabel,
     QFormLayout, QHBoxLayout, QMessageBox
 )
 
+from core.infer import run_batch
+from core.packet import ROIBatch
+from providers.backend import InferenceBackend, OnnxBackend
+from providers.transport import FPGATransport, UDPTransport
+
+
+class TransportWorker(QObject):
+    """
+    Owns the inference backend (a board via FPGATransport, or the CPU) on
+    a background thread and runs the batches TCPWidget hands it, one at a
+    time. Every batch carries an id and a deadline; a batch runs to its
+    end, and only the ROIs not yet started at the deadline are skipped.
+    With a fallback backend set, a board that cannot be reached or drops
+    mid-batch is replaced by the fallback for the following batches.
+    The sig_* signals are queued calls into the worker's thread.
+    """
+    connected       = Signal(bool, str)      # state, error message
+    backend_changed = Signal(str)            # name of the backend in use
+    results_ready   = Signal(int, int, list) # batch id, index of the first ROI, results
+    batch_done      = Signal(int)            # batch id
+    error_occurred  = Signal(str)
+
+    sig_open     = Signal(object)
+    sig_fallback = Signal(object)
+    sig_close    = Signal()
+    sig_submit   = Signal(int, list, float)
+
+    def __init__(self):
+        super().__init__()
+        self._backend: InferenceBackend | None = None
+        self._fallback: InferenceBackend | None = None
+        self.sig_open.connect(self.open)
+        self.sig_fallback.connect(self.set_fallback)
+        self.sig_close.connect(self.close)
+        self.sig_submit.connect(self.process)
+
+        # counters
+        self.timed_out = 0    # ROIs skipped or aborted at their deadline
+
+    @Slot(object)
+    def set_fallback(self, backend: InferenceBackend | None):
+        if self._fallback is not None and self._fallback is not self._backend:
+            self._fallback.close()
+        self._fallback = backend
+
+    @Slot(object)
+    def open(self, backend: InferenceBackend):
+        try:
+            backend.connect()
+        except Exception as e:
+            if not self._use_fallback(e):
+                self.connected.emit(False, str(e))
+            return
+        self._backend = backend
+        self.connected.emit(True, "")
+        self.backend_changed.emit(backend.name)
+
+    @Slot()
+    def close(self):
+        for backend in (self._backend, self._fallback):
+            if backend is not None:
+                backend.close()
+        self._backend = None
+        self.connected.emit(False, "")
+
+    def _use_fallback(self, e: Exception) -> bool:
+        """Switch to the fallback backend after `e`; False if there is none."""
+        fallback = self._fallback
+        if fallback is None or fallback is self._backend:
+            return False
+        try:
+            if not fallback.connected:
+                fallback.connect()
+        except Exception as fe:
+            self.error_occurred.emit(f"fallback failed: {fe}")
+            return False
+        self.error_occurred.emit(f"{e or type(e).__name__}; using {fallback.name}")
+        self._backend = fallback
+        self.connected.emit(True, "")
+        self.backend_changed.emit(fallback.name)
+        return True
+
+    @Slot(int, list, float)
+    def process(self, batch_id: int, rois: list, deadline: float):
+        try:
+            backend = self._backend
+            if backend is None:
+                return
+            done = run_batch(backend, rois, deadline,
+                             on_results=lambda index, results: self.results_ready.emit(batch_id, index, results))
+            self.timed_out += len(rois) - done
+        except TimeoutError as e:
+            self.timed_out += 1
+            self._on_error(e)
+        except Exception as e:
+            self._on_error(e)
+        finally:
+            self.batch_done.emit(batch_id)
+
+    def _on_error(self, e: Exception):
+        # the transport drops a connection whose stream is out of sync
+        if self._backend and not self._backend.connected:
+            self._backend = None
+            if self._use_fallback(e):
+                return
+            self.connected.emit(False, str(e))
+        self.error_occurred.emit(str(e) or type(e).__name__)
+
 
 class TCPWidget(QWidget):
     """
-    Blocking TCP client: connect/disconnect and send ROIs in-place.
-    WARNING: all operations block the UI thread!
+    Inference client: connect/disconnect and send ROIs. The backend is
+    either a board over TCP or UDP or an ONNX model on the CPU, which can
+    also stand in when the board is unreachable. All I/O and inference runs
+    on TransportWorker threads, so the UI never blocks.
+
+    `connections` workers each open their own connection and run one
+    batch at a time. With more than one, point them at the broker
+    (broker.py), which serves one ROI per client at a time and spreads
+    the clients over the boards, so throughput scales with the boards.
+
+    send_batch takes an ROIBatch and batch_ready hands it back once,
+    with its results filled in, when a worker is done with it. Every
+    stream has its own queue, and free workers take the streams in turn
+    (round-robin), one batch of a stream at a time, so each stream's
+    results come in order and no camera starves another. With "latest
+    frame only" a batch still waiting is replaced by a newer one of its
+    stream and handed back unsent, marked `superseded`; a batch in flight
+    always finishes, so results keep coming when a batch takes longer
+    than a frame period.
     """
     # Signals you already wire up:
     state_changed         = Signal(bool)    # True=connected, False=disconnected
-    classification_result = Signal(int)     # each ROI’s result
-    inference_complete    = Signal()        # after the last ROI
+    batch_ready           = Signal(object)  # finished ROIBatch, once per batch
     error_occurred        = Signal(str)     # on any socket error
+    batch_sent            = Signal(int)            # batches waiting or in flight before it
+    inference_stats       = Signal(float, bool)    # latency (s), superseded; per batch sent
+    backend_changed       = Signal(str)            # 'fpga' / 'udp' / 'cpu'
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, request_timeout_ms: int = 500,
+                 model_path: str = "digits.onnx", connections: int = 1):
         super().__init__(parent)
-        self._sock = None
+        self._connected = False
+        self._batch = 0
+        self.superseded = 0       # batches replaced by a newer one before they were sent
+        self._queues: dict[int, deque] = {}        # stream id → batches waiting, oldest first
+        self._ring: deque = deque()                # stream ids, next in turn first
+        self._inflight: dict[int, tuple] = {}      # batch id → (batch, indexes of the sent ROIs, worker)
+        self._workers: list[TransportWorker] = []
+        self._threads: list[QThread] = []
+        self._open: set = set()                    # connected workers
+        self._busy: set = set()                    # workers running a batch
+        self._connecting = 0                       # connect attempts not answered yet
+        self._connect_errors: list[str] = []
 
         # --- UI ---
+        self.backend_input = QComboBox()
+        self.backend_input.addItem("FPGA (TCP)", "fpga")
+        self.backend_input.addItem("FPGA (UDP)", "udp")
+        self.backend_input.addItem("CPU (ONNX)", "cpu")
         self.host_input    = QLineEdit("127.0.0.1")
         self.port_input    = QLineEdit("8000")
         self.port_input.setFixedWidth(80)
+        self.connections_input = QSpinBox()
+        self.connections_input.setRange(1, 16)
+        self.connections_input.setValue(connections)
+        self.connections_input.setToolTip(
+            "Parallel connections, each running one batch at a time; "
+            "use the broker to spread them over several boards"
+        )
+        self.timeout_input = QSpinBox()
+        self.timeout_input.setRange(10, 10000)
+        self.timeout_input.setSuffix(" ms")
+        self.timeout_input.setValue(request_timeout_ms)
+        self.latest_only_box = QCheckBox("Latest frame only")
+        self.latest_only_box.setChecked(True)
+        self.model_input   = QLineEdit(model_path)
+        self.threads_input = QSpinBox()
+        self.threads_input.setRange(1, os.cpu_count() or 1)
+        self.threads_input.setValue(min(4, os.cpu_count() or 1))
+        self.fallback_box  = QCheckBox("Fall back to CPU")
+        self.active_label  = QLabel("–")
         self.connect_btn    = QPushButton("Connect")
         self.disconnect_btn = QPushButton("Disconnect")
         self.disconnect_btn.setEnabled(False)
 
         form = QFormLayout(self)
+        form.addRow("Backend:", self.backend_input)
         form.addRow("Host:", self.host_input)
         form.addRow("Port:", self.port_input)
+        form.addRow("Connections:", self.connections_input)
+        form.addRow("Model:", self.model_input)
+        form.addRow("CPU threads:", self.threads_input)
+        form.addRow("Timeout:", self.timeout_input)
+        form.addRow(self.latest_only_box)
+        form.addRow(self.fallback_box)
+        form.addRow("Active:", self.active_label)
         btn_row = QHBoxLayout()
         btn_row.addWidget(self.connect_btn)
         btn_row.addWidget(self.disconnect_btn)
@@ -41,112 +214,235 @@ class TCPWidget(QWidget):
         # --- Signals ---
         self.connect_btn.clicked.connect(self._on_connect)
         self.disconnect_btn.clicked.connect(self._on_disconnect)
+        self.backend_input.currentIndexChanged.connect(self._update_inputs)
+        self._update_inputs()
+
+    @property
+    def request_timeout(self) -> float:
+        """Per-batch deadline in seconds."""
+        return self.timeout_input.value() / 1000.0
+
+    @property
+    def latest_only(self) -> bool:
+        return self.latest_only_box.isChecked()
+
+    def _cpu_backend(self) -> OnnxBackend:
+        return OnnxBackend(self.model_input.text().strip(),
+                           intra_op_threads=self.threads_input.value())
+
+    def _start_workers(self, count: int):
+        """`count` TransportWorkers, each on its own thread."""
+        if len(self._workers) == count:
+            return
+        self._stop_workers()
+        for _ in range(count):
+            worker = TransportWorker()
+            thread = QThread(self)
+            worker.moveToThread(thread)
+            worker.connected.connect(self._on_worker_connected)
+            worker.backend_changed.connect(self._on_backend_changed)
+            worker.results_ready.connect(self._on_results)
+            worker.batch_done.connect(self._on_batch_done)
+            worker.error_occurred.connect(self.error_occurred)
+            thread.start()
+            self._workers.append(worker)
+            self._threads.append(thread)
+
+    def _stop_workers(self):
+        for worker in self._workers:
+            worker.sig_close.emit()
+        for thread in self._threads:
+            thread.quit()
+            thread.wait()
+        self._workers, self._threads = [], []
+        self._open.clear()
+        self._busy.clear()
+
+    @Slot()
+    def _update_inputs(self):
+        """Enable the inputs that matter for the chosen backend."""
+        editable = not self._connected
+        fpga = self.backend_input.currentData() != "cpu"
+        self.backend_input.setEnabled(editable)
+        self.host_input.setEnabled(editable and fpga)
+        self.port_input.setEnabled(editable and fpga)
+        self.fallback_box.setEnabled(editable and fpga)
+        self.model_input.setEnabled(editable)
+        self.threads_input.setEnabled(editable)
+        self.connections_input.setEnabled(editable)
 
     @Slot()
     def _on_connect(self):
-        host = self.host_input.text().strip()
-        try:
-            port = int(self.port_input.text())
-        except ValueError:
-            QMessageBox.warning(self, "Invalid Port", "Port must be an integer.")
+        kind = self.backend_input.currentData()
+        if kind != "cpu":
+            host = self.host_input.text().strip()
+            try:
+                # a path is a broker's Unix socket
+                port = None if host.startswith('/') else int(self.port_input.text())
+            except ValueError:
+                QMessageBox.warning(self, "Invalid Port", "Port must be an integer.")
+                return
+            if kind == "udp" and port is None:
+                QMessageBox.warning(self, "Invalid Host", "UDP needs a host and port.")
+                return
+
+        if kind == "cpu":
+            self.open_backends(self._cpu_backend)
             return
+        if kind == "udp":
+            make_backend = partial(UDPTransport, host, port)
+        else:
+            make_backend = partial(FPGATransport, host, port, connect_timeout=5.0)
+        self.open_backends(make_backend,
+                           self._cpu_backend if self.fallback_box.isChecked() else None)
 
+    def open_backends(self, make_backend, make_fallback=None):
+        """
+        Connect `connections` workers, each to a backend of its own from
+        make_backend() (and a fallback from make_fallback(), if given).
+        """
         # disable UI while connecting
         self.connect_btn.setEnabled(False)
-        self.host_input.setEnabled(False)
-        self.port_input.setEnabled(False)
-
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5.0)
-            sock.connect((host, port))
-            self._sock = sock
-            self._set_connected(True)
-        except Exception as e:
-            self.error_occurred.emit(str(e))
-            QMessageBox.critical(self, "Connect Error", str(e))
-            # restore UI
-            self.connect_btn.setEnabled(True)
-            self.host_input.setEnabled(True)
-            self.port_input.setEnabled(True)
+        for widget in (self.backend_input, self.host_input, self.port_input, self.connections_input,
+                       self.model_input, self.threads_input, self.fallback_box):
+            widget.setEnabled(False)
+        self._start_workers(self.connections_input.value())
+        self._connecting = len(self._workers)
+        self._connect_errors = []
+        for worker in self._workers:
+            worker.sig_fallback.emit(make_fallback() if make_fallback is not None else None)
+            worker.sig_open.emit(make_backend())
 
     @Slot()
     def _on_disconnect(self):
-        if not self._sock:
+        if not self._connected:
             return
+        for worker in self._workers:
+            worker.sig_close.emit()
 
-        try:
-            self._sock.close()
-            self._sock = None
-            self._set_connected(False)
-        except Exception as e:
-            self.error_occurred.emit(str(e))
-            QMessageBox.warning(self, "Disconnect Error", str(e))
+    @Slot(bool, str)
+    def _on_worker_connected(self, state: bool, error: str):
+        worker = self.sender()
+        if state:
+            self._open.add(worker)
+        else:
+            self._open.discard(worker)
+        if self._connecting:
+            self._connecting -= 1
+            if error:
+                self._connect_errors.append(error)
+            if not self._connecting and self._connect_errors:
+                errors = self._connect_errors
+                if not self._open:
+                    # connect attempt failed
+                    self.error_occurred.emit(errors[0])
+                    QMessageBox.critical(self, "Connect Error", errors[0])
+                else:
+                    self.error_occurred.emit(f"{len(errors)} of {len(self._workers)} "
+                                             f"connections failed: {errors[0]}")
+        if state or not self._connecting:
+            connected = bool(self._open)
+            if connected != self._connected or not connected:
+                self._set_connected(connected)
+        self._dispatch()
+
+    @Slot(str)
+    def _on_backend_changed(self, name: str):
+        self.active_label.setText(name)
+        self.backend_changed.emit(name)
 
     def _set_connected(self, state: bool):
         """Enable/disable UI elements and emit state_changed."""
+        self._connected = state
         self.connect_btn.setEnabled(not state)
         self.disconnect_btn.setEnabled(state)
-        self.host_input.setEnabled(not state)
-        self.port_input.setEnabled(not state)
+        self._update_inputs()
+        if not state:
+            self.active_label.setText("–")
+            for queue in self._queues.values():
+                while queue:
+                    self._hand_back(queue.popleft())
         self.state_changed.emit(state)
 
-    @Slot(list)
-    def send_rois(self, rois: list):
+    @Slot(object)
+    def send_batch(self, batch: ROIBatch) -> int:
         """
-        **Blocking**: for each ROI, send 4×1 KB float32 chunks with ACKs,
-        then read 1 KB result, emit classification_result, and finally
-        inference_complete.
+        Queue the batch's accepted ROIs for the workers and return its
+        batch id (0 if it is not sent: not connected or nothing accepted,
+        in which case batch_ready follows right away with no results).
+        With "latest frame only", a new batch replaces the one of its
+        stream still waiting, if any; that one is handed back unsent,
+        marked `superseded`.
         """
-        if not self._sock or not rois:
-            self.inference_complete.emit()
+        if not self._connected or not len(batch.send_index):
+            self._hand_back(batch)
+            return 0
+
+        self.batch_sent.emit(len(self._inflight) + sum(len(q) for q in self._queues.values()))
+        self._batch += 1
+        batch.batch_id = self._batch
+        queue = self._queues.get(batch.stream_id)
+        if queue is None:
+            queue = self._queues[batch.stream_id] = deque()
+            self._ring.append(batch.stream_id)
+        while self.latest_only and queue:
+            old = queue.popleft()
+            old.superseded = True
+            self.superseded += 1
+            self._hand_back(old)
+            self.inference_stats.emit(old.t_done - old.t_detect, True)
+        queue.append(batch)
+        self._dispatch()
+        return self._batch
+
+    def _next_batch(self) -> ROIBatch | None:
+        """Oldest waiting batch of the next stream in turn that has none in flight."""
+        inflight = {batch.stream_id for batch, _, _ in self._inflight.values()}
+        for stream_id in self._ring:
+            queue = self._queues[stream_id]
+            if queue and stream_id not in inflight:
+                # served: its turn comes again after every other stream's
+                self._ring.remove(stream_id)
+                self._ring.append(stream_id)
+                return queue.popleft()
+        return None
+
+    def _dispatch(self):
+        """Hand waiting batches to the free workers, taking the streams in turn."""
+        for worker in self._workers:
+            if worker not in self._open or worker in self._busy:
+                continue
+            batch = self._next_batch()
+            if batch is None:
+                return
+            send = batch.send_index
+            batch.t_sent = time.monotonic()
+            self._busy.add(worker)
+            self._inflight[batch.batch_id] = (batch, send, worker)
+            worker.sig_submit.emit(batch.batch_id, [batch.rois[i] for i in send],
+                                   batch.t_sent + self.request_timeout)
+
+    def _hand_back(self, batch: ROIBatch):
+        batch.t_done = time.monotonic()
+        self.batch_ready.emit(batch)
+
+    @Slot(int, int, list)
+    def _on_results(self, batch_id: int, index: int, results: list):
+        batch, send, _ = self._inflight.get(batch_id, (None, None, None))
+        if batch is None:
             return
+        batch.results[send[index:index + len(results)]] = results
 
-        try:
-            for roi in rois:
-                # normalize to [0,1], cast float32, flatten
-                # arr = (roi.astype(np.float32) / 255.0).ravel()
-                # data = arr.tobytes()  # = 4096 bytes
-                
-                
-                image_value_32b_numpy = ((roi)/255.0).astype(np.float32)#.astype(np.uint8)
-                img_raw = image_value_32b_numpy.tobytes()#将图片转化为二进制格式
-                for i in range(1,5):#4个数据包,每个数据包1k,整个图片4kb float32 归一化 !!低地址存高字节
-                    self._sock.send(img_raw[1024*(i-1):1024*i])#发送图像矩阵
-                    packet_flag = -1#结果返回标志
-                    #第四个数据包是最后一个数据包,不用应答and i!=4
-                    while(packet_flag==-1 and i!=4):#等待FPGA确认接收到这个1K数据包则发送下一个数据包
-                        msg = self._sock.recv(1024)#接收来自FPGA 1字节验证数据,用于表示已经成功接收到1KB数据包
-                        packet_flag = 1                   
-                Result_flag = -1#结果返回标志
-                while(Result_flag==-1):
-                    msg = self._sock.recv(1024)#接收来自FPGA 1字节验证数据,用于表示已经成功接收到这张图片
-                    Result_flag = 1
-                    Result = int.from_bytes(msg,byteorder='little',signed=False)#bytes 转int byteorder 大端还是小端   
-                    self.classification_result.emit(Result)
-                #添加结果
-                
-                # for i range(1, 5):
-                    
-                #     if len(data) < 1024 * i:
-                #         raise ValueError(f"ROI data too short: {len(data)} bytes")
-
-                # # send in four 1024‐byte chunks
-                # for i in range(4):
-                #     chunk = data[1024*i : 1024*(i+1)]
-                #     self._sock.sendall(chunk)
-                #     # wait ACK after each of the first three
-                #     if i < 3:
-                #         _ = self._sock.recv(1024)
-
-                # # final classification reply
-                # result_bytes = self._sock.recv(1024)
-                # result = int.from_bytes(result_bytes,
-                #                         byteorder='little',
-                #                         signed=False)
-                # self.classification_result.emit(result)
+    @Slot(int)
+    def _on_batch_done(self, batch_id: int):
+        batch, _, worker = self._inflight.pop(batch_id, (None, None, None))
+        if batch is None:
+            return
+        self._busy.discard(worker)
+        self._hand_back(batch)
+        self.inference_stats.emit(batch.t_done - batch.t_sent, False)
+        self._dispatch()
 
-        except Exception as e:
-            self.error_occurred.emit(str(e))
-        finally:
-            self.inference_complete.emit()
+    def shutdown(self):
+        """Close the connections and stop the worker threads."""
+        self._stop_workers()
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from evaluate import confusion_matrix, report
+
+
+def test_unlabeled_rois_are_not_scored():
+    labels = np.array([0, 1, -1, 2, -1])
+    predictions = np.array([0, 1, 2, 0, 2])
+    result = report(labels, predictions, np.array([0.001]), 1.0, 0.0, 1)
+
+    assert result['images'] == 5
+    assert result['unlabeled'] == 2
+    assert result['accuracy'] == pytest.approx(2 / 3)
+    # the -1 labels do not wrap around into the last class's row
+    assert np.array(result['confusion']).sum() == 3
+    assert result['confusion'][2] == [1, 0, 0, 0]
+
+
+def test_confusion_matrix_skips_unlabeled():
+    matrix = confusion_matrix(np.array([-1, -1, 1]), np.array([1, 1, 1]), 2)
+    assert matrix.tolist() == [[0, 0, 0], [0, 1, 0]]
+
+
+def test_no_labels_fails_clearly():
+    labels = np.full(4, -1)
+    with pytest.raises(ValueError, match="no labeled ROIs"):
+        report(labels, np.zeros(4, dtype=np.int64), np.array([0.001]), 1.0, 0.0, 1)
@@ -0,0 +1,29 @@
+import numpy as np
+
+from providers.backend import normalize_roi
+from providers.dataset import DatasetWriter, ROIDataset
+from providers.transport import ROISerializer, UDPTransport
+
+
+def test_every_path_sends_the_same_bits(tmp_path):
+    rng = np.random.default_rng(0)
+    gray = rng.integers(0, 256, (32, 32), dtype=np.uint8)
+    bgr = np.repeat(gray[..., None], 3, axis=2)
+    expected = (gray / 255.0).astype(np.float32)
+
+    assert normalize_roi(bgr, np.empty((32, 32), np.float32)).tobytes() == expected.tobytes()
+
+    serializer = ROISerializer()
+    assert bytes(serializer.pack(bgr)) == expected.tobytes()
+
+    udp = UDPTransport('127.0.0.1', 9)
+    udp._pack(1, 5, bgr)
+    assert udp._arrays[1].tobytes() == expected.tobytes()
+
+    path = str(tmp_path / "rois")
+    with DatasetWriter(path, 'float32') as writer:
+        writer.append(bgr, 3)
+    assert np.asarray(ROIDataset(path).images[0]).tobytes() == expected.tobytes()
+
+    # float32 ROIs are taken as already normalized
+    assert bytes(serializer.pack(expected)) == expected.tobytes()
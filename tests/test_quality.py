@@ -0,0 +1,23 @@
+import threading
+
+import numpy as np
+
+from core.quality import QualityGate
+
+
+def test_shared_gate_counts_every_roi():
+    gate = QualityGate()
+    rois = [np.zeros((32, 32), np.uint8) for _ in range(4)]     # empty: rejected
+    sharpness = np.full(4, 10.0)
+    threads, calls = 8, 300
+
+    def run():
+        for _ in range(calls):
+            gate.check(rois, sharpness)
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    assert gate.counts() == (threads * calls * 4, threads * calls * 4)
@@ -0,0 +1,36 @@
+from providers.ratecontrol import AdaptiveRateController
+
+
+def make_controller(qapp, fps: int = 60) -> AdaptiveRateController:
+    controller = AdaptiveRateController(max_fps=fps)
+    controller.set_enabled(True)
+    controller._timer.stop()    # _adjust is called by hand
+    return controller
+
+
+def test_superseded_batches_cut_the_rate(qapp):
+    controller = make_controller(qapp)
+    status = []
+    controller.status_changed.connect(lambda fps, reason: status.append(reason))
+    for _ in range(5):
+        # every batch is replaced before it is sent: no latency samples at all
+        controller.on_batch_sent(1)
+        controller.on_inference_stats(0.0, True)
+        controller._adjust()
+    assert controller.fps < 60 * 0.8 ** 4
+    assert all("superseded" in reason for reason in status[-5:])
+
+
+def test_sending_without_results_is_not_idle(qapp):
+    controller = make_controller(qapp)
+    controller.on_batch_sent(0)
+    controller._last_sample = 0.0   # nothing came back
+    controller._adjust()
+    assert controller.fps < 60
+
+
+def test_silence_is_idle_only_when_nothing_was_sent(qapp):
+    controller = make_controller(qapp, fps=30)
+    controller.fps = 10.0
+    controller._adjust()
+    assert controller.fps == 11.0
@@ -0,0 +1,112 @@
+import time
+
+import numpy as np
+
+from conftest import process_events
+from core.packet import ROIBatch
+from providers.backend import InferenceBackend
+from tcp import TCPWidget
+
+
+class SlowBackend(InferenceBackend):
+    """Answers every ROI with 7 after `per_roi` seconds."""
+    name = "slow"
+
+    def __init__(self, per_roi: float):
+        self.per_roi = per_roi
+        self._open = False
+
+    @property
+    def connected(self) -> bool:
+        return self._open
+
+    def connect(self):
+        self._open = True
+
+    def close(self):
+        self._open = False
+
+    def classify(self, roi, deadline=None) -> int:
+        time.sleep(self.per_roi)
+        return 7
+
+
+def make_batch(frame_id: int, n: int = 4) -> ROIBatch:
+    rois = [np.zeros((32, 32), np.uint8) for _ in range(n)]
+    return ROIBatch(frame_id, frame_id, np.zeros((n, 4)), rois)
+
+
+def test_results_arrive_when_batches_outlast_the_frame_period(qapp):
+    widget = TCPWidget(request_timeout_ms=1000)
+    ready = []
+    widget.batch_ready.connect(ready.append)
+    widget.open_backends(lambda: SlowBackend(0.02))
+    assert process_events(qapp, 2.0, until=lambda: widget._connected)
+
+    # 4 ROIs × 20 ms per batch against a 24 FPS frame period
+    frames = 24
+    for frame_id in range(frames):
+        widget.send_batch(make_batch(frame_id))
+        process_events(qapp, 1 / 24)
+    assert process_events(qapp, 2.0, until=lambda: len(ready) == frames)
+    widget.shutdown()
+
+    answered = [b for b in ready if not b.superseded]
+    assert len(answered) >= frames // 4
+    for batch in answered:
+        assert (batch.results == 7).all()
+    for batch in ready:
+        if batch.superseded:
+            assert (batch.results == -1).all()
+    # the last frame is never replaced, so its results always arrive
+    assert ready[-1].frame_id == frames - 1 and not ready[-1].superseded
+
+
+def connect(qapp, widget: TCPWidget, per_roi: float):
+    widget.open_backends(lambda: SlowBackend(per_roi))
+    assert process_events(qapp, 2.0, until=lambda: len(widget._open) == len(widget._workers))
+
+
+def test_streams_are_served_in_turn(qapp):
+    widget = TCPWidget(request_timeout_ms=1000)
+    widget.latest_only_box.setChecked(False)
+    ready = []
+    widget.batch_ready.connect(ready.append)
+    connect(qapp, widget, 0.005)
+
+    # stream 0 queues a backlog before streams 1 and 2 send anything
+    for frame_id in range(8):
+        widget.send_batch(make_batch(frame_id, 2))
+    for stream_id in (1, 2):
+        late = make_batch(100, 2)
+        late.stream_id = stream_id
+        widget.send_batch(late)
+    assert process_events(qapp, 5.0, until=lambda: len(ready) == 10)
+    widget.shutdown()
+
+    # stream 0's first batch went out at once and its second was queued
+    # first; then every stream has its turn, instead of sending in order
+    assert [b.stream_id for b in ready[:5]] == [0, 0, 1, 2, 0]
+
+
+def test_connections_serve_streams_in_parallel(qapp):
+    def run(connections: int) -> float:
+        widget = TCPWidget(request_timeout_ms=1000, connections=connections)
+        widget.latest_only_box.setChecked(False)
+        ready = []
+        widget.batch_ready.connect(ready.append)
+        connect(qapp, widget, 0.01)
+        t0 = time.monotonic()
+        for frame_id in range(10):
+            for stream_id in range(2):
+                batch = make_batch(frame_id)
+                batch.stream_id = stream_id
+                widget.send_batch(batch)
+        assert process_events(qapp, 10.0, until=lambda: len(ready) == 20)
+        elapsed = time.monotonic() - t0
+        widget.shutdown()
+        assert all((b.results == 7).all() for b in ready)
+        return elapsed
+
+    # 20 batches × 4 ROIs × 10 ms: ~0.8 s on one connection
+    assert run(2) < 0.75 * run(1)
@@ -100,8 +100,8 @@ class VideoWidget(QWidget):
         return box
 
     @Slot(object)
-    def on_frame(self, frame):
-        self.latest_frame = frame
+    def on_frame(self, packet):
+        self.latest_frame = packet.image
 
     def update_display(self):
         if hasattr(self, 'latest_frame'):
@@ -1,4 +1,18 @@
-from .roiviewer import *
-from .livesource import *
-from .sourcecontrol import *
-from .roiviewer import *
\ No newline at end of file
+# Widget modules are imported on first use, so importing one widget does
+# not pay for the others.
+import importlib
+
+_MODULES = {
+    'ROIViewerWidget': 'roiviewer',
+    'ThumbnailLabel': 'roiviewer',
+    'VideoWidget': 'livesource',
+    'SourceControlWidget': 'sourcecontrol',
+    'VideoGrid': 'videogrid',
+}
+
+
+def __getattr__(name):
+    if name in _MODULES:
+        module = importlib.import_module(f".{_MODULES[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,28 +1,50 @@
 import cv2
 import sys
+from typing import TYPE_CHECKING
 
-from PySide6.QtCore import Qt, QTimer, Slot, QThread
+import numpy as np
 
-from PySide6.QtGui import QPixmap, QImage
+from PySide6.QtCore import Qt, QTimer, Slot, QThread, Signal, QEvent, QPointF, QRectF
+
+from PySide6.QtGui import QPixmap, QImage, QPainter, QPen, QColor, QFont, QPolygonF
 
 from PySide6.QtWidgets import \
     QApplication, QLabel, QWidget, QVBoxLayout, QSizePolicy
 
-from processors.pre import PreProcessorBase, BoundingBox
-from providers.source import FrameGrabber
+from core.packet import NO_BOXES, FramePacket
+from core.region import SearchRegion
+
+if TYPE_CHECKING:
+    from processors.pre import PreProcessorBase
 
 class VideoWidget(QWidget):
-    """Widget to display video feed (with or without processing)."""
+    """
+    Widget to display video feed (with or without processing).
+    Boxes, per-digit results, grouped numbers and the search region are
+    painted as a vector overlay on the scaled pixmap at display time, so
+    frames are never copied to be drawn on. Results are shown on the boxes
+    of the detection they belong to, or, while a newer detection is still
+    being classified, on the boxes within `match_tol` pixels of it.
+    In region-edit mode, left-drag draws the detection search window and
+    right-click adds a vertex to the mask polygon. In corner mode, four
+    left-clicks mark the corners of the digit panel for rectification
+    (see core.rectify); a fifth starts over.
+    """
+    region_changed = Signal(object)     # SearchRegion | None
+    corners_changed = Signal(object)    # four (x, y) frame points | None
+
     def __init__(
         self,
         parent=None,
-        disp_fps: int=60                # Default to 60 FPS for smooth GUI
+        disp_fps: int=60,               # Default to 60 FPS for smooth GUI
+        match_tol: int=8
     ):
         super().__init__(parent)
         # Only set window title if used as top-level window
         if parent is None:
             self.setWindowTitle("Live feed")
         self.disp_fps = disp_fps
+        self.match_tol = match_tol
         
         # Layout
         layout = QVBoxLayout(self)
@@ -41,8 +63,27 @@ class VideoWidget(QWidget):
         # Placeholder for latest frame
         self.latest_frame: cv2.typing.MatLike = None
         self.last_pixmap: QPixmap = None
+        self._dirty = False     # something changed since the last repaint
+
+        # Boxes of the shown frame and the latest results
+        self.frame_id = 0       # detection id of the shown boxes
+        self.boxes = NO_BOXES
+        self._labels = None     # (detection id, N×4 boxes, N results)
 
-    def set_processor(self, processor: PreProcessorBase):
+        # Grouped numbers overlay (see core.grouping)
+        self.numbers: dict | None = None
+
+        # Search region editing
+        self.region: SearchRegion | None = None
+        self._editing = False
+        self._drag_start = None
+        self._drag_end = None
+        # Panel corners (rectification)
+        self.corners: list = []
+        self._corner_editing = False
+        self.video_label.installEventFilter(self)
+
+    def set_processor(self, processor: "PreProcessorBase"):
         """
         Connects an external processor's processed_frame signal to this widget.
         """
@@ -56,37 +97,219 @@ class VideoWidget(QWidget):
         self._current_processor = processor
         
     @Slot(object)
-    def on_frame(self, image):
+    def on_frame(self, packet):
         """
-        Slot to handle incoming frames from the frame grabber.
+        Slot for a FramePacket (processed_frame, or the grabber directly):
+        the frame plus the boxes of detection `det_id` to overlay on it.
         """
-        self.latest_frame = image
+        packet = FramePacket.of(packet)
+        self.latest_frame = packet.image
+        self.frame_id = packet.det_id
+        self.boxes = packet.boxes
+        self._dirty = True
+
+    @Slot(object)
+    def set_labels(self, batch):
+        """Results of a finished ROIBatch, shown on the boxes they belong to."""
+        self._labels = (batch.det_id, batch.boxes, batch.labels)
+        self._dirty = True
+
+    def _labels_for(self, boxes) -> list:
+        """Result to show on each of `boxes` (None = not known yet)."""
+        if self._labels is None or len(boxes) == 0:
+            return [None] * len(boxes)
+        frame_id, lboxes, labels = self._labels
+        if frame_id == self.frame_id:
+            return list(labels)
+        if len(lboxes) == 0:
+            return [None] * len(boxes)
+        # largest corner offset between every pair of boxes, N×M
+        dist = np.abs(boxes[:, None, :] - lboxes[None, :, :]).max(axis=2)
+        nearest = dist.argmin(axis=1)
+        close = dist[np.arange(len(boxes)), nearest] <= self.match_tol
+        return [labels[j] if ok else None for j, ok in zip(nearest.tolist(), close.tolist())]
+
+    @Slot(object)
+    def set_region(self, region: SearchRegion | None):
+        self.region = region
+        self._dirty = True
+
+    @Slot(bool)
+    def set_region_editing(self, editing: bool):
+        self._editing = editing
+        self._drag_start = self._drag_end = None
+        self._dirty = True
+
+    @Slot()
+    def clear_region(self):
+        self.region = None
+        self._dirty = True
+        self.region_changed.emit(None)
+
+    @Slot(object)
+    def set_corners(self, corners):
+        self.corners = [tuple(int(v) for v in p) for p in corners] if corners is not None else []
+        self._dirty = True
+
+    @Slot(bool)
+    def set_corner_editing(self, editing: bool):
+        self._corner_editing = editing
+        self._dirty = True
+
+    @Slot()
+    def clear_corners(self):
+        self.corners = []
+        self._dirty = True
+        self.corners_changed.emit(None)
+
+    def _to_frame(self, pos):
+        """Map a position on video_label to frame pixel coordinates."""
+        if self.latest_frame is None:
+            return None
+        h, w = self.latest_frame.shape[:2]
+        lw, lh = self.video_label.width(), self.video_label.height()
+        scale = min(lw / w, lh / h)
+        x = (pos.x() - (lw - w * scale) / 2) / scale
+        y = (pos.y() - (lh - h * scale) / 2) / scale
+        return int(min(max(x, 0), w - 1)), int(min(max(y, 0), h - 1))
+
+    def eventFilter(self, obj, event):
+        if (obj is self.video_label and self._corner_editing
+                and event.type() == QEvent.MouseButtonPress and event.button() == Qt.LeftButton):
+            pt = self._to_frame(event.position())
+            if pt is not None:
+                self.corners = (self.corners if len(self.corners) < 4 else []) + [pt]
+                self._dirty = True
+                if len(self.corners) == 4:
+                    self.corners_changed.emit(list(self.corners))
+            return True
+        if obj is self.video_label and self._editing:
+            etype = event.type()
+            self._dirty = True
+            if etype == QEvent.MouseButtonPress:
+                pt = self._to_frame(event.position())
+                if pt is None:
+                    return True
+                if event.button() == Qt.LeftButton:
+                    self._drag_start = self._drag_end = pt
+                elif event.button() == Qt.RightButton:
+                    region = self.region or SearchRegion()
+                    self.region = SearchRegion(region.rect, region.polygon + [pt], region.mask_path)
+                    self.region_changed.emit(self.region)
+                return True
+            if etype == QEvent.MouseMove and self._drag_start is not None:
+                self._drag_end = self._to_frame(event.position())
+                return True
+            if etype == QEvent.MouseButtonRelease and self._drag_start is not None:
+                (x1, y1), (x2, y2) = self._drag_start, self._to_frame(event.position())
+                self._drag_start = self._drag_end = None
+                if abs(x2 - x1) > 4 and abs(y2 - y1) > 4:
+                    region = self.region or SearchRegion()
+                    rect = (min(x1, x2), min(y1, y2), abs(x2 - x1), abs(y2 - y1))
+                    self.region = SearchRegion(rect, region.polygon, region.mask_path)
+                    self.region_changed.emit(self.region)
+                return True
+        return super().eventFilter(obj, event)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._dirty = True
+
+    @Slot(object)
+    def set_numbers(self, numbers: dict | None):
+        self.numbers = numbers
+        self._dirty = True
+
+    def _paint_overlay(self, pixmap: QPixmap, scale: float):
+        """Paint everything on top of the frame; frame coordinates × scale."""
+        def rect(x1, y1, x2, y2):
+            return QRectF(x1 * scale, y1 * scale, (x2 - x1) * scale, (y2 - y1) * scale)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        font = QFont()
+        font.setPixelSize(16)
+        font.setBold(True)
+        painter.setFont(font)
+
+        # digit boxes and their results
+        green = QColor(0, 255, 0)
+        painter.setPen(QPen(green, 2))
+        boxes = self.boxes
+        for (x1, y1, x2, y2), label in zip(boxes.tolist(), self._labels_for(boxes)):
+            painter.drawRect(rect(x1, y1, x2, y2))
+            if label is not None:
+                painter.drawText(QPointF(x1 * scale, y1 * scale - 4), str(label))
+
+        # grouped numbers and the total
+        if self.numbers is not None:
+            painter.setPen(QPen(QColor(255, 255, 255), 1))
+            for number in self.numbers['numbers']:
+                painter.drawRect(rect(*number['box']))
+            painter.setPen(green)
+            for number in self.numbers['numbers']:
+                x1, y1, x2, y2 = number['box']
+                painter.drawText(QPointF(x2 * scale + 4, y1 * scale + 16), str(number['value']))
+            painter.drawText(QPointF(10, 24), f"SUM:{self.numbers['sum']}")
+
+        # search window / mask polygon and the rect being dragged
+        region = self.region
+        if region is not None and region.rect:
+            x, y, w, h = region.rect
+            painter.setPen(QPen(QColor(255, 200, 0), 2))
+            painter.drawRect(rect(x, y, x + w, y + h))
+        if region is not None and region.polygon:
+            painter.setPen(QPen(QColor(0, 200, 255), 2))
+            poly = QPolygonF([QPointF(px * scale, py * scale) for px, py in region.polygon])
+            if len(poly) >= 3:
+                painter.drawPolygon(poly)
+            else:
+                painter.drawPolyline(poly)
+        # panel corners, numbered in click order
+        if self.corners:
+            painter.setPen(QPen(QColor(255, 0, 255), 2))
+            poly = QPolygonF([QPointF(px * scale, py * scale) for px, py in self.corners])
+            if len(poly) == 4:
+                painter.drawPolygon(poly)
+            else:
+                painter.drawPolyline(poly)
+            for i, point in enumerate(poly):
+                painter.drawEllipse(point, 4, 4)
+                painter.drawText(point + QPointF(6, -6), str(i + 1))
+        if self._drag_start is not None and self._drag_end is not None:
+            painter.setPen(QPen(QColor(255, 255, 0), 1))
+            painter.drawRect(rect(*self._drag_start, *self._drag_end).normalized())
+        painter.end()
 
     def update_display(self):
-        if self.latest_frame is not None:
-            frame = self.latest_frame
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb.shape
-            bytes_per_line = ch * w
-            qt_image = QImage(
-                rgb.data, w, h, bytes_per_line, QImage.Format_RGB888
-            )
-            pixmap = QPixmap.fromImage(qt_image)
-            self.last_pixmap = pixmap
-            scaled = pixmap.scaled(
-                self.video_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-            )
-            self.video_label.setPixmap(scaled)
+        if self.latest_frame is None or not self._dirty:
+            return
+        self._dirty = False
+        frame = self.latest_frame
+        h, w = frame.shape[:2]
+        # wrap the BGR buffer as is; QPixmap.fromImage makes the only copy
+        fmt = QImage.Format_BGR888 if frame.ndim == 3 else QImage.Format_Grayscale8
+        qt_image = QImage(frame.data, w, h, frame.strides[0], fmt)
+        pixmap = QPixmap.fromImage(qt_image)
+        self.last_pixmap = pixmap
+        scaled = pixmap.scaled(
+            self.video_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
+        )
+        self._paint_overlay(scaled, scaled.width() / w)
+        self.video_label.setPixmap(scaled)
 
 # Example usage as standalone:
 if __name__ == '__main__':
+    from processors.pre import BoundingBox
+    from providers.source import FrameGrabber
+
     app = QApplication([])
     fg = FrameGrabber(0)
     w = VideoWidget()
     
     processor1 = BoundingBox(min_area=5000)
     fg.frame_ready.connect(processor1.on_frame)
-    processor1.processed_frame.connect(w.on_frame)
+    w.set_processor(processor1)
     # processor1.roi_frame.connect(lambda roi: cv2.imshow("ROI", roi))
     
     w.show()
@@ -1,6 +1,5 @@
 import cv2
-from collections import deque
-from PySide6.QtCore import Qt, Signal, Slot
+from PySide6.QtCore import Qt, Slot
 from PySide6.QtWidgets import (
     QWidget, QScrollArea, QLabel, QHBoxLayout, QVBoxLayout
 )
@@ -25,22 +24,14 @@ class ThumbnailLabel(QLabel):
 
 class ROIViewerWidget(QWidget):
     """
-    A horizontally-scrollable widget that displays ROIs emitted
-    from the BoundingBox processor. If inference is enabled and a
-    TCP client is provided, each ROI is first sent for classification,
-    then drawn with the result overlay.
+    A horizontally-scrollable widget that displays the ROIs of a batch.
+    show_batch takes a finished ROIBatch (e.g. TCPWidget.batch_ready) and
+    draws every ROI with its result, if it has one; superseded batches
+    are skipped.
     """
-    def __init__(self, parent=None, tcp_client=None, inference_enabled=True, margin: int = 2):
+    def __init__(self, parent=None, margin: int = 2):
         super().__init__(parent)
         self._margin = margin
-        self.tcp_client = tcp_client
-        self.inference_enabled = inference_enabled
-        self._roi_queue = deque()
-        self._current_roi = None
-
-        # Connect TCP classification signal
-        if self.tcp_client:
-            self.tcp_client.classification_result.connect(self._on_classification_result)
 
         # Main layout
         main_layout = QVBoxLayout(self)
@@ -107,44 +98,36 @@ class ROIViewerWidget(QWidget):
 
     @Slot(list)
     def set_rois(self, roi_list):
-        """
-        Replace current thumbnails. If inference is on, send each ROI
-        to the TCP client in turn, await its classification, then draw.
-        Otherwise draw immediately.
-        """
+        """Replace current thumbnails with plain ROIs."""
         self.clear()
-        
-        if self.inference_enabled and self.tcp_client:
-            print(f"[ROIViewer] Received {len(roi_list)} ROIs")
-            self._roi_queue.extend(roi_list)
-            self._process_next_roi()
-        else:
-            for roi in roi_list:
-                self.add_roi(roi)
-
-    def _process_next_roi(self):
-        if not self._roi_queue:
-            return
-        self._current_roi = self._roi_queue.popleft()
-        # send single-ROI batch for inference
-        self.tcp_client.send_rois([self._current_roi])
+        for roi in roi_list:
+            self.add_roi(roi)
 
-    @Slot(int)
-    def _on_classification_result(self, result):
+    @Slot(object)
+    def show_batch(self, batch):
         """
-        Receive one classification result, annotate the current ROI,
-        draw it, then proceed to the next ROI in queue.
+        Replace current thumbnails with the batch's ROIs, each with its
+        result overlaid (ROIs without one, i.e. not sent, cancelled or
+        timed out, are drawn plain; ones the quality gate rejected get a
+        red x).
         """
-        roi = self._current_roi
-        # overlay result text on a copy
-        annotated = roi.copy()
-        cv2.putText(annotated,
-                    str(result),
-                    (5, 15),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.5,
-                    (0, 255, 0),
-                    1,
-                    cv2.LINE_AA)
-        self.add_roi(annotated)
-        self._process_next_roi()
+        if batch.superseded:
+            return
+        self.clear()
+        for roi, result, accepted in zip(batch.rois, batch.labels, batch.accepted.tolist()):
+            if not accepted:
+                roi = roi.copy()
+                cv2.putText(roi, "x", (5, 15), cv2.FONT_HERSHEY_SIMPLEX,
+                            0.5, (0, 0, 255), 1, cv2.LINE_AA)
+            elif result is not None:
+                # overlay result text on a copy
+                roi = roi.copy()
+                cv2.putText(roi,
+                            str(result),
+                            (5, 15),
+                            cv2.FONT_HERSHEY_SIMPLEX,
+                            0.5,
+                            (0, 255, 0),
+                            1,
+                            cv2.LINE_AA)
+            self.add_roi(roi)
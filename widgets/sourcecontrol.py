@@ -12,10 +12,10 @@ from PySide6.QtWidgets import (
     QPushButton,
     QFileDialog,
     QSlider,
+    QCheckBox,
 )
 
 from modes import VideoModes, VIDEOMODES_STR_MAP
-from providers.source import FrameGrabber
 
 class SourceControlWidget(QWidget):
     """
@@ -28,6 +28,15 @@ class SourceControlWidget(QWidget):
     sig_start = Signal()
     sig_pause = Signal()
     sig_update_fps = Signal(int)
+    sig_auto_fps = Signal(bool)
+    sig_edit_region = Signal(bool)
+    sig_clear_region = Signal()
+    sig_edit_panel = Signal(bool)
+    sig_clear_panel = Signal()
+    sig_find_panel = Signal()
+    sig_motion_gate = Signal(bool)
+    sig_quality_gate = Signal(bool)
+    sig_record = Signal(bool)
     sig_source_change = Signal(str, VideoModes, list)
     sig_next = Signal()
     sig_reset = Signal()
@@ -90,15 +99,101 @@ class SourceControlWidget(QWidget):
         self.fps_slider.valueChanged.connect(self.sig_update_fps)
         fps_layout.addWidget(self.fps_slider)
         fps_layout.addWidget(self.fps_label)
-        fps_box.setLayout(fps_layout)
+        # adaptive mode: the slider becomes the ceiling
+        self.auto_fps_box = QCheckBox("Auto")
+        self.auto_fps_box.setToolTip("Adapt the frame rate to the inference backlog")
+        self.auto_fps_box.toggled.connect(self.sig_auto_fps)
+        fps_layout.addWidget(self.auto_fps_box)
+        fps_outer = QVBoxLayout()
+        fps_outer.addLayout(fps_layout)
+        self.rate_label = QLabel("", alignment=Qt.AlignLeft)
+        self.rate_label.setWordWrap(True)
+        self.rate_label.setStyleSheet("color: gray;")
+        fps_outer.addWidget(self.rate_label)
+        fps_box.setLayout(fps_outer)
         main_layout.addWidget(fps_box)
         
+        # Detection: search region (drawn on the video) and motion gate
+        region_box = QGroupBox("Detection")
+        detect_form = self.detect_form = QFormLayout()
+        region_layout = self.region_layout = QHBoxLayout()
+        self.edit_region_btn = QPushButton("Edit")
+        self.edit_region_btn.setCheckable(True)
+        self.edit_region_btn.setToolTip(
+            "Left-drag on the video to set the search window, right-click to add mask points"
+        )
+        self.clear_region_btn = QPushButton("Clear")
+        self.edit_region_btn.toggled.connect(self.sig_edit_region)
+        self.clear_region_btn.clicked.connect(self.sig_clear_region)
+        region_layout.addWidget(self.edit_region_btn)
+        region_layout.addWidget(self.clear_region_btn)
+        detect_form.addRow("Region:", region_layout)
+        panel_layout = self.panel_layout = QHBoxLayout()
+        self.edit_panel_btn = QPushButton("Corners")
+        self.edit_panel_btn.setCheckable(True)
+        self.edit_panel_btn.setToolTip(
+            "Click the four corners of the digit panel on the video to rectify it"
+        )
+        self.find_panel_btn = QPushButton("Markers")
+        self.find_panel_btn.setToolTip("Find the panel from four ArUco markers on its corners")
+        self.clear_panel_btn = QPushButton("Clear")
+        self.edit_panel_btn.toggled.connect(self.sig_edit_panel)
+        self.find_panel_btn.clicked.connect(self.sig_find_panel)
+        self.clear_panel_btn.clicked.connect(self.sig_clear_panel)
+        panel_layout.addWidget(self.edit_panel_btn)
+        panel_layout.addWidget(self.find_panel_btn)
+        panel_layout.addWidget(self.clear_panel_btn)
+        detect_form.addRow("Panel:", panel_layout)
+        self.motion_gate_box = QCheckBox("Skip unchanged frames")
+        self.motion_gate_box.toggled.connect(self.sig_motion_gate)
+        self.skip_label = QLabel("")
+        self.skip_label.setStyleSheet("color: gray;")
+        detect_form.addRow(self.motion_gate_box, self.skip_label)
+        self.quality_gate_box = QCheckBox("Drop poor crops")
+        self.quality_gate_box.setToolTip("Don't send blurred, empty or clipped ROIs")
+        self.quality_gate_box.toggled.connect(self.sig_quality_gate)
+        self.reject_label = QLabel("")
+        self.reject_label.setStyleSheet("color: gray;")
+        detect_form.addRow(self.quality_gate_box, self.reject_label)
+        self.record_box = QCheckBox("Record ROIs")
+        self.record_box.setToolTip("Capture sent ROIs and results as a packed dataset")
+        self.record_box.toggled.connect(self.sig_record)
+        self.record_label = QLabel("")
+        self.record_label.setStyleSheet("color: gray;")
+        detect_form.addRow(self.record_box, self.record_label)
+        region_box.setLayout(detect_form)
+        main_layout.addWidget(region_box)
+
         # Path display
         self.path_label = QLabel("", alignment=Qt.AlignLeft)
         self.path_label.setWordWrap(True)
         self.path_label.setStyleSheet("color: gray;")
         main_layout.addWidget(self.path_label)
     
+    def hide_single_source_controls(self):
+        """
+        Hide the controls that act on a single stream (search region,
+        panel calibration, recording and Auto FPS), for windows that
+        show several.
+        """
+        for row in (self.region_layout, self.panel_layout, self.record_box):
+            self.detect_form.setRowVisible(row, False)
+        self.auto_fps_box.hide()
+        self.rate_label.hide()
+
+    @Slot(int, str)
+    def set_effective_rate(self, fps: int, reason: str):
+        """Show the rate actually applied to the grabber and why."""
+        self.rate_label.setText(f"Effective: {fps} FPS — {reason}")
+
+    @Slot(float)
+    def set_skip_ratio(self, ratio: float):
+        self.skip_label.setText(f"skipped {100 * ratio:.0f}%")
+
+    @Slot(float)
+    def set_reject_ratio(self, ratio: float):
+        self.reject_label.setText(f"dropped {100 * ratio:.0f}%")
+
     @Slot(int)
     def sig_source_change(self, index):
         # Get the mode from the combo box (based on the selected index)
@@ -0,0 +1,63 @@
+from PySide6.QtCore import Slot
+from PySide6.QtWidgets import QGridLayout, QGroupBox, QVBoxLayout, QWidget
+
+from .livesource import VideoWidget
+
+
+class VideoGrid(QWidget):
+    """
+    Grid view for several streams: one VideoWidget per stream id,
+    `columns` tiles wide. Frames (FramePacket), results (ROIBatch) and
+    grouped numbers are routed to the tile of their stream_id; anything
+    for a stream without a tile is ignored.
+    """
+    def __init__(self, parent=None, columns: int = 2, disp_fps: int = 30):
+        super().__init__(parent)
+        if parent is None:
+            self.setWindowTitle("Live feeds")
+        self.columns = columns
+        self.disp_fps = disp_fps
+        self._grid = QGridLayout(self)
+        self._grid.setContentsMargins(0, 0, 0, 0)
+        self.tiles: dict[int, VideoWidget] = {}
+        self._boxes: dict[int, QGroupBox] = {}
+
+    def add_stream(self, stream_id: int, title: str = "") -> VideoWidget:
+        tile = VideoWidget(disp_fps=self.disp_fps)
+        box = QGroupBox(title or f"Stream {stream_id}")
+        layout = QVBoxLayout(box)
+        layout.setContentsMargins(2, 2, 2, 2)
+        layout.addWidget(tile)
+        self.tiles[stream_id] = tile
+        self._boxes[stream_id] = box
+        self._relayout()
+        return tile
+
+    def remove_stream(self, stream_id: int):
+        self.tiles.pop(stream_id)
+        box = self._boxes.pop(stream_id)
+        self._grid.removeWidget(box)
+        box.deleteLater()
+        self._relayout()
+
+    def _relayout(self):
+        for index, box in enumerate(self._boxes.values()):
+            self._grid.addWidget(box, index // self.columns, index % self.columns)
+
+    @Slot(object)
+    def on_frame(self, packet):
+        tile = self.tiles.get(packet.stream_id)
+        if tile is not None:
+            tile.on_frame(packet)
+
+    @Slot(object)
+    def set_labels(self, batch):
+        tile = self.tiles.get(batch.stream_id)
+        if tile is not None:
+            tile.set_labels(batch)
+
+    @Slot(object)
+    def set_numbers(self, numbers: dict):
+        tile = self.tiles.get(numbers.get('stream_id', 0))
+        if tile is not None:
+            tile.set_numbers(numbers)